@@ -0,0 +1,207 @@
+import os
+import crud
+import models
+import schemas
+import asyncio
+import logging
+import uploads
+import zipfile
+import pipeline
+import blob_store
+
+from db import SessionLocal
+from typing import List, Optional
+from dotenv import load_dotenv
+from fastapi import UploadFile
+from parse_pool import ParserPoolSaturated
+from llm_scheduler import CircuitOpenError
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "1000"))
+BATCH_MAX_ENTRY_BYTES = int(os.getenv("BATCH_MAX_ENTRY_BYTES", str(uploads.UPLOAD_MAX_BYTES)))
+BATCH_MAX_REQUEST_BYTES = int(os.getenv("BATCH_MAX_REQUEST_BYTES", str(1024 * 1024 * 1024)))
+BATCH_INSERT_SIZE = int(os.getenv("BATCH_INSERT_SIZE", "50"))
+BATCH_PARSE_RETRIES = int(os.getenv("BATCH_PARSE_RETRIES", "5"))
+
+SUPPORTED_EXTENSIONS = ("pdf", "docx", "txt")
+
+
+def _file_ext(file_name: str) -> str:
+    return file_name.split('.')[-1].lower() if '.' in file_name else ""
+
+
+def is_supported_file(file_name: str) -> bool:
+    return _file_ext(file_name) in SUPPORTED_EXTENSIONS
+
+
+async def _process_item(
+    file_name: str,
+    upload: uploads.SpooledUpload
+) -> tuple[schemas.BatchUploadItemSchema, Optional[models.Resume]]:
+    with upload:
+        return await _process_upload(file_name, upload)
+
+
+async def _process_upload(
+    file_name: str,
+    upload: uploads.SpooledUpload
+) -> tuple[schemas.BatchUploadItemSchema, Optional[models.Resume]]:
+    for attempt in range(BATCH_PARSE_RETRIES + 1):
+        try:
+            processed = await pipeline.process_resume(file_name, upload.source, upload.sha256)
+            break
+        except ParserPoolSaturated as e:
+            if attempt == BATCH_PARSE_RETRIES:
+                return schemas.BatchUploadItemSchema(
+                    file_name=file_name, status="failed", detail="Parser pool is saturated."
+                ), None
+            await asyncio.sleep(e.retry_after)
+        except CircuitOpenError:
+            return schemas.BatchUploadItemSchema(
+                file_name=file_name, status="failed", detail="The LLM provider is temporarily unavailable."
+            ), None
+        except ValueError as e:
+            return schemas.BatchUploadItemSchema(file_name=file_name, status="failed", detail=str(e)), None
+        except Exception as e:
+            logger.exception("Unexpected error while processing %s in batch: %s", file_name, e)
+            return schemas.BatchUploadItemSchema(
+                file_name=file_name, status="failed", detail="Error processing resume file."
+            ), None
+
+    db_resume = crud.build_resume(
+        processed.file_name,
+        processed.raw_text,
+        processed.extracted_data,
+        processed.llm_analysis,
+        processed.llm_mode,
+        await blob_store.store_original(upload.source, upload.sha256)
+    )
+    item = schemas.BatchUploadItemSchema(
+        file_name=file_name,
+        status="failed" if processed.error else "created",
+        detail=processed.error
+    )
+    return item, db_resume
+
+
+class BatchProcessor:
+    """Fans files out to the pipeline with at most `concurrency` in flight.
+
+    A slot is taken before a file (or archive entry) is spooled, so at most
+    `concurrency` spooled files exist at any time.
+    """
+
+    def __init__(self, concurrency: int):
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.items: List[schemas.BatchUploadItemSchema] = []
+        self.tasks: List[asyncio.Task] = []
+        self.pending_rows: List[tuple[schemas.BatchUploadItemSchema, models.Resume]] = []
+        self.count = 0
+
+    async def _run(self, file_name: str, upload: uploads.SpooledUpload) -> None:
+        try:
+            item, db_resume = await _process_item(file_name, upload)
+        finally:
+            self.semaphore.release()
+
+        self.items.append(item)
+        if db_resume is not None:
+            self.pending_rows.append((item, db_resume))
+            if len(self.pending_rows) >= BATCH_INSERT_SIZE:
+                await self.flush()
+
+    async def submit(self, file_name: str, spool) -> None:
+        if self.count >= BATCH_MAX_FILES:
+            self.items.append(schemas.BatchUploadItemSchema(
+                file_name=file_name, status="skipped", detail=f"Batch limit of {BATCH_MAX_FILES} files reached."
+            ))
+            return
+        if not is_supported_file(file_name):
+            self.items.append(schemas.BatchUploadItemSchema(
+                file_name=file_name, status="skipped", detail="Unsupported file type."
+            ))
+            return
+
+        self.count += 1
+        await self.semaphore.acquire()
+        try:
+            upload = await spool()
+        except Exception as e:
+            self.semaphore.release()
+            self.items.append(schemas.BatchUploadItemSchema(file_name=file_name, status="failed", detail=str(e)))
+            return
+        self.tasks.append(asyncio.create_task(self._run(file_name, upload)))
+
+    async def submit_archive(self, archive_file: UploadFile) -> None:
+        try:
+            archive = zipfile.ZipFile(archive_file.file)
+        except zipfile.BadZipFile:
+            self.items.append(schemas.BatchUploadItemSchema(
+                file_name=archive_file.filename, status="failed", detail="Invalid ZIP archive."
+            ))
+            return
+
+        with archive:
+            # Entries are decompressed one at a time as slots free up
+            for info in archive.infolist():
+                entry_name = info.filename
+                if info.is_dir() or entry_name.startswith("__MACOSX/") or os.path.basename(entry_name).startswith("."):
+                    continue
+                if info.file_size > BATCH_MAX_ENTRY_BYTES:
+                    self.items.append(schemas.BatchUploadItemSchema(
+                        file_name=entry_name, status="skipped", detail="File exceeds the maximum allowed size."
+                    ))
+                    continue
+                await self.submit(
+                    entry_name,
+                    lambda info=info: asyncio.to_thread(uploads.spool_stream, archive.open(info), BATCH_MAX_ENTRY_BYTES)
+                )
+
+            # The archive must stay open until every read has been scheduled
+            await asyncio.gather(*self.tasks)
+
+    async def flush(self) -> None:
+        # Each flush takes its own short-lived session, so no connection is held while files are processed
+        rows, self.pending_rows = self.pending_rows, []
+        if not rows:
+            return
+        async with SessionLocal() as db:
+            saved = await crud.create_resume_entries(db, [db_resume for _, db_resume in rows])
+        for item, db_resume in rows:
+            if saved:
+                item.resume_id = db_resume.id
+            else:
+                item.status = "failed"
+                item.detail = "Failed to save processed resume data to database."
+
+    async def finish(self) -> schemas.BatchUploadResponseSchema:
+        await asyncio.gather(*self.tasks)
+        await self.flush()
+        return schemas.BatchUploadResponseSchema(
+            total=len(self.items),
+            created=sum(1 for item in self.items if item.status == "created"),
+            failed=sum(1 for item in self.items if item.status == "failed"),
+            skipped=sum(1 for item in self.items if item.status == "skipped"),
+            items=self.items
+        )
+
+
+async def process_batch(files: List[UploadFile]) -> schemas.BatchUploadResponseSchema:
+    processor = BatchProcessor(BATCH_CONCURRENCY)
+
+    for upload in files:
+        if not upload.filename:
+            continue
+        if _file_ext(upload.filename) == "zip":
+            await processor.submit_archive(upload)
+        else:
+            await processor.submit(
+                upload.filename,
+                lambda upload=upload: uploads.spool_upload(upload, BATCH_MAX_ENTRY_BYTES)
+            )
+
+    return await processor.finish()
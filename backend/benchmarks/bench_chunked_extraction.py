@@ -0,0 +1,119 @@
+"""Single-call vs section-chunked extraction latency on long resumes.
+
+Each document goes through one extraction call over the whole text, then
+through the chunked path (one call per section, run concurrently), and wall
+time and token usage are compared. Short documents, which stay on the single
+call in production (EXTRACTION_CHUNKED_MIN_CHARS), are reported but not
+chunked. Without --live the fake provider is used, with latency proportional
+to output tokens (FAKE_LLM_SECONDS_PER_OUTPUT_TOKEN).
+
+    python -m benchmarks.bench_chunked_extraction --pages 3,10,20 --output chunked.json
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+if "--live" not in sys.argv:
+    os.environ.setdefault("LLM_PROVIDER", "fake")
+    os.environ.setdefault("FAKE_LLM_LATENCY_SECONDS", "0.2")
+    os.environ.setdefault("FAKE_LLM_LATENCY_JITTER_SECONDS", "0")
+    os.environ.setdefault("FAKE_LLM_SECONDS_PER_OUTPUT_TOKEN", "0.004")
+    # Measure the calls, not the provider quota the scheduler enforces in production
+    os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "1000000")
+    os.environ.setdefault("LLM_TOKENS_PER_MINUTE", "1000000000")
+
+import llm_service
+import pipeline
+from benchmarks.bench_prompt_compaction import load_corpus, synthetic_resume_text
+
+
+def _tokens(calls: tuple) -> dict:
+    return {
+        direction: sum(llm_service.token_usage_stats[call][f"{direction}_tokens"] for call in calls)
+        for direction in ("input", "output")
+    }
+
+
+async def timed(call, calls: tuple) -> dict:
+    before = _tokens(calls)
+    start = time.perf_counter()
+    result = await call
+    elapsed = time.perf_counter() - start
+    after = _tokens(calls)
+    return {
+        "latency_seconds": elapsed,
+        "input_tokens": after["input"] - before["input"],
+        "output_tokens": after["output"] - before["output"],
+        "valid": result is not None,
+    }
+
+
+async def run(documents: list) -> dict:
+    rows = []
+    for name, text in documents:
+        exclude = frozenset(pipeline.fast_path_fields(text))
+        row = {"document": name, "chars": len(text)}
+        row["single"] = await timed(llm_service.extract_structured_data_from_text(text, exclude), ("extraction",))
+
+        # The plan ignores the size threshold here, so every document shows what chunking would do
+        threshold, pipeline.EXTRACTION_CHUNKED_MIN_CHARS = pipeline.EXTRACTION_CHUNKED_MIN_CHARS, 1
+        try:
+            chunks = pipeline.plan_extraction_chunks(text, exclude)
+        finally:
+            pipeline.EXTRACTION_CHUNKED_MIN_CHARS = threshold
+        row["above_threshold"] = len(text) >= threshold > 0
+        if chunks is not None:
+            row["chunks"] = len(chunks)
+            row["chunked"] = await timed(pipeline.get_chunked_extraction(chunks), ("extraction_chunk",))
+        rows.append(row)
+
+    chunked = [row for row in rows if "chunked" in row]
+    summary = {
+        "documents": len(rows),
+        "chunked_documents": len(chunked),
+        "threshold_chars": pipeline.EXTRACTION_CHUNKED_MIN_CHARS,
+    }
+    for label, group in (("all", chunked), ("above_threshold", [row for row in chunked if row["above_threshold"]])):
+        if not group:
+            continue
+        for key in ("latency_seconds", "input_tokens", "output_tokens"):
+            single = statistics.median(row["single"][key] for row in group)
+            split = statistics.median(row["chunked"][key] for row in group)
+            summary[f"{label}_{key}_p50_single"] = single
+            summary[f"{label}_{key}_p50_chunked"] = split
+            summary[f"{label}_{key}_change_pct"] = 100.0 * (split - single) / single if single else 0.0
+    return {"summary": summary, "documents": rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="Directory of PDF/DOCX/TXT resumes")
+    parser.add_argument("--pages", default="3,10,20", help="Page counts of the synthetic documents")
+    parser.add_argument("--per-size", type=int, default=3, help="Synthetic documents per page count")
+    parser.add_argument("--live", action="store_true", help="Call the configured LLM provider")
+    parser.add_argument("--output", help="Write full results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.corpus:
+        documents = load_corpus(args.corpus)
+    else:
+        documents = [
+            (f"synthetic-{pages}p-{i}", synthetic_resume_text(pages, i))
+            for pages in (int(p) for p in args.pages.split(",")) for i in range(args.per_size)
+        ]
+    results = asyncio.run(run(documents))
+
+    for key, value in results["summary"].items():
+        print(f"{key:>42}: {value:.3f}" if isinstance(value, float) else f"{key:>42}: {value}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Cold-start time of an API worker, measured in fresh interpreters.
+
+For each run: time to import the app, time from launching uvicorn until
+GET / answers, and how long the first LLM call pays to initialize the
+provider (no longer part of boot). Uses DATABASE_URL and LLM_PROVIDER from
+the environment; with LLM_PROVIDER=fake no API key is needed.
+
+    python -m benchmarks.bench_cold_start --runs 5 --output cold_start.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_TIMED_IMPORT = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+_TIMED_LLM_INIT = """
+import time
+import llm_service
+start = time.perf_counter()
+llm_service.get_llm()
+print(time.perf_counter() - start)
+"""
+
+
+def _run_python(code: str) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_response(timeout: float) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"No response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _summary(values: list) -> dict:
+    return {"median": statistics.median(values), "min": min(values), "max": max(values)}
+
+
+def run(runs: int, timeout: float) -> dict:
+    samples = {"import_llm_service": [], "import_main": [], "first_response": [], "first_llm_init": []}
+    for _ in range(runs):
+        samples["import_llm_service"].append(_run_python(_TIMED_IMPORT.format(module="llm_service")))
+        samples["import_main"].append(_run_python(_TIMED_IMPORT.format(module="main")))
+        samples["first_response"].append(time_to_first_response(timeout))
+        samples["first_llm_init"].append(_run_python(_TIMED_LLM_INIT))
+    return {
+        "runs": runs,
+        "llm_provider": os.getenv("LLM_PROVIDER", "gemini"),
+        "seconds": {name: _summary(values) for name, values in samples.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for uvicorn to answer")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.runs, args.timeout)
+    for name, summary in results["seconds"].items():
+        print(f"{name:>20}: median {summary['median']:.3f}s (min {summary['min']:.3f}s, max {summary['max']:.3f}s)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Cost of the rule-based fast path and what it saves on the extraction call.
+
+Times resume_parser.extract_contact_info/split_sections per document, then
+runs extraction with the full schema and with contact_info left out, and
+compares output tokens and latency. Without --live the fake provider is used,
+with latency proportional to output tokens (FAKE_LLM_SECONDS_PER_OUTPUT_TOKEN).
+
+    python -m benchmarks.bench_fast_path --corpus ./sample_resumes --output fast_path.json
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+if "--live" not in sys.argv:
+    os.environ.setdefault("LLM_PROVIDER", "fake")
+    os.environ.setdefault("FAKE_LLM_LATENCY_SECONDS", "0.2")
+    os.environ.setdefault("FAKE_LLM_LATENCY_JITTER_SECONDS", "0")
+    os.environ.setdefault("FAKE_LLM_SECONDS_PER_OUTPUT_TOKEN", "0.004")
+
+import llm_service
+import pipeline
+import resume_parser
+from benchmarks.bench_prompt_compaction import load_corpus, synthetic_resume_text
+
+
+def synthetic_documents(count: int) -> list:
+    # The synthetic header has no name line; add one so the fast path can apply
+    return [(f"synthetic-{i}", f"Alex Morgan\n{synthetic_resume_text(1 + i % 3, i)}") for i in range(count)]
+
+
+def rule_timings_us(text: str, iterations: int) -> dict:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        sections = resume_parser.split_sections(text)
+    split_us = (time.perf_counter() - start) / iterations * 1e6
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        resume_parser.extract_contact_info(text, sections)
+    contact_us = (time.perf_counter() - start) / iterations * 1e6
+    return {"split_sections_us": split_us, "extract_contact_info_us": contact_us}
+
+
+async def timed_extraction(text: str, exclude: frozenset) -> dict:
+    system_content, _ = llm_service.extraction_variant(exclude)
+    human_text = llm_service.HUMAN_EXTRACTION_TEMPLATE.replace("{resume_text}", text)
+    messages = [("system", system_content.replace("{{", "{").replace("}}", "}")), ("human", human_text)]
+
+    start = time.perf_counter()
+    response = await llm_service.get_llm().ainvoke(messages)
+    usage = getattr(response, "usage_metadata", None) or {}
+    return {
+        "latency_seconds": time.perf_counter() - start,
+        "input_tokens": usage.get("input_tokens"),
+        "output_tokens": usage.get("output_tokens"),
+    }
+
+
+async def run(documents: list, iterations: int) -> dict:
+    rows = []
+    for name, text in documents:
+        row = {"document": name, **rule_timings_us(text, iterations)}
+        known = pipeline.fast_path_fields(text)
+        row["fast_path"] = bool(known)
+        row["full"] = await timed_extraction(text, frozenset())
+        if known:
+            row["fast_path_call"] = await timed_extraction(text, frozenset(known))
+        rows.append(row)
+
+    covered = [row for row in rows if row["fast_path"]]
+    summary = {
+        "documents": len(rows),
+        "fast_path_documents": len(covered),
+        "split_sections_us_p50": statistics.median(row["split_sections_us"] for row in rows) if rows else 0.0,
+        "extract_contact_info_us_p50": statistics.median(row["extract_contact_info_us"] for row in rows) if rows else 0.0,
+    }
+    if covered:
+        for key in ("input_tokens", "output_tokens", "latency_seconds"):
+            full = statistics.median(row["full"][key] or 0 for row in covered)
+            fast = statistics.median(row["fast_path_call"][key] or 0 for row in covered)
+            summary[f"{key}_p50_full"] = full
+            summary[f"{key}_p50_fast_path"] = fast
+            summary[f"{key}_saved_pct"] = 100.0 * (full - fast) / full if full else 0.0
+    return {"summary": summary, "documents": rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="Directory of PDF/DOCX/TXT resumes")
+    parser.add_argument("--synthetic", type=int, default=10, help="Synthetic documents when no corpus is given")
+    parser.add_argument("--iterations", type=int, default=200, help="Repetitions when timing the rules")
+    parser.add_argument("--live", action="store_true", help="Call the configured LLM provider")
+    parser.add_argument("--output", help="Write full results as JSON to this file")
+    args = parser.parse_args()
+
+    documents = load_corpus(args.corpus) if args.corpus else synthetic_documents(args.synthetic)
+    results = asyncio.run(run(documents, args.iterations))
+
+    for key, value in results["summary"].items():
+        print(f"{key:>30}: {value:.3f}" if isinstance(value, float) else f"{key:>30}: {value}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Load test of the API in-process: uploads, then list and detail reads.
+
+The app runs against a fresh SQLite database (aiosqlite) in a temporary
+directory and the fake LLM provider, with fixed latency and a fixed seed, so
+runs on the same machine are comparable. Requests go through the ASGI
+interface (httpx), which leaves out the network but keeps everything from
+routing to the database. Every upload is a different synthetic resume, so
+the result cache does not short-circuit the pipeline.
+
+    python -m benchmarks.bench_load --uploads 200 --concurrency 16 --llm-latency 0.2 --output load.json
+"""
+import os
+import math
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+from benchmarks import corpus, report
+
+
+CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "txt": "text/plain",
+}
+
+
+def configure_environment(args, work_dir: str) -> None:
+    """Points the app at a throwaway database and the fake LLM; must run before the app is imported."""
+    os.chdir(work_dir)
+    os.environ.update({
+        "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(work_dir, 'bench.db')}",
+        "DB_CREATE_TABLES_ON_STARTUP": "true",
+        "LLM_PROVIDER": "fake",
+        "FAKE_LLM_LATENCY_SECONDS": str(args.llm_latency),
+        "FAKE_LLM_LATENCY_JITTER_SECONDS": str(args.llm_jitter),
+        "FAKE_LLM_SEED": str(args.seed),
+        "JOB_WORKERS": "0",
+        "LOG_LEVEL": "WARNING",
+        # Measure the app, not the provider quota the scheduler enforces in production
+        "LLM_REQUESTS_PER_MINUTE": "1000000",
+        "LLM_TOKENS_PER_MINUTE": "1000000000",
+        "LLM_MAX_IN_FLIGHT": str(max(8, 2 * args.concurrency)),
+    })
+    for assignment in args.env:
+        name, _, value = assignment.partition("=")
+        os.environ[name] = value
+
+
+async def run_phase(send, total: int, concurrency: int) -> dict:
+    """Sends `total` requests from `concurrency` workers; send(index) returns the status code."""
+    timings = []
+    statuses = {}
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                status = await send(index)
+            except Exception as e:
+                status = type(e).__name__
+            timings.append(time.perf_counter() - start)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+    duration = time.perf_counter() - started
+    ok = sum(count for status, count in statuses.items() if status.isdigit() and int(status) < 400)
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": total - ok,
+        "status_codes": statuses,
+        "duration_seconds": duration,
+        "throughput_rps": total / duration if duration else 0.0,
+        "latency": report.latency_summary(timings),
+    }
+
+
+async def load_test(args, documents: list) -> dict:
+    import httpx
+    import main
+
+    await main.on_startup()
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            resume_ids = []
+
+            async def upload(index: int) -> int:
+                document = documents[index]
+                response = await client.post(
+                    "/api/v1/resumes/upload",
+                    files={"file": (document.name, document.content, CONTENT_TYPES[document.format])}
+                )
+                if response.status_code == 201:
+                    resume_ids.append(response.json()["id"])
+                return response.status_code
+
+            results["upload"] = await run_phase(upload, len(documents), args.concurrency)
+            if not resume_ids:
+                raise RuntimeError(f"No upload succeeded: {results['upload']['status_codes']}")
+
+            rng = random.Random(args.seed)
+            pages = max(1, len(resume_ids) // 20)
+
+            async def list_page(index: int) -> int:
+                response = await client.get("/api/v1/resumes/", params={"limit": 20, "skip": rng.randrange(pages) * 20})
+                return response.status_code
+
+            async def detail(index: int) -> int:
+                response = await client.get(f"/api/v1/resumes/{rng.choice(resume_ids)}")
+                return response.status_code
+
+            results["list"] = await run_phase(list_page, args.reads, args.read_concurrency)
+            results["detail"] = await run_phase(detail, args.reads, args.read_concurrency)
+
+            stats = (await client.get("/stats")).json()
+            results["server"] = {name: stats.get(name) for name in ("parser_pool", "llm_scheduler", "read_cache", "db_pool")}
+    finally:
+        await main.on_shutdown()
+    return results
+
+
+def run(args) -> dict:
+    pages = [int(p) for p in args.pages.split(",")]
+    formats = args.formats.split(",")
+    per_size = math.ceil(args.uploads / (len(pages) * len(formats)))
+    documents = corpus.build_corpus(per_size, pages, formats, args.seed)
+    # Interleave formats and sizes rather than uploading all PDFs first
+    random.Random(args.seed).shuffle(documents)
+    documents = documents[:args.uploads]
+
+    parameters = {name: value for name, value in vars(args).items() if name != "output"}
+    metadata = report.run_metadata(parameters)
+    with tempfile.TemporaryDirectory(prefix="resume-bench-") as work_dir:
+        previous_dir = os.getcwd()
+        configure_environment(args, work_dir)
+        try:
+            results = asyncio.run(load_test(args, documents))
+        finally:
+            os.chdir(previous_dir)
+    return {"meta": metadata, **results, "peak_rss_mb": report.peak_rss_mb()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=120)
+    parser.add_argument("--concurrency", type=int, default=8, help="Uploads in flight at once")
+    parser.add_argument("--reads", type=int, default=1000, help="Requests per read phase (list, detail)")
+    parser.add_argument("--read-concurrency", type=int, default=32)
+    parser.add_argument("--pages", default="1,3", help="Comma-separated page counts of the uploaded resumes")
+    parser.add_argument("--formats", default=",".join(corpus.FORMATS))
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Fake LLM seconds per call")
+    parser.add_argument("--llm-jitter", type=float, default=0.0, help="Fake LLM latency jitter, seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE", help="Extra app setting, e.g. RESUME_WRITE_BEHIND_ENABLED=true")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    for phase in ("upload", "list", "detail"):
+        result = results[phase]
+        latency = result["latency"]
+        print(
+            f"{phase:>8}: {result['throughput_rps']:8.1f} req/s  p50 {latency['p50_ms']:7.1f} ms  "
+            f"p95 {latency['p95_ms']:7.1f} ms  p99 {latency['p99_ms']:7.1f} ms  errors {result['errors']}"
+        )
+    print(f"peak rss: {results['peak_rss_mb']['self']:.0f} MB (parser workers {results['peak_rss_mb']['children']:.0f} MB)")
+
+    if args.output:
+        report.write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
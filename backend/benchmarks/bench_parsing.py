@@ -0,0 +1,147 @@
+"""Text extraction throughput per format and size, and LLM output parsing time.
+
+Parses the synthetic corpus (benchmarks.corpus) in-process, one document
+at a time, then times parse_llm_json_output on LLM replies: shapes seen in
+practice built from the fake provider's payloads, or real replies recorded
+to a JSONL file ({"name", "schema": "extraction" | "analysis", "content"}).
+
+    python -m benchmarks.bench_parsing --per-size 5 --output parsing.json
+    python -m benchmarks.bench_parsing --llm-outputs recorded_replies.jsonl
+"""
+import os
+import json
+import time
+import argparse
+
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+import schemas
+import llm_service
+import resume_parser
+
+from benchmarks import corpus, report
+from fake_llm import FAKE_EXTRACTION, FAKE_ANALYSIS
+
+
+SCHEMAS = {
+    "extraction": schemas.ResumeExtractedData,
+    "analysis": schemas.LLMAnalysisSchema,
+}
+
+
+def bench_extraction(documents: list, repeat: int) -> dict:
+    groups = {}
+    for document in documents:
+        groups.setdefault((document.format, document.pages), []).append(document)
+
+    results = {}
+    for (format, pages), group in sorted(groups.items()):
+        timings = []
+        total_bytes = 0
+        total_chars = 0
+        for _ in range(repeat):
+            for document in group:
+                start = time.perf_counter()
+                text = resume_parser.extract_text_from_resume(document.name, document.content)
+                timings.append(time.perf_counter() - start)
+                total_bytes += len(document.content)
+                total_chars += len(text)
+        elapsed = sum(timings)
+        results[f"{format}_{pages}p"] = {
+            "documents": len(timings),
+            "docs_per_second": len(timings) / elapsed,
+            "mb_per_second": total_bytes / 2 ** 20 / elapsed,
+            "avg_chars": total_chars / len(timings),
+            "latency": report.latency_summary(timings),
+        }
+    return results
+
+
+def _fenced(payload) -> str:
+    return "```json\n" + json.dumps(payload) + "\n```"
+
+
+def generated_llm_outputs() -> list:
+    large = dict(FAKE_EXTRACTION, work_experience=FAKE_EXTRACTION["work_experience"] * 15)
+    fenced = _fenced(FAKE_EXTRACTION)
+    return [
+        {"name": "extraction_fenced", "schema": "extraction", "content": fenced},
+        {
+            "name": "extraction_with_prose",
+            "schema": "extraction",
+            "content": "Here is the extracted data:\n" + json.dumps(FAKE_EXTRACTION, indent=2) + "\nLet me know if you need anything else.",
+        },
+        {"name": "extraction_large_fenced", "schema": "extraction", "content": _fenced(large)},
+        {"name": "extraction_truncated", "schema": "extraction", "content": fenced[: len(fenced) // 2]},
+        {"name": "analysis_bare", "schema": "analysis", "content": json.dumps(FAKE_ANALYSIS)},
+        {"name": "analysis_fenced", "schema": "analysis", "content": _fenced(FAKE_ANALYSIS)},
+    ]
+
+
+def load_llm_outputs(path: str) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def bench_llm_output_parsing(outputs: list, iterations: int) -> dict:
+    # Failures log a warning per call; keep them out of the timings
+    llm_service.logger.disabled = True
+    results = {}
+    try:
+        for output in outputs:
+            target_schema = SCHEMAS[output["schema"]]
+            parsed = llm_service.parse_llm_json_output(output["content"], target_schema)
+            timings = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                llm_service.parse_llm_json_output(output["content"], target_schema)
+                timings.append(time.perf_counter() - start)
+            summary = report.latency_summary(timings)
+            results[output["name"]] = {
+                "chars": len(output["content"]),
+                "valid": parsed is not None,
+                "us_per_call": summary["mean_ms"] * 1000,
+                "latency": summary,
+            }
+    finally:
+        llm_service.logger.disabled = False
+    return results
+
+
+def run(per_size: int, pages: list, repeat: int, iterations: int, llm_outputs_path: str = None) -> dict:
+    documents = corpus.build_corpus(per_size, pages)
+    outputs = load_llm_outputs(llm_outputs_path) if llm_outputs_path else generated_llm_outputs()
+    return {
+        "meta": report.run_metadata({
+            "per_size": per_size, "pages": pages, "repeat": repeat,
+            "iterations": iterations, "llm_outputs": llm_outputs_path or "generated",
+        }),
+        "text_extraction": bench_extraction(documents, repeat),
+        "llm_output_parsing": bench_llm_output_parsing(outputs, iterations),
+        "peak_rss_mb": report.peak_rss_mb(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-size", type=int, default=5, help="Documents per format and page count")
+    parser.add_argument("--pages", default=",".join(map(str, corpus.DEFAULT_PAGES)), help="Comma-separated page counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the corpus")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per LLM output sample")
+    parser.add_argument("--llm-outputs", help="JSONL of recorded LLM replies to parse instead of the generated ones")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.per_size, [int(p) for p in args.pages.split(",")], args.repeat, args.iterations, args.llm_outputs)
+    for name, result in results["text_extraction"].items():
+        print(f"{name:>28}: {result['docs_per_second']:8.1f} docs/s {result['mb_per_second']:7.2f} MB/s  p95 {result['latency']['p95_ms']:.1f} ms")
+    for name, result in results["llm_output_parsing"].items():
+        print(f"{name:>28}: {result['us_per_call']:8.1f} us/call ({'valid' if result['valid'] else 'rejected'})")
+    print(f"{'peak rss':>28}: {results['peak_rss_mb']['self']:.0f} MB")
+
+    if args.output:
+        report.write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Compares prompt size (and optionally live latency) with and without prompt compaction.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_prompt_compaction --corpus ./sample_resumes
+    python -m benchmarks.bench_prompt_compaction --live --output compaction.json
+
+Without --corpus a synthetic multi-page corpus is used. Without --live no
+LLM is called and tokens are estimated; with --live each document is sent
+both ways to the configured provider and the reported usage and latency are
+compared.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+if "--live" not in sys.argv:
+    os.environ.setdefault("LLM_PROVIDER", "fake")
+
+import schemas
+import llm_service
+import resume_parser
+import prompt_compaction
+
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+_SECTIONS = ["Experience", "Education", "Projects", "Skills", "Certifications", "Awards"]
+_WORDS = (
+    "designed built led migrated scaled reduced latency improved throughput python fastapi "
+    "postgresql kubernetes docker terraform aws pipelines microservices observability team "
+    "customers revenue dashboards testing automation reliability"
+).split()
+
+
+def synthetic_resume_text(pages: int, seed: int) -> str:
+    """pdfminer-like text: form-feed separated pages with a repeated header and page numbers."""
+    rng = random.Random(seed)
+    header = f"Candidate {seed}  |  candidate{seed}@example.com  |  +1 555 01{seed % 100:02d}"
+    out = []
+    for page in range(1, pages + 1):
+        lines = [header, ""]
+        for section in rng.sample(_SECTIONS, 3):
+            lines.append(section.upper())
+            for _ in range(rng.randint(4, 9)):
+                lines.append("•   " + "  ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 16))))
+            lines.extend(["", "", ""])
+        lines.append(f"Page {page} of {pages}")
+        out.append("\n".join(lines))
+    return "\f".join(out)
+
+
+def estimate_tokens(text: str) -> int:
+    try:
+        import tiktoken
+        return len(tiktoken.get_encoding("cl100k_base").encode(text))
+    except ImportError:
+        return len(text) // 4
+
+
+def load_corpus(corpus_dir: str) -> list:
+    documents = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if not name.lower().endswith(SUPPORTED_EXTENSIONS):
+            continue
+        text = resume_parser.extract_text_from_resume(name, os.path.join(corpus_dir, name))
+        if text:
+            documents.append((name, text))
+    return documents
+
+
+def _unescape(template_text: str) -> str:
+    return template_text.replace("{{", "{").replace("}}", "}")
+
+
+def system_prompts() -> tuple:
+    """(verbose, compact) extraction system prompts, built from the live prompt text."""
+    verbose_schema = json.dumps(schemas.ResumeExtractedData.model_json_schema(), indent=2)
+    compact_schema = prompt_compaction.compact_schema_json(schemas.ResumeExtractedData)
+    current = _unescape(llm_service.SYSTEM_EXTRACTION_CONTENT)
+    in_use = compact_schema if llm_service.PROMPT_COMPACTION_ENABLED else verbose_schema
+    return current.replace(in_use, verbose_schema), current.replace(in_use, compact_schema)
+
+
+async def timed_call(system_text: str, resume_text: str) -> dict:
+    human_text = _unescape(llm_service.HUMAN_EXTRACTION_TEMPLATE).replace("{resume_text}", resume_text)
+    start = time.perf_counter()
+    response = await llm_service.get_llm().ainvoke([("system", system_text), ("human", human_text)])
+    usage = getattr(response, "usage_metadata", None) or {}
+    return {
+        "latency_seconds": time.perf_counter() - start,
+        "input_tokens": usage.get("input_tokens"),
+        "output_tokens": usage.get("output_tokens"),
+    }
+
+
+async def run(documents: list, live: bool) -> dict:
+    verbose_system, compact_system = system_prompts()
+    rows = []
+
+    for name, text in documents:
+        start = time.perf_counter()
+        compact_text = prompt_compaction.normalize_resume_text(text)
+        normalize_ms = (time.perf_counter() - start) * 1000
+
+        row = {
+            "document": name,
+            "verbose_tokens": estimate_tokens(verbose_system + text),
+            "compact_tokens": estimate_tokens(compact_system + compact_text),
+            "normalize_ms": normalize_ms,
+        }
+        if live:
+            row["verbose_live"] = await timed_call(verbose_system, text)
+            row["compact_live"] = await timed_call(compact_system, compact_text)
+        rows.append(row)
+
+    verbose_total = sum(row["verbose_tokens"] for row in rows)
+    compact_total = sum(row["compact_tokens"] for row in rows)
+    summary = {
+        "documents": len(rows),
+        "verbose_tokens": verbose_total,
+        "compact_tokens": compact_total,
+        "tokens_saved": verbose_total - compact_total,
+        "tokens_saved_pct": 100.0 * (verbose_total - compact_total) / verbose_total if verbose_total else 0.0,
+        "schema_tokens_verbose": estimate_tokens(verbose_system),
+        "schema_tokens_compact": estimate_tokens(compact_system),
+        "normalize_ms_p50": statistics.median(row["normalize_ms"] for row in rows) if rows else 0.0,
+    }
+    if live and rows:
+        summary["latency_p50_verbose"] = statistics.median(r["verbose_live"]["latency_seconds"] for r in rows)
+        summary["latency_p50_compact"] = statistics.median(r["compact_live"]["latency_seconds"] for r in rows)
+
+    return {"summary": summary, "documents": rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="Directory of PDF/DOCX/TXT resumes")
+    parser.add_argument("--synthetic", type=int, default=20, help="Synthetic documents when no corpus is given")
+    parser.add_argument("--live", action="store_true", help="Call the configured LLM provider")
+    parser.add_argument("--output", help="Write full results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.corpus:
+        documents = load_corpus(args.corpus)
+    else:
+        documents = [(f"synthetic-{i}", synthetic_resume_text(1 + i % 4, i)) for i in range(args.synthetic)]
+
+    results = asyncio.run(run(documents, args.live))
+
+    for key, value in results["summary"].items():
+        print(f"{key:>24}: {value:.2f}" if isinstance(value, float) else f"{key:>24}: {value}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Per-request CPU time and bytes on the wire for the resume detail response.
+
+Compares serializing the ORM row through ResumeReadSchema (the old path)
+with splicing the payload stored at insert time, plus a `?fields=` sparse
+response and gzip/brotli sizes. Needs no database.
+
+    python -m benchmarks.bench_resume_payloads --iterations 2000 --output payloads.json
+"""
+import json
+import time
+import argparse
+
+from types import SimpleNamespace
+from datetime import datetime, timezone
+
+import schemas
+import compression
+import resume_payloads
+from fake_llm import FAKE_EXTRACTION, FAKE_ANALYSIS
+from benchmarks.bench_prompt_compaction import synthetic_resume_text
+
+
+def sample_row(pages: int) -> SimpleNamespace:
+    # Stands in for a models.Resume row: the schemas read it with from_attributes
+    extracted = schemas.ResumeExtractedData.model_validate(FAKE_EXTRACTION)
+    row = SimpleNamespace(
+        id=1,
+        file_name="resume.pdf",
+        uploaded_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        raw_text=synthetic_resume_text(pages, 1),
+        llm_analysis=FAKE_ANALYSIS,
+        llm_mode="two_pass",
+        **{name: value for name, value in extracted.model_dump(exclude_none=True).items()}
+    )
+    row.payload = resume_payloads.sections_json(row)
+    return row
+
+
+def cpu_per_call(fn, iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def run(iterations: int, pages: int) -> dict:
+    row = sample_row(pages)
+
+    def old_path():
+        return schemas.ResumeReadSchema.model_validate(row).model_dump_json().encode("utf-8")
+
+    def payload_path():
+        return resume_payloads.detail_body(row.id, row.file_name, row.uploaded_at, row.raw_text, row.payload)
+
+    sparse_fields = resume_payloads.parse_fields("llm_analysis")
+    full_body = payload_path()
+
+    def sparse_path():
+        return resume_payloads.select_fields(full_body, sparse_fields)
+
+    assert json.loads(old_path()) == json.loads(full_body), "payload path must match the schema path"
+
+    results = {
+        "iterations": iterations,
+        "cpu_us": {
+            "schema_validate_and_dump": cpu_per_call(old_path, iterations),
+            "stored_payload": cpu_per_call(payload_path, iterations),
+            "sparse_llm_analysis": cpu_per_call(sparse_path, iterations),
+        },
+        "bytes": {
+            "full": len(full_body),
+            "sparse_llm_analysis": len(sparse_path()),
+        },
+    }
+    for encoding in compression.SUPPORTED_ENCODINGS:
+        results["bytes"][f"full_{encoding}"] = len(compression.compress(full_body, encoding))
+        results["cpu_us"][f"compress_{encoding}"] = cpu_per_call(
+            lambda: compression.compress(full_body, encoding), max(1, iterations // 10)
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--pages", type=int, default=2, help="Pages of synthetic raw text in the record")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.pages)
+    for group in ("cpu_us", "bytes"):
+        for key, value in results[group].items():
+            print(f"{group}.{key:>28}: {value:.1f}" if isinstance(value, float) else f"{group}.{key:>28}: {value}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Build time, memory and per-resume scan time of the skill matcher at taxonomy scale.
+
+Pads the shipped taxonomy with synthetic skills up to --skills entries and
+compares one Aho-Corasick pass per resume with a compiled regex per skill
+(timed on a sample of --baseline-skills and extrapolated).
+
+    python -m benchmarks.bench_skill_matcher --skills 50000 --output skills.json
+"""
+import re
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+import skill_taxonomy
+from benchmarks.bench_prompt_compaction import synthetic_resume_text
+
+
+_SYLLABLES = "ka lo mi ne ru ta vo xi ze qu bar dex fin gor hul jet kor lum nix pod".split()
+
+
+def synthetic_skills(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    skills = []
+    for index in range(count):
+        words = ["".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(rng.randint(1, 3))]
+        name = " ".join(words).title()
+        skills.append(skill_taxonomy.Skill(
+            id=f"synthetic_{index}",
+            name=name,
+            category="technical",
+            aliases=[name.replace(" ", "")] if len(words) > 1 else []
+        ))
+    return skills
+
+
+def build(total_skills: int) -> tuple:
+    base = skill_taxonomy.SkillTaxonomy.load(skill_taxonomy.SKILL_TAXONOMY_PATH).skills
+    skills = base + synthetic_skills(max(0, total_skills - len(base)))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    taxonomy = skill_taxonomy.SkillTaxonomy(skills, "bench")
+    build_seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return taxonomy, build_seconds, peak
+
+
+def regex_per_skill_us(taxonomy, texts: list, sample: int) -> float:
+    patterns = []
+    for skill in taxonomy.skills[:sample]:
+        alternatives = "|".join(re.escape(alias) for alias in [skill.name] + skill.aliases)
+        patterns.append(re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)", re.IGNORECASE))
+
+    start = time.perf_counter()
+    for text in texts:
+        for pattern in patterns:
+            pattern.search(text)
+    per_resume = (time.perf_counter() - start) / len(texts) * 1e6
+    return per_resume * len(taxonomy.skills) / len(patterns)
+
+
+def run(total_skills: int, resumes: int, pages: int, baseline_skills: int) -> dict:
+    taxonomy, build_seconds, peak_bytes = build(total_skills)
+    texts = [synthetic_resume_text(pages, seed) for seed in range(resumes)]
+
+    start = time.perf_counter()
+    found = [taxonomy.find(text) for text in texts]
+    scan_us = (time.perf_counter() - start) / len(texts) * 1e6
+
+    return {
+        "skills": len(taxonomy.skills),
+        "matcher_states": taxonomy.matcher.states,
+        "build_seconds": build_seconds,
+        "build_peak_mb": peak_bytes / 2 ** 20,
+        "resume_chars_avg": sum(len(text) for text in texts) / len(texts),
+        "aho_corasick_us_per_resume": scan_us,
+        "regex_per_skill_us_per_resume_extrapolated": regex_per_skill_us(taxonomy, texts, baseline_skills),
+        "skills_found_avg": sum(len(counts) for counts in found) / len(found),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skills", type=int, default=30000, help="Taxonomy size, padded with synthetic skills")
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=2, help="Pages of synthetic text per resume")
+    parser.add_argument("--baseline-skills", type=int, default=500, help="Skills timed for the regex baseline")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.skills, args.resumes, args.pages, args.baseline_skills)
+    for key, value in results.items():
+        print(f"{key:>42}: {value:.2f}" if isinstance(value, float) else f"{key:>42}: {value}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Runs the parsing and load benchmarks and writes one JSON result, optionally compared with an earlier one.
+
+Each benchmark runs in its own interpreter so their peak RSS figures and
+module-level settings do not mix.
+
+    python -m benchmarks.bench_suite --output results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.bench_suite --quick --baseline results/main.json
+
+Arguments after `--` are passed to the load test (e.g. -- --concurrency 32).
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks import report
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUICK_ARGS = {
+    "bench_parsing": ["--per-size", "2", "--repeat", "1", "--iterations", "300"],
+    "bench_load": ["--uploads", "30", "--reads", "200"],
+}
+
+# Leaves compared against a baseline, and whether a higher value is better
+_COMPARED_SUFFIXES = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "us_per_call": False,
+    "docs_per_second": True,
+    "throughput_rps": True,
+    "self": False,
+}
+
+
+def run_benchmark(module: str, args: list) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output = os.path.join(tmp_dir, "results.json")
+        subprocess.run(
+            [sys.executable, "-m", f"benchmarks.{module}", *args, "--output", output],
+            cwd=BACKEND_DIR, check=True
+        )
+        with open(output) as f:
+            return json.load(f)
+
+
+def _flatten(data, prefix: str = "") -> dict:
+    values = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            values.update(_flatten(value, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        values[prefix] = data
+    return values
+
+
+def compare(baseline: dict, current: dict) -> list:
+    """(metric, baseline, current, change) for the latency, throughput and memory figures both runs have."""
+    old, new = _flatten(baseline), _flatten(current)
+    rows = []
+    for path, value in new.items():
+        suffix = path.rsplit(".", 1)[-1]
+        if suffix not in _COMPARED_SUFFIXES or path.startswith("meta.") or path not in old:
+            continue
+        if suffix == "self" and "peak_rss_mb" not in path:
+            continue
+        before = old[path]
+        change = (value - before) / before if before else 0.0
+        rows.append((path, before, value, change, _COMPARED_SUFFIXES[suffix]))
+    return rows
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    load_args = []
+    if "--" in argv:
+        load_args = argv[argv.index("--") + 1:]
+        argv = argv[:argv.index("--")]
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Small corpus and short load test, for a smoke check")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--baseline", help="Earlier suite result to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change reported as a regression")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = {"meta": report.run_metadata({"quick": args.quick, "load_args": load_args})}
+    results["parsing"] = run_benchmark("bench_parsing", QUICK_ARGS["bench_parsing"] if args.quick else [])
+    if not args.skip_load:
+        results["load"] = run_benchmark("bench_load", (QUICK_ARGS["bench_load"] if args.quick else []) + load_args)
+
+    if args.output:
+        report.write_results(args.output, results)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = 0
+        print(f"\nCompared with {args.baseline} ({baseline.get('meta', {}).get('git_commit')}):")
+        for path, before, after, change, higher_is_better in compare(baseline, results):
+            worse = change < -args.threshold if higher_is_better else change > args.threshold
+            regressions += worse
+            print(f"{'REGRESSION ' if worse else '           '}{path}: {before:.2f} -> {after:.2f} ({change:+.1%})")
+        if regressions:
+            print(f"{regressions} metrics regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Synthetic resume corpus in PDF, DOCX and TXT, in several sizes.
+
+Every document has its own text (different seeds), so uploads do not hit
+each other's cache entries. PDFs are written directly (text-only, standard
+Helvetica font) to avoid another dependency; DOCX uses python-docx, which
+the parser needs anyway.
+
+    python -m benchmarks.corpus --output-dir ./corpus --per-size 5 --pages 1,3,10
+"""
+import io
+import os
+import argparse
+
+from typing import List, NamedTuple
+
+from benchmarks.bench_prompt_compaction import synthetic_resume_text
+
+
+FORMATS = ("pdf", "docx", "txt")
+DEFAULT_PAGES = (1, 3, 10)
+
+_PDF_LINES_PER_PAGE = 60
+
+
+class Document(NamedTuple):
+    name: str
+    format: str
+    pages: int
+    content: bytes
+
+
+def make_txt(text: str) -> bytes:
+    return text.replace("\f", "\n\n").encode("utf-8")
+
+
+def make_docx(text: str) -> bytes:
+    from docx import Document as DocxDocument
+
+    document = DocxDocument()
+    for page_index, page in enumerate(text.split("\f")):
+        if page_index:
+            document.add_page_break()
+        for line in page.split("\n"):
+            document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _pdf_escape(line: str) -> str:
+    # The standard fonts cover Latin-1 only; the synthetic bullets become dashes
+    line = line.replace("•", "-").encode("latin-1", "replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text: str) -> bytes:
+    pages = []
+    for page in text.split("\f"):
+        lines = page.split("\n")
+        # Long synthetic pages spill onto further PDF pages rather than running off the bottom
+        for start in range(0, max(1, len(lines)), _PDF_LINES_PER_PAGE):
+            pages.append(lines[start:start + _PDF_LINES_PER_PAGE])
+
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for lines in pages:
+        stream = "BT /F1 10 Tf 12 TL 50 800 Td\n" + "".join(f"({_pdf_escape(line)}) Tj T*\n" for line in lines) + "ET"
+        stream_bytes = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream_bytes), stream_bytes))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref_offset = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+    return out.getvalue()
+
+
+MAKERS = {
+    "pdf": make_pdf,
+    "docx": make_docx,
+    "txt": make_txt,
+}
+
+
+def build_corpus(per_size: int, pages: List[int] = DEFAULT_PAGES, formats: List[str] = FORMATS, seed: int = 0) -> List[Document]:
+    """per_size documents for every (format, page count), each with its own text."""
+    documents = []
+    for format in formats:
+        for page_count in pages:
+            for index in range(per_size):
+                doc_seed = seed + len(documents)
+                text = synthetic_resume_text(page_count, doc_seed)
+                documents.append(Document(
+                    name=f"resume_{doc_seed:05d}_{page_count}p.{format}",
+                    format=format,
+                    pages=page_count,
+                    content=MAKERS[format](text)
+                ))
+    return documents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--per-size", type=int, default=5, help="Documents per format and page count")
+    parser.add_argument("--pages", default=",".join(map(str, DEFAULT_PAGES)), help="Comma-separated page counts")
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    documents = build_corpus(
+        args.per_size, [int(p) for p in args.pages.split(",")], args.formats.split(","), args.seed
+    )
+    os.makedirs(args.output_dir, exist_ok=True)
+    for document in documents:
+        with open(os.path.join(args.output_dir, document.name), "wb") as f:
+            f.write(document.content)
+    print(f"Wrote {len(documents)} documents to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
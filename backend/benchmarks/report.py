@@ -0,0 +1,61 @@
+"""Shared result format of the benchmark suite: latency percentiles, peak RSS and run metadata."""
+import sys
+import json
+import platform
+import resource
+import subprocess
+
+from datetime import datetime, timezone
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    # Nearest-rank on sorted input; exact enough at benchmark sample sizes
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    """Milliseconds: p50/p95/p99, mean and max."""
+    values = sorted(seconds)
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 0.50) * 1000,
+        "p95_ms": percentile(values, 0.95) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "mean_ms": sum(values) / len(values) * 1000 if values else 0.0,
+        "max_ms": values[-1] * 1000 if values else 0.0,
+    }
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    """Peak resident set size of this process and of its finished child processes (parser pool)."""
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 2 ** 20,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit / 2 ** 20,
+    }
+
+
+def run_metadata(parameters: dict) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+    }
+
+
+def write_results(path: str, results: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
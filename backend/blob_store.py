@@ -0,0 +1,241 @@
+"""Compressed, content-addressed storage for resume raw text and original uploads.
+
+Blobs live in the `blobs` table keyed by the SHA-256 of their uncompressed
+content, so an upload seen twice (or two files with the same text) is stored
+once. Content is compressed with zstd when the optional zstandard package is
+installed and with zlib otherwise; the codec is kept per blob, so rows
+written either way stay readable. Resume rows carry only the hashes, which
+keeps them small for list queries; the text is fetched when the detail view,
+export or re-analysis asks for it.
+
+Rows stored before blobs existed keep their text inline until moved:
+
+    python blob_store.py --move-inline
+"""
+import os
+import zlib
+import asyncio
+import logging
+import hashlib
+import argparse
+
+import models
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+from dotenv import load_dotenv
+from sqlalchemy import select, update, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+BLOB_COMPRESSION_LEVEL = int(os.getenv("BLOB_COMPRESSION_LEVEL", "6"))
+BLOB_STORE_ORIGINALS = os.getenv("BLOB_STORE_ORIGINALS", "true").lower() == "true"
+BLOB_MOVE_BATCH_ROWS = int(os.getenv("BLOB_MOVE_BATCH_ROWS", "200"))
+
+
+class PendingBlob(NamedTuple):
+    hash: str
+    codec: str
+    size: int
+    data: bytes
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=BLOB_COMPRESSION_LEVEL).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    if zstandard is None:
+        raise RuntimeError("Blob is zstd-compressed but the zstandard package is not installed")
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+DECOMPRESSORS = {
+    "none": bytes,
+    "zlib": zlib.decompress,
+    "zstd": _zstd_decompress,
+}
+
+
+def compress(data: Union[bytes, memoryview], sha256: Optional[str] = None) -> PendingBlob:
+    """Compresses with the best available codec; content that doesn't shrink (zipped DOCX) is kept as is."""
+    if zstandard is not None:
+        codec, compressed = "zstd", _zstd_compress(data)
+    else:
+        codec, compressed = "zlib", zlib.compress(data, BLOB_COMPRESSION_LEVEL)
+    if len(compressed) >= len(data):
+        codec, compressed = "none", bytes(data)
+    return PendingBlob(sha256 or hashlib.sha256(data).hexdigest(), codec, len(data), compressed)
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec not in DECOMPRESSORS:
+        raise ValueError(f"Unknown blob codec {codec!r}")
+    return DECOMPRESSORS[codec](data)
+
+
+def decode_text(codec: Optional[str], data: Optional[bytes]) -> Optional[str]:
+    """Raw text from a blob's (codec, data) columns, as selected by an outer join; None without a blob."""
+    if codec is None or data is None:
+        return None
+    return decompress(codec, data).decode("utf-8")
+
+
+async def put_blobs(db: AsyncSession, blobs: Iterable[PendingBlob]) -> None:
+    """Adds blobs in the caller's transaction; ones already stored are skipped."""
+    values = {
+        blob.hash: {"hash": blob.hash, "codec": blob.codec, "size": blob.size, "stored_size": len(blob.data), "data": blob.data}
+        for blob in blobs
+    }
+    if not values:
+        return
+
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        dialect_insert = None
+
+    if dialect_insert is not None:
+        statement = dialect_insert(models.Blob).on_conflict_do_nothing(index_elements=["hash"])
+        await db.execute(statement, list(values.values()))
+        return
+
+    existing = set((await db.execute(select(models.Blob.hash).where(models.Blob.hash.in_(values)))).scalars())
+    new_values = [value for blob_hash, value in values.items() if blob_hash not in existing]
+    if new_values:
+        await db.execute(insert(models.Blob), new_values)
+
+
+async def get_blobs(db: AsyncSession, hashes: Iterable[str]) -> Dict[str, bytes]:
+    """Uncompressed content by hash; hashes without a blob are left out."""
+    hashes = set(hashes)
+    if not hashes:
+        return {}
+    result = await db.execute(
+        select(models.Blob.hash, models.Blob.codec, models.Blob.data).where(models.Blob.hash.in_(hashes))
+    )
+    return {row.hash: decompress(row.codec, row.data) for row in result}
+
+
+async def get_blob(db: AsyncSession, blob_hash: str) -> Optional[bytes]:
+    return (await get_blobs(db, [blob_hash])).get(blob_hash)
+
+
+async def store_raw_texts(db: AsyncSession, db_resumes: List[models.Resume]) -> None:
+    """Writes the raw text of new rows as blobs and points the rows at them; call before the flush."""
+    blobs = []
+    for db_resume in db_resumes:
+        if db_resume.raw_text:
+            blob = compress(db_resume.raw_text.encode("utf-8"))
+            db_resume.raw_text_hash = blob.hash
+            blobs.append(blob)
+    await put_blobs(db, blobs)
+
+
+async def load_raw_texts(db: AsyncSession, db_resumes: List[models.Resume]) -> None:
+    """Sets `raw_text` on loaded rows, from their blob or from the inline column of older rows."""
+    texts = await get_blobs(db, (row.raw_text_hash for row in db_resumes if row.raw_text_hash))
+    legacy_ids = [row.id for row in db_resumes if not row.raw_text_hash]
+    inline = {}
+    if legacy_ids:
+        result = await db.execute(
+            select(models.Resume.id, models.Resume.legacy_raw_text).where(models.Resume.id.in_(legacy_ids))
+        )
+        inline = dict(result.all())
+    for db_resume in db_resumes:
+        if db_resume.raw_text_hash:
+            text = texts.get(db_resume.raw_text_hash)
+            db_resume.raw_text = text.decode("utf-8") if text is not None else None
+        else:
+            db_resume.raw_text = inline.get(db_resume.id)
+
+
+def _read_source(source: Union[bytes, memoryview, str]) -> Union[bytes, memoryview]:
+    if isinstance(source, (bytes, memoryview)):
+        return source
+    with open(source, "rb") as f:
+        return f.read()
+
+
+async def store_original(source: Union[bytes, memoryview, str], sha256: Optional[str] = None) -> Optional[str]:
+    """Stores an uploaded file (bytes or a path) in its own short transaction; returns its hash.
+
+    Known files are not read or compressed again. Returns None when originals
+    are not kept (BLOB_STORE_ORIGINALS=false) or storing failed; the resume is
+    saved either way.
+    """
+    if not BLOB_STORE_ORIGINALS:
+        return None
+    from db import SessionLocal
+
+    try:
+        if sha256 is not None:
+            async with SessionLocal() as db:
+                known = await db.execute(select(models.Blob.hash).where(models.Blob.hash == sha256))
+                if known.scalar_one_or_none() is not None:
+                    return sha256
+        # Read and compressed off the event loop and without holding a connection
+        blob = await asyncio.to_thread(lambda: compress(_read_source(source), sha256))
+        async with SessionLocal() as db:
+            await put_blobs(db, [blob])
+            await db.commit()
+            return blob.hash
+    except Exception as e:
+        logger.warning("Failed to store original upload: %s", e)
+        return None
+
+
+async def move_inline_raw_text(batch_rows: int = BLOB_MOVE_BATCH_ROWS) -> int:
+    """Moves the inline raw text of older rows into blobs, one transaction per batch; returns rows moved."""
+    from db import SessionLocal
+
+    moved = 0
+    after_id = 0
+    while True:
+        async with SessionLocal() as db:
+            rows = (await db.execute(
+                select(models.Resume.id, models.Resume.legacy_raw_text)
+                .where(models.Resume.id > after_id, models.Resume.raw_text_hash.is_(None))
+                .order_by(models.Resume.id)
+                .limit(batch_rows)
+            )).all()
+            if not rows:
+                return moved
+
+            blobs = {row.id: compress(row.legacy_raw_text.encode("utf-8")) for row in rows if row.legacy_raw_text}
+            await put_blobs(db, blobs.values())
+            # Bulk UPDATE by primary key, one statement for the batch
+            await db.execute(update(models.Resume), [
+                {"id": row.id, "raw_text_hash": blobs[row.id].hash if row.id in blobs else None, "legacy_raw_text": None}
+                for row in rows
+            ])
+            await db.commit()
+
+        after_id = rows[-1].id
+        moved += len(blobs)
+        print(f"Moved raw text of {moved} resumes (up to id {after_id})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--move-inline", action="store_true", help="Move inline raw text of older rows into blobs")
+    parser.add_argument("--batch-rows", type=int, default=BLOB_MOVE_BATCH_ROWS)
+    args = parser.parse_args()
+    if not args.move_inline:
+        parser.print_help()
+        return
+    print(f"Done: {asyncio.run(move_inline_raw_text(args.batch_rows))} resumes moved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import hashlib
+import threading
+
+from typing import Optional, Dict
+from dotenv import load_dotenv
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "result_cache.sqlite3")
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+# Writes between full recounts of the table; other processes sharing the file make the running totals drift
+RESULT_CACHE_RECOUNT_WRITES = int(os.getenv("RESULT_CACHE_RECOUNT_WRITES", "1000"))
+
+# Cache layers:
+#   text       - file bytes hash                          -> extracted raw text
+#   extraction - normalized text hash + prompt + model    -> ResumeExtractedData JSON
+#   analysis   - extraction hash + prompt + model         -> LLMAnalysisSchema JSON
+LAYERS = ("text", "extraction", "analysis")
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def hash_text(text: str) -> str:
+    return hash_bytes(text.encode("utf-8"))
+
+
+def normalize_text(text: str) -> str:
+    # Collapse whitespace so cosmetic differences between uploads share a key
+    return " ".join(text.split())
+
+
+def make_key(*parts: str) -> str:
+    return hash_text("\x1f".join(parts))
+
+
+class ResultCache:
+    """Persistent, size-bounded LRU cache backed by a local SQLite file.
+
+    The methods block on SQLite; code on the event loop uses the async
+    variants (aget, aset, ...), which run them in a worker thread.
+    """
+
+    def __init__(self, path: str, max_entries: int, max_bytes: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS cache_entries (
+                layer TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (layer, key)
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_cache_entries_last_access ON cache_entries (last_access)"
+        )
+        self.hits: Dict[str, int] = {layer: 0 for layer in LAYERS}
+        self.misses: Dict[str, int] = {layer: 0 for layer in LAYERS}
+        self.evictions = 0
+        # Running totals, so writes don't scan the table; recounted every RESULT_CACHE_RECOUNT_WRITES writes
+        self.entries, self.total_bytes = self._count()
+        self._writes_since_count = 0
+
+    def _count(self) -> tuple:
+        return self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+
+    def get(self, layer: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache_entries WHERE layer = ? AND key = ?", (layer, key)
+            ).fetchone()
+            if row is None:
+                self.misses[layer] += 1
+                return None
+            self._conn.execute(
+                "UPDATE cache_entries SET last_access = ? WHERE layer = ? AND key = ?",
+                (time.time(), layer, key)
+            )
+            self.hits[layer] += 1
+            return row[0]
+
+    def set(self, layer: str, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            replaced = self._conn.execute(
+                "SELECT size FROM cache_entries WHERE layer = ? AND key = ?", (layer, key)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (layer, key, value, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (layer, key, value, size, time.time())
+            )
+            if replaced is None:
+                self.entries += 1
+                self.total_bytes += size
+            else:
+                self.total_bytes += size - replaced[0]
+
+            self._writes_since_count += 1
+            if self._writes_since_count >= RESULT_CACHE_RECOUNT_WRITES:
+                self._writes_since_count = 0
+                self.entries, self.total_bytes = self._count()
+            self._evict()
+
+    def _evict(self) -> None:
+        if self.entries <= self.max_entries and self.total_bytes <= self.max_bytes:
+            return
+        # Totals may be stale when other processes share the file; check before deleting anything
+        self.entries, self.total_bytes = self._count()
+
+        while self.entries > self.max_entries or self.total_bytes > self.max_bytes:
+            # Drop the least recently used tenth in one statement instead of row by row
+            batch = max(1, self.entries // 10, self.entries - self.max_entries)
+            sizes = self._conn.execute(
+                """DELETE FROM cache_entries WHERE rowid IN (
+                    SELECT rowid FROM cache_entries ORDER BY last_access ASC LIMIT ?
+                ) RETURNING size""",
+                (batch,)
+            ).fetchall()
+            if not sizes:
+                break
+            self.evictions += len(sizes)
+            self.entries -= len(sizes)
+            self.total_bytes -= sum(size for size, in sizes)
+
+    def get_json(self, layer: str, key: str) -> Optional[dict]:
+        value = self.get(layer, key)
+        return json.loads(value) if value is not None else None
+
+    def set_json(self, layer: str, key: str, value: dict) -> None:
+        self.set(layer, key, json.dumps(value, separators=(",", ":")))
+
+    async def aget(self, layer: str, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self.get, layer, key)
+
+    async def aset(self, layer: str, key: str, value: str) -> None:
+        await asyncio.to_thread(self.set, layer, key, value)
+
+    async def aget_json(self, layer: str, key: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.get_json, layer, key)
+
+    async def aset_json(self, layer: str, key: str, value: dict) -> None:
+        await asyncio.to_thread(self.set_json, layer, key, value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self.entries, self.total_bytes = self._count()
+        return {
+            "entries": self.entries,
+            "bytes": self.total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+        }
+
+
+result_cache: Optional[ResultCache] = None
+
+if RESULT_CACHE_ENABLED:
+    try:
+        result_cache = ResultCache(RESULT_CACHE_PATH, RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_MAX_BYTES)
+    except sqlite3.Error as e:
+        logger.error("Failed to open result cache at %s: %s", RESULT_CACHE_PATH, e)
@@ -0,0 +1,52 @@
+import os
+import gzip
+
+from typing import Optional
+from dotenv import load_dotenv
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+load_dotenv()
+
+# Bodies smaller than this go out uncompressed; the framing costs more than it saves
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+# Preferred first; brotli only when the optional package is installed
+SUPPORTED_ENCODINGS = (("br",) if brotli is not None else ()) + ("gzip",)
+
+
+def choose_encoding(accept_encoding: Optional[str], size: int) -> Optional[str]:
+    if not accept_encoding or size < COMPRESSION_MIN_BYTES:
+        return None
+
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in SUPPORTED_ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        # mtime=0 keeps the output identical for identical input
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
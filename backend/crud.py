@@ -1,12 +1,24 @@
 import models
+import logging
 import schemas
+import resume_fields
+import search
+import matching
+import blob_store
+import metrics
+import resume_payloads
 
-from typing import Optional, List
+from datetime import datetime
+from typing import NamedTuple, Optional, List, Tuple
+from skill_taxonomy import get_skill_taxonomy
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, tuple_, func
 from sqlalchemy.exc import SQLAlchemyError
 
 
+logger = logging.getLogger(__name__)
+
+
 async def get_resume_by_id(db: AsyncSession, resume_id: int) -> Optional[models.Resume]:
     try:
         result = await db.execute(
@@ -14,10 +26,70 @@ async def get_resume_by_id(db: AsyncSession, resume_id: int) -> Optional[models.
         )
         return result.scalar_one_or_none()
     except SQLAlchemyError as e:
-        print(f"Error fetching resume by ID {resume_id}: {e}")
+        logger.exception("Error fetching resume by ID %s: %s", resume_id, e)
+        return None
+
+
+async def get_resume_id_by_job_id(db: AsyncSession, job_id: str) -> Optional[int]:
+    try:
+        result = await db.execute(select(models.Resume.id).where(models.Resume.job_id == job_id))
+        return result.scalar_one_or_none()
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching resume for job %s: %s", job_id, e)
+        return None
+
+
+class ResumeDetailRow(NamedTuple):
+    id: int
+    file_name: str
+    uploaded_at: datetime
+    raw_text: Optional[str]
+    payload: Optional[str]
+
+
+async def get_resume_version(db: AsyncSession, resume_id: int) -> Optional[int]:
+    """The row version the read cache is keyed on (0 for a row never updated); None if there is no such resume."""
+    try:
+        result = await db.execute(
+            select(func.coalesce(models.Resume.version, 0)).where(models.Resume.id == resume_id)
+        )
+        return result.scalar_one_or_none()
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching version of resume %s: %s", resume_id, e)
         return None
 
 
+async def get_resume_detail_row(db: AsyncSession, resume_id: int) -> Optional[ResumeDetailRow]:
+    """Returns (id, file_name, uploaded_at, raw_text, payload) without loading the JSON columns.
+
+    The raw text blob comes back in the same query through an outer join.
+    """
+    try:
+        result = await db.execute(
+            select(
+                models.Resume.id,
+                models.Resume.file_name,
+                models.Resume.uploaded_at,
+                models.Resume.legacy_raw_text,
+                models.Resume.payload,
+                models.Blob.codec,
+                models.Blob.data,
+            )
+            .outerjoin(models.Blob, models.Blob.hash == models.Resume.raw_text_hash)
+            .where(models.Resume.id == resume_id)
+        )
+        row = result.one_or_none()
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching resume detail by ID %s: %s", resume_id, e)
+        return None
+    if row is None:
+        return None
+    raw_text = blob_store.decode_text(row.codec, row.data)
+    return ResumeDetailRow(
+        row.id, row.file_name, row.uploaded_at, raw_text if raw_text is not None else row.legacy_raw_text, row.payload
+    )
+
+
 async def get_all_resumes(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.Resume]:
     try:
         result = await db.execute(
@@ -28,53 +100,298 @@ async def get_all_resumes(db: AsyncSession, skip: int = 0, limit: int = 100) ->
         )
         return result.scalars().all()
     except SQLAlchemyError as e:
-        print(f"Error fetching all resumes: {e}")
+        logger.exception("Error fetching all resumes: %s", e)
         return []
 
 
-async def create_resume_entry(
+async def get_resume_list_page(
     db: AsyncSession,
+    limit: int = 20,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    skip: int = 0,
+    filters: Optional[schemas.ResumeFilterSchema] = None
+) -> list:
+    """Returns list rows (id, file_name, uploaded_at, name, email, rating), newest first.
+
+    Only the listed columns are selected. With a cursor, the page starts after
+    that (uploaded_at, id) position using the composite index, so the cost
+    doesn't grow with page depth like OFFSET does.
+    """
+    try:
+        query = (
+            select(
+                models.Resume.id,
+                models.Resume.file_name,
+                models.Resume.uploaded_at,
+                # Rows stored before the denormalized columns existed fall back to the JSON
+                func.coalesce(
+                    models.Resume.candidate_name,
+                    models.Resume.contact_info["name"].as_string()
+                ).label("name"),
+                func.coalesce(
+                    models.Resume.candidate_email,
+                    models.Resume.contact_info["email"].as_string()
+                ).label("email"),
+                models.Resume.resume_rating,
+            )
+            .order_by(models.Resume.uploaded_at.desc(), models.Resume.id.desc())
+            .limit(limit)
+        )
+        if filters is not None:
+            query = apply_resume_filters(query, filters)
+        if cursor is not None:
+            query = query.where(
+                # Typed like the columns, so the timestamp binds in the stored format
+                tuple_(models.Resume.uploaded_at, models.Resume.id) < tuple_(
+                    cursor[0], cursor[1], types=[models.Resume.uploaded_at.type, models.Resume.id.type]
+                )
+            )
+        elif skip:
+            query = query.offset(skip)
+
+        result = await db.execute(query)
+        return result.all()
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching resume list page: %s", e)
+        return []
+
+
+async def search_resumes(
+    db: AsyncSession,
+    terms: str,
+    limit: int = 20,
+    offset: int = 0,
+    filters: Optional[schemas.ResumeFilterSchema] = None
+) -> list:
+    """Ranked full-text matches as list rows plus `score`, best first."""
+    query = search.search_query(db, terms)
+    if query is None:
+        return []
+    try:
+        query = query.add_columns(
+            models.Resume.id,
+            models.Resume.file_name,
+            models.Resume.uploaded_at,
+            models.Resume.candidate_name.label("name"),
+            models.Resume.candidate_email.label("email"),
+            models.Resume.resume_rating,
+        ).limit(limit).offset(offset)
+        if filters is not None:
+            query = apply_resume_filters(query, filters)
+
+        result = await db.execute(query)
+        return result.all()
+    except SQLAlchemyError as e:
+        logger.exception("Error searching resumes for %r: %s", terms, e)
+        return []
+
+
+async def get_resume_list_rows_by_ids(db: AsyncSession, resume_ids: List[int]) -> list:
+    """List rows (id, file_name, uploaded_at, name, email, rating) for the given ids, in no particular order."""
+    if not resume_ids:
+        return []
+    try:
+        result = await db.execute(
+            select(
+                models.Resume.id,
+                models.Resume.file_name,
+                models.Resume.uploaded_at,
+                models.Resume.candidate_name.label("name"),
+                models.Resume.candidate_email.label("email"),
+                models.Resume.resume_rating,
+            ).where(models.Resume.id.in_(resume_ids))
+        )
+        return result.all()
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching %d resumes by ID: %s", len(resume_ids), e)
+        return []
+
+
+def apply_resume_filters(query, filters: schemas.ResumeFilterSchema):
+    """Adds WHERE clauses on the denormalized, indexed columns only."""
+    if filters.min_rating is not None:
+        query = query.where(models.Resume.resume_rating >= filters.min_rating)
+    if filters.max_rating is not None:
+        query = query.where(models.Resume.resume_rating <= filters.max_rating)
+    if filters.min_experience_months is not None:
+        query = query.where(models.Resume.total_experience_months >= filters.min_experience_months)
+    if filters.max_experience_months is not None:
+        query = query.where(models.Resume.total_experience_months <= filters.max_experience_months)
+    if filters.min_degree is not None:
+        query = query.where(
+            models.Resume.highest_degree_level >= resume_fields.DEGREE_LEVELS[filters.min_degree]
+        )
+    if filters.name:
+        query = query.where(models.Resume.candidate_name == filters.name)
+    if filters.email:
+        query = query.where(models.Resume.candidate_email == filters.email.lower())
+    if filters.role:
+        query = query.where(
+            models.Resume.id.in_(
+                select(models.ResumeRole.resume_id)
+                .where(models.ResumeRole.role == resume_fields.normalize_role(filters.role))
+            )
+        )
+    if filters.skill:
+        taxonomy = get_skill_taxonomy()
+        skill = taxonomy.lookup(filters.skill) if taxonomy else None
+        query = query.where(
+            models.Resume.id.in_(
+                select(models.ResumeSkill.resume_id)
+                .where(models.ResumeSkill.skill_id == (skill.id if skill else filters.skill))
+            )
+        )
+    return query
+
+
+def build_resume(
     file_name: str,
     raw_text: str,
     extracted_data: Optional[schemas.ResumeExtractedData],
+    llm_analysis_data: Optional[schemas.LLMAnalysisSchema],
+    llm_mode: Optional[str] = None,
+    file_hash: Optional[str] = None,
+    job_id: Optional[str] = None
+) -> models.Resume:
+    """A new, unsaved resume; its raw text goes to a blob when it is saved (see blob_store.store_raw_texts)."""
+    db_resume = models.Resume(
+        file_name=file_name, file_hash=file_hash, job_id=job_id, llm_mode=llm_mode, roles=[], canonical_skills=[]
+    )
+    db_resume.raw_text = raw_text
+    populate_resume(db_resume, extracted_data, llm_analysis_data)
+    return db_resume
+
+
+def populate_resume(
+    db_resume: models.Resume,
+    extracted_data: Optional[schemas.ResumeExtractedData],
     llm_analysis_data: Optional[schemas.LLMAnalysisSchema]
+) -> None:
+    """Sets the structured columns, the indexed fields derived from them and the serialized payload.
+
+    `db_resume.roles` and `db_resume.canonical_skills` must already be loaded (or new) since they are replaced,
+    and `llm_mode` must already be set since it is part of the payload.
+    """
+    db_resume.contact_info = extracted_data.contact_info.model_dump(exclude_none=True) \
+        if extracted_data and extracted_data.contact_info else None
+    db_resume.summary = extracted_data.summary if extracted_data else None
+    db_resume.work_experience = [
+        exp.model_dump(exclude_none=True) for exp in extracted_data.work_experience
+    ] if extracted_data and extracted_data.work_experience else []
+    db_resume.education = [
+        edu.model_dump(exclude_none=True) for edu in extracted_data.education
+    ] if extracted_data and extracted_data.education else []
+    db_resume.skills = extracted_data.skills.model_dump(exclude_none=True) \
+        if extracted_data and extracted_data.skills else None
+    db_resume.projects = [
+        proj.model_dump(exclude_none=True) for proj in extracted_data.projects
+    ] if extracted_data and extracted_data.projects else []
+    db_resume.certifications = [
+        cert.model_dump(exclude_none=True) for cert in extracted_data.certifications
+    ] if extracted_data and extracted_data.certifications else []
+    db_resume.awards = [
+        award.model_dump(exclude_none=True) for award in extracted_data.awards
+    ] if extracted_data and extracted_data.awards else []
+    db_resume.llm_analysis = llm_analysis_data.model_dump(exclude_none=True) \
+        if llm_analysis_data else None
+
+    contact_info = extracted_data.contact_info if extracted_data else None
+    degree = resume_fields.highest_degree(extracted_data.education) if extracted_data else None
+
+    db_resume.candidate_name = contact_info.name.strip() if contact_info and contact_info.name else None
+    db_resume.candidate_email = contact_info.email.lower() if contact_info and contact_info.email else None
+    db_resume.resume_rating = llm_analysis_data.resume_rating if llm_analysis_data else None
+    db_resume.total_experience_months = (
+        resume_fields.total_experience_months(extracted_data.work_experience) if extracted_data else None
+    )
+    db_resume.highest_degree = degree
+    db_resume.highest_degree_level = resume_fields.DEGREE_LEVELS[degree] if degree else None
+    db_resume.roles = [
+        models.ResumeRole(role=role) for role in resume_fields.potential_roles(llm_analysis_data)
+    ]
+    taxonomy = get_skill_taxonomy()
+    db_resume.canonical_skills = [
+        models.ResumeSkill(skill_id=skill_id) for skill_id in taxonomy.skill_ids(extracted_data.skills)
+    ] if taxonomy and extracted_data else []
+    db_resume.payload = resume_payloads.sections_json(db_resume)
+
+
+def stored_extraction(db_resume: models.Resume) -> Optional[schemas.ResumeExtractedData]:
+    """The structured sections of a loaded row, as populate_resume takes them."""
+    extracted_data = schemas.ResumeExtractedData.model_validate(db_resume, from_attributes=True)
+    # Rows saved after a failed extraction have raw text only
+    return extracted_data if extracted_data.model_dump(exclude_defaults=True) else None
+
+
+def stored_analysis(db_resume: models.Resume) -> Optional[schemas.LLMAnalysisSchema]:
+    return schemas.LLMAnalysisSchema.model_validate(db_resume.llm_analysis) if db_resume.llm_analysis else None
+
+
+async def create_resume_entry(
+    db: AsyncSession,
+    file_name: str,
+    raw_text: str,
+    extracted_data: Optional[schemas.ResumeExtractedData],
+    llm_analysis_data: Optional[schemas.LLMAnalysisSchema],
+    llm_mode: Optional[str] = None,
+    file_hash: Optional[str] = None,
+    job_id: Optional[str] = None
 ) -> Optional[models.Resume]:
-    try:
-        db_resume = models.Resume(
-            file_name=file_name,
-            raw_text=raw_text,
-            contact_info=extracted_data.contact_info.model_dump(exclude_none=True)
-                if extracted_data and extracted_data.contact_info else None,
-            summary=extracted_data.summary if extracted_data else None,
-            work_experience=[
-                exp.model_dump(exclude_none=True) for exp in extracted_data.work_experience
-            ] if extracted_data and extracted_data.work_experience else [],
-            education=[
-                edu.model_dump(exclude_none=True) for edu in extracted_data.education
-            ] if extracted_data and extracted_data.education else [],
-            skills=extracted_data.skills.model_dump(exclude_none=True)
-                if extracted_data and extracted_data.skills else None,
-            projects=[
-                proj.model_dump(exclude_none=True) for proj in extracted_data.projects
-            ] if extracted_data and extracted_data.projects else [],
-            certifications=[
-                cert.model_dump(exclude_none=True) for cert in extracted_data.certifications
-            ] if extracted_data and extracted_data.certifications else [],
-            awards=[
-                award.model_dump(exclude_none=True) for award in extracted_data.awards
-            ] if extracted_data and extracted_data.awards else [],
-            llm_analysis=llm_analysis_data.model_dump(exclude_none=True)
-                if llm_analysis_data else None
-        )
+    with metrics.stage("db_write") as span:
+        try:
+            db_resume = build_resume(file_name, raw_text, extracted_data, llm_analysis_data, llm_mode, file_hash, job_id)
 
-        db.add(db_resume)
-        await db.commit()
-        await db.refresh(db_resume)
-        return db_resume
+            await blob_store.store_raw_texts(db, [db_resume])
+            db.add(db_resume)
+            await search.index_resumes(db, [db_resume])
+            await db.commit()
+            await matching.index_resumes([db_resume])
+            return db_resume
 
-    except Exception as e:
-        await db.rollback()
-        import traceback
-        print(f"Error creating resume entry for {file_name}: {e}")
-        traceback.print_exc()
-        return None
+        except Exception as e:
+            span.fail()
+            await db.rollback()
+            logger.exception("Error creating resume entry for %s: %s", file_name, e)
+            return None
+
+
+async def update_resume_entries(db: AsyncSession, db_resumes: List[models.Resume]) -> bool:
+    """Commits in-place changes to loaded resumes in one transaction and re-indexes them.
+
+    `raw_text` must be loaded (blob_store.load_raw_texts) since the full-text index covers it.
+    """
+    with metrics.stage("db_write") as span:
+        try:
+            for db_resume in db_resumes:
+                # Moves every worker's read cache on to the new content (see read_cache.py)
+                db_resume.version = (db_resume.version or 0) + 1
+            await search.index_resumes(db, db_resumes)
+            await db.commit()
+            await matching.index_resumes(db_resumes)
+            return True
+
+        except Exception as e:
+            span.fail()
+            await db.rollback()
+            logger.exception("Error updating %d resume entries: %s", len(db_resumes), e)
+            return False
+
+
+async def create_resume_entries(db: AsyncSession, db_resumes: List[models.Resume]) -> List[models.Resume]:
+    """Inserts many resumes, and blobs for their raw text, in a single transaction."""
+    if not db_resumes:
+        return []
+    with metrics.stage("db_write") as span:
+        try:
+            await blob_store.store_raw_texts(db, db_resumes)
+            db.add_all(db_resumes)
+            await search.index_resumes(db, db_resumes)
+            await db.commit()
+            await matching.index_resumes(db_resumes)
+            return db_resumes
+
+        except Exception as e:
+            span.fail()
+            await db.rollback()
+            logger.exception("Error creating %d resume entries in bulk: %s", len(db_resumes), e)
+            return []
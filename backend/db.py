@@ -1,16 +1,30 @@
 import os
 import ssl
+import time
+import metrics
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
+# Logs every SQL statement; for local debugging only
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+# Connections kept open, extra ones allowed under bursts, and how long a checkout may wait
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+# -1 never recycles; set below the server's or proxy's idle timeout
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "-1"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
 
 if not SQLALCHEMY_DATABASE_URL:
     print("Database URL not provided")
@@ -23,8 +37,45 @@ if not SQLALCHEMY_DATABASE_URL:
 
 ssl_context = ssl.create_default_context()
 
-# Create the async engine (note: echo=True logs SQL queries)
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=True, connect_args={"ssl": ssl_context})
+# TLS for the hosted Postgres; SQLite (local runs, benchmarks) takes no ssl argument
+connect_args = {"ssl": ssl_context} if make_url(SQLALCHEMY_DATABASE_URL).get_backend_name() == "postgresql" else {}
+
+
+POOL_CHECKOUT_SECONDS = metrics.histogram(
+    "db_pool_checkout_seconds", "Time to get a connection from the pool, waiting included.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+POOL_TIMEOUTS = metrics.counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS."
+)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """The default async pool, recording how long every checkout takes."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+
+# Create the async engine (DB_ECHO=true logs SQL queries)
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    echo=DB_ECHO,
+    connect_args=connect_args,
+    poolclass=TimedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
 
 # SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,296 @@
+"""Streams stored resumes out as NDJSON, CSV or Parquet.
+
+Rows are fetched in chunks through a server-side cursor and encoded as they
+arrive, so memory use does not depend on table size. Used by
+GET /resumes/export and as a CLI:
+
+    python export.py --format parquet --output resumes.parquet --from 2024-01-01
+    python export.py --columns id,candidate_name,resume_rating,skills
+
+Parquet needs the optional pyarrow package.
+"""
+import io
+import os
+import csv
+import json
+import asyncio
+import argparse
+
+import crud
+import models
+import schemas
+import blob_store
+
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional
+from dotenv import load_dotenv
+from sqlalchemy import func, select
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+load_dotenv()
+
+# Rows per fetch from the cursor, and per Parquet row group
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "500"))
+
+# name -> (column expression, kind); kinds drive CSV/Parquet encoding
+EXPORT_COLUMNS = {
+    "id": (models.Resume.id, "int"),
+    "file_name": (models.Resume.file_name, "str"),
+    "uploaded_at": (models.Resume.uploaded_at, "datetime"),
+    # Rows stored before the denormalized columns existed fall back to the JSON, as in the list endpoint
+    "candidate_name": (func.coalesce(models.Resume.candidate_name, models.Resume.contact_info["name"].as_string()), "str"),
+    "candidate_email": (func.coalesce(models.Resume.candidate_email, models.Resume.contact_info["email"].as_string()), "str"),
+    "resume_rating": (models.Resume.resume_rating, "float"),
+    "total_experience_months": (models.Resume.total_experience_months, "int"),
+    "highest_degree": (models.Resume.highest_degree, "str"),
+    "llm_mode": (models.Resume.llm_mode, "str"),
+    "summary": (models.Resume.summary, "str"),
+    "contact_info": (models.Resume.contact_info, "json"),
+    "work_experience": (models.Resume.work_experience, "json"),
+    "education": (models.Resume.education, "json"),
+    "skills": (models.Resume.skills, "json"),
+    "projects": (models.Resume.projects, "json"),
+    "certifications": (models.Resume.certifications, "json"),
+    "awards": (models.Resume.awards, "json"),
+    "llm_analysis": (models.Resume.llm_analysis, "json"),
+    # Inline text of older rows; newer rows' blobs are joined in by export_query
+    "raw_text": (models.Resume.legacy_raw_text, "str"),
+}
+
+# Labels of the raw text blob columns, decoded into "raw_text" by stream_export
+_RAW_TEXT_CODEC = "_raw_text_codec"
+_RAW_TEXT_DATA = "_raw_text_data"
+
+
+def parse_columns(columns: Optional[str]) -> List[str]:
+    """Parses a comma-separated column list, keeping the requested order; None means every column."""
+    if columns is None:
+        return list(EXPORT_COLUMNS)
+    requested = [name.strip() for name in columns.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in EXPORT_COLUMNS]
+    if unknown or not requested:
+        raise ValueError(f"Unknown columns: {', '.join(unknown) or '(none given)'}. Allowed: {', '.join(EXPORT_COLUMNS)}")
+    return list(dict.fromkeys(requested))
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes; server_default=now() stores UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class NdjsonEncoder:
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+
+    def start(self) -> bytes:
+        return b""
+
+    def encode(self, rows: List[Dict]) -> bytes:
+        lines = []
+        for row in rows:
+            if "uploaded_at" in row and row["uploaded_at"] is not None:
+                row["uploaded_at"] = _utc(row["uploaded_at"]).isoformat()
+            lines.append(json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+        return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class CsvEncoder:
+    """One row per resume; JSON columns are embedded as JSON strings."""
+
+    media_type = "text/csv; charset=utf-8"
+    extension = "csv"
+
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+        self.json_columns = {name for name in columns if EXPORT_COLUMNS[name][1] == "json"}
+
+    def _write(self, rows: List[List]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+    def start(self) -> bytes:
+        return self._write([self.columns])
+
+    def encode(self, rows: List[Dict]) -> bytes:
+        out = []
+        for row in rows:
+            values = []
+            for name in self.columns:
+                value = row[name]
+                if value is not None and name in self.json_columns:
+                    value = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+                elif isinstance(value, datetime):
+                    value = _utc(value).isoformat()
+                values.append(value)
+            out.append(values)
+        return self._write(out)
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting what the Parquet writer produces, drained after every row group."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+class ParquetEncoder:
+    """A row group per fetched chunk; JSON columns are stored as JSON strings."""
+
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self, columns: List[str]):
+        if pyarrow is None:
+            raise RuntimeError("Parquet export needs the pyarrow package")
+        types = {
+            "int": pyarrow.int64(),
+            "float": pyarrow.float64(),
+            "str": pyarrow.string(),
+            "json": pyarrow.string(),
+            "datetime": pyarrow.timestamp("us", tz="UTC"),
+        }
+        self.columns = columns
+        self.json_columns = {name for name in columns if EXPORT_COLUMNS[name][1] == "json"}
+        self.schema = pyarrow.schema([(name, types[EXPORT_COLUMNS[name][1]]) for name in columns])
+        self.sink = _ChunkSink()
+        self.writer = pyarrow.parquet.ParquetWriter(self.sink, self.schema, compression="zstd")
+
+    def start(self) -> bytes:
+        return self.sink.drain()
+
+    def encode(self, rows: List[Dict]) -> bytes:
+        data = {name: [] for name in self.columns}
+        for row in rows:
+            for name in self.columns:
+                value = row[name]
+                if value is not None and name in self.json_columns:
+                    value = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+                elif isinstance(value, datetime):
+                    value = _utc(value)
+                data[name].append(value)
+        self.writer.write_table(pyarrow.table(data, schema=self.schema))
+        return self.sink.drain()
+
+    def finish(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+
+EXPORT_FORMATS = {
+    "ndjson": NdjsonEncoder,
+    "csv": CsvEncoder,
+    "parquet": ParquetEncoder,
+}
+
+
+def export_query(
+    columns: List[str],
+    uploaded_from: Optional[datetime] = None,
+    uploaded_to: Optional[datetime] = None,
+    filters: Optional[schemas.ResumeFilterSchema] = None
+):
+    query = select(*(EXPORT_COLUMNS[name][0].label(name) for name in columns)).order_by(models.Resume.id)
+    if "raw_text" in columns:
+        query = query.add_columns(
+            models.Blob.codec.label(_RAW_TEXT_CODEC), models.Blob.data.label(_RAW_TEXT_DATA)
+        ).outerjoin_from(models.Resume, models.Blob, models.Blob.hash == models.Resume.raw_text_hash)
+    if uploaded_from is not None:
+        query = query.where(models.Resume.uploaded_at >= uploaded_from)
+    if uploaded_to is not None:
+        query = query.where(models.Resume.uploaded_at < uploaded_to)
+    if filters is not None:
+        query = crud.apply_resume_filters(query, filters)
+    return query
+
+
+def _row_values(row) -> Dict:
+    values = dict(row._mapping)
+    if _RAW_TEXT_DATA in values:
+        text = blob_store.decode_text(values.pop(_RAW_TEXT_CODEC), values.pop(_RAW_TEXT_DATA))
+        if text is not None:
+            values["raw_text"] = text
+    return values
+
+
+async def stream_export(db, encoder, query, chunk_rows: int = EXPORT_CHUNK_ROWS) -> AsyncIterator[bytes]:
+    """Yields the encoded export piece by piece, one cursor fetch at a time."""
+    start = encoder.start()
+    if start:
+        yield start
+    result = await db.stream(query.execution_options(yield_per=chunk_rows))
+    async for rows in result.partitions():
+        chunk = encoder.encode([_row_values(row) for row in rows])
+        if chunk:
+            yield chunk
+    end = encoder.finish()
+    if end:
+        yield end
+
+
+async def export_to_file(args, out) -> int:
+    from db import SessionLocal
+
+    columns = parse_columns(args.columns)
+    encoder = EXPORT_FORMATS[args.format](columns)
+    query = export_query(columns, args.uploaded_from, args.uploaded_to)
+    written = 0
+    async with SessionLocal() as db:
+        async for chunk in stream_export(db, encoder, query, args.chunk_rows):
+            out.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+    parser.add_argument("--columns", help=f"Comma-separated subset of: {', '.join(EXPORT_COLUMNS)}")
+    parser.add_argument("--from", dest="uploaded_from", type=datetime.fromisoformat, help="Uploaded at or after (ISO date/time)")
+    parser.add_argument("--to", dest="uploaded_to", type=datetime.fromisoformat, help="Uploaded before (ISO date/time)")
+    parser.add_argument("--chunk-rows", type=int, default=EXPORT_CHUNK_ROWS)
+    # A file rather than stdout: SQL echo and other prints go to stdout
+    parser.add_argument("--output", help="File to write (default: resumes.<format>)")
+    args = parser.parse_args()
+
+    output = args.output or f"resumes.{EXPORT_FORMATS[args.format].extension}"
+    with open(output, "wb") as out:
+        written = asyncio.run(export_to_file(args, out))
+    print(f"Wrote {written} bytes to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import os
+import re
+import json
+import random
+import asyncio
+import time
+
+from typing import Any, AsyncIterator, List, Optional
+from dotenv import load_dotenv
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.language_models.chat_models import BaseChatModel
+
+
+load_dotenv()
+
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0.5"))
+FAKE_LLM_LATENCY_JITTER_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_JITTER_SECONDS", "0.1"))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+FAKE_LLM_STREAM_CHUNK_CHARS = int(os.getenv("FAKE_LLM_STREAM_CHUNK_CHARS", "64"))
+# Extra latency per output token, so shorter replies finish sooner as with a real provider
+FAKE_LLM_SECONDS_PER_OUTPUT_TOKEN = float(os.getenv("FAKE_LLM_SECONDS_PER_OUTPUT_TOKEN", "0"))
+# Makes jitter and injected errors repeatable between runs (benchmarks)
+FAKE_LLM_SEED = os.getenv("FAKE_LLM_SEED")
+
+_random = random.Random(int(FAKE_LLM_SEED)) if FAKE_LLM_SEED is not None else random.Random()
+
+# Extraction prompts that leave a field out of the schema must not get it back
+_SCHEMA_FIELD = re.compile(r'"(\w+)"\s*:')
+
+
+FAKE_EXTRACTION = {
+    "contact_info": {
+        "name": "Jane Doe",
+        "email": "jane.doe@example.com",
+        "phone": "+1 555 0100",
+        "linkedin": "https://linkedin.com/in/janedoe",
+        "github": "https://github.com/janedoe"
+    },
+    "summary": "Backend engineer with six years of experience building APIs and data pipelines.",
+    "work_experience": [
+        {
+            "company": "Acme Corp",
+            "role": "Senior Backend Engineer",
+            "start_date": "2021-03",
+            "end_date": "Present",
+            "responsibilities": ["Designed REST APIs in Python and FastAPI", "Ran PostgreSQL at scale"]
+        },
+        {
+            "company": "Globex",
+            "role": "Software Engineer",
+            "start_date": "2018-06",
+            "end_date": "2021-02",
+            "duration_months": 32,
+            "responsibilities": ["Built ETL jobs", "Maintained Kubernetes deployments"]
+        }
+    ],
+    "education": [
+        {"institution": "State University", "degree": "B.Sc. Computer Science", "end_date": "2018"}
+    ],
+    "skills": {
+        "technical": [{"name": "Python"}, {"name": "PostgreSQL"}, {"name": "Kubernetes"}],
+        "soft": ["Communication"],
+        "tools": [{"name": "Docker"}],
+        "languages": ["English"]
+    },
+    "projects": [
+        {"name": "Resume Parser", "description": "Parses resumes with LLMs.", "technologies_used": ["Python"]}
+    ]
+}
+
+FAKE_ANALYSIS = {
+    "resume_rating": 7.5,
+    "overall_feedback": "Solid backend profile with clear impact; quantify more achievements.",
+    "strength_areas": ["Backend API design", "Database experience"],
+    "improvement_areas": ["Quantify impact", "Add a projects section with links", "Tighten the summary"],
+    "upskill_suggestions": [
+        {"skill": "Distributed tracing", "reason": "Common in backend roles", "resources": ["OpenTelemetry docs"]}
+    ],
+    "suggested_keywords_for_ats": ["Python", "FastAPI", "PostgreSQL"],
+    "potential_roles": ["Backend Engineer", "Platform Engineer"]
+}
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+
+class FakeChatModel(BaseChatModel):
+    """Offline chat model returning canned, schema-valid JSON after a configurable delay.
+
+    Used for load tests and local runs without a provider key. The reply is
+    chosen from the prompt: analysis prompts get FAKE_ANALYSIS, single-pass
+    prompts get both, everything else gets FAKE_EXTRACTION.
+    """
+
+    latency_seconds: float = FAKE_LLM_LATENCY_SECONDS
+    latency_jitter_seconds: float = FAKE_LLM_LATENCY_JITTER_SECONDS
+    error_rate: float = FAKE_LLM_ERROR_RATE
+    stream_chunk_chars: int = FAKE_LLM_STREAM_CHUNK_CHARS
+    seconds_per_output_token: float = FAKE_LLM_SECONDS_PER_OUTPUT_TOKEN
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _delay(self, result: ChatResult) -> float:
+        output_tokens = result.generations[0].message.usage_metadata["output_tokens"]
+        base = self.latency_seconds + _random.uniform(-1, 1) * self.latency_jitter_seconds
+        return max(0.0, base + output_tokens * self.seconds_per_output_token)
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        if self.error_rate and _random.random() < self.error_rate:
+            raise FakeRateLimitError("429 Resource has been exhausted (fake provider)")
+
+        prompt = "\n".join(str(message.content) for message in messages)
+        if "Structured Resume Data" in prompt:
+            payload = FAKE_ANALYSIS
+        elif "Extract and Analyze" in prompt:
+            payload = {"extracted_data": FAKE_EXTRACTION, "analysis": FAKE_ANALYSIS}
+        else:
+            asked = set(_SCHEMA_FIELD.findall(prompt))
+            payload = {name: value for name, value in FAKE_EXTRACTION.items() if name in asked}
+        content = "```json\n" + json.dumps(payload) + "\n```"
+
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": len(prompt) // 4,
+                "output_tokens": len(content) // 4,
+                "total_tokens": (len(prompt) + len(content)) // 4,
+            }
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        result = self._respond(messages)
+        time.sleep(self._delay(result))
+        return result
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        result = self._respond(messages)
+        await asyncio.sleep(self._delay(result))
+        return result
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        # Same reply and total latency as _agenerate, spread over fixed-size chunks
+        result = self._respond(messages)
+        message = result.generations[0].message
+        content = message.content
+        pieces = [content[i:i + self.stream_chunk_chars] for i in range(0, len(content), self.stream_chunk_chars)]
+        delay = self._delay(result) / max(1, len(pieces))
+
+        for index, piece in enumerate(pieces):
+            await asyncio.sleep(delay)
+            is_last = index == len(pieces) - 1
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=piece,
+                usage_metadata=message.usage_metadata if is_last else None
+            ))
@@ -0,0 +1,127 @@
+"""Creates and upgrades the database schema; run once per deploy, before starting the API.
+
+    python init_db.py              # create missing tables, columns and indexes
+    python init_db.py --backfill   # then fill in what rows stored before them lack
+
+The schema step is idempotent: missing tables are created (plus the SQLite
+full-text index), columns the models have but an existing table lacks are
+added (all of them are nullable), and missing indexes are created. Nothing
+is dropped or altered.
+
+The backfill is idempotent too and safe to interrupt. It moves inline raw
+text into blobs, then rebuilds the derived data (filter columns, roles,
+canonical skills, detail payload, full-text and match index) of rows that
+have no payload or are missing from the search index, a page per
+transaction. Pass --after-id to continue from the last id it printed.
+"""
+import asyncio
+import argparse
+
+import crud
+import models
+import search  # registers the full-text index DDL on the metadata
+import blob_store
+
+from db import engine, SessionLocal
+from sqlalchemy import inspect, or_, select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.schema import CreateColumn
+
+
+BACKFILL_PAGE_SIZE = 200
+
+
+def _add_missing_columns(sync_conn) -> list:
+    inspector = inspect(sync_conn)
+    added = []
+    for table in models.Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = CreateColumn(column).compile(dialect=sync_conn.dialect)
+            sync_conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def _create_missing_indexes(sync_conn) -> list:
+    created = []
+    for table in models.Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspect(sync_conn).get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                # Indexes for another dialect (the Postgres-only GIN index) are skipped here
+                index.create(sync_conn, checkfirst=True)
+        now = {index["name"] for index in inspect(sync_conn).get_indexes(table.name)}
+        created += sorted(now - existing)
+    return created
+
+
+async def create_tables() -> None:
+    """Brings the schema up to the models: missing tables, then missing columns and indexes."""
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+        added = await conn.run_sync(_add_missing_columns)
+        created = await conn.run_sync(_create_missing_indexes)
+    if added:
+        print(f"Added columns: {', '.join(added)}")
+    if created:
+        print(f"Created indexes: {', '.join(created)}")
+
+
+async def backfill_derived_data(after_id: int = 0, page_size: int = BACKFILL_PAGE_SIZE) -> int:
+    """Rebuilds the derived data of rows stored before it existed; returns rows updated."""
+    updated = 0
+    while True:
+        async with SessionLocal() as db:
+            needs_backfill = models.Resume.payload.is_(None)
+            unindexed = search.unindexed_clause(db)
+            if unindexed is not None:
+                needs_backfill = or_(needs_backfill, unindexed)
+            rows = (await db.execute(
+                select(models.Resume)
+                .options(selectinload(models.Resume.roles), selectinload(models.Resume.canonical_skills))
+                .where(models.Resume.id > after_id, needs_backfill)
+                .order_by(models.Resume.id)
+                .limit(page_size)
+            )).scalars().all()
+            if not rows:
+                return updated
+
+            # The full-text index covers the raw text
+            await blob_store.load_raw_texts(db, rows)
+            populated = []
+            for db_resume in rows:
+                try:
+                    crud.populate_resume(db_resume, crud.stored_extraction(db_resume), crud.stored_analysis(db_resume))
+                    populated.append(db_resume)
+                except ValueError as e:
+                    # Stored JSON that no longer validates; the row keeps working as before, just unfiltered
+                    print(f"Skipping resume {db_resume.id}: {e}")
+            if populated and not await crud.update_resume_entries(db, populated):
+                raise RuntimeError(f"Backfill of resumes after id {after_id} failed; re-run with --after-id {after_id}")
+
+        after_id = rows[-1].id
+        updated += len(populated)
+        print(f"Backfilled {updated} resumes (up to id {after_id})")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backfill", action="store_true", help="Fill in data that rows stored before the schema change lack")
+    parser.add_argument("--after-id", type=int, default=0, help="Backfill only rows with a larger id")
+    parser.add_argument("--page-size", type=int, default=BACKFILL_PAGE_SIZE)
+    args = parser.parse_args()
+
+    await create_tables()
+    print(f"Tables ready: {', '.join(sorted(models.Base.metadata.tables))}")
+    if args.backfill:
+        moved = await blob_store.move_inline_raw_text()
+        updated = await backfill_derived_data(args.after_id, args.page_size)
+        print(f"Backfill done: raw text of {moved} resumes moved to blobs, {updated} resumes updated")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
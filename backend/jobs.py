@@ -0,0 +1,358 @@
+import os
+import abc
+import crud
+import time
+import uuid
+import asyncio
+import logging
+import sqlite3
+import pipeline
+import blob_store
+import threading
+
+from typing import Optional, List
+from db import SessionLocal
+from dotenv import load_dotenv
+from uploads import SpooledUpload
+from parse_pool import ParserPoolSaturated
+from llm_scheduler import CircuitOpenError
+from resume_writer import save_resume
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "sqlite")
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "jobs.sqlite3")
+JOBS_PAYLOAD_DIR = os.getenv("JOBS_PAYLOAD_DIR", "job_payloads")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "0.5"))
+
+
+class Job:
+    def __init__(self, id: str, file_name: str, payload_path: str, claim_token: str, attempts: int):
+        self.id = id
+        self.file_name = file_name
+        self.payload_path = payload_path
+        self.claim_token = claim_token
+        self.attempts = attempts
+
+
+class JobQueue(abc.ABC):
+    """Interface for upload job queues.
+
+    A claimed job is leased to one worker through its claim token. State
+    changes are only accepted with the current token, and a job whose lease
+    expires (e.g. its worker died) becomes claimable again, so a job survives
+    worker restarts without two workers finishing it.
+    """
+
+    @abc.abstractmethod
+    def enqueue(self, file_name: str, payload_path: str) -> str:
+        ...
+
+    @abc.abstractmethod
+    def claim(self) -> Optional[Job]:
+        ...
+
+    @abc.abstractmethod
+    def heartbeat(self, job: Job, stage: str, progress: int) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def release(self, job: Job) -> None:
+        ...
+
+    @abc.abstractmethod
+    def complete(self, job: Job, resume_id: int) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def fail(self, job: Job, error: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def get(self, job_id: str) -> Optional[dict]:
+        ...
+
+    @abc.abstractmethod
+    def stats(self) -> dict:
+        ...
+
+
+class SQLiteJobQueue(JobQueue):
+    def __init__(self, path: str, lease_seconds: int, max_attempts: int):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
+                payload_path TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                progress INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                claim_token TEXT,
+                lease_expires_at REAL,
+                resume_id INTEGER,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status_created_at ON jobs (status, created_at)")
+
+    def enqueue(self, file_name: str, payload_path: str) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO jobs (id, file_name, payload_path, status, stage, created_at, updated_at)
+                VALUES (?, ?, ?, 'queued', 'queued', ?, ?)""",
+                (job_id, file_name, payload_path, now, now)
+            )
+        return job_id
+
+    def claim(self) -> Optional[Job]:
+        now = time.time()
+        token = uuid.uuid4().hex
+        exhausted = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    # Running jobs with an expired lease belong to a worker that died
+                    row = self._conn.execute(
+                        """SELECT id, file_name, payload_path, attempts FROM jobs
+                        WHERE status = 'queued' OR (status = 'running' AND lease_expires_at < ?)
+                        ORDER BY created_at LIMIT 1""",
+                        (now,)
+                    ).fetchone()
+                    if row is None or row["attempts"] < self.max_attempts:
+                        break
+
+                    # Fail it for good and move on, so a worker never idles a poll interval on it
+                    self._conn.execute(
+                        """UPDATE jobs SET status = 'failed', stage = 'failed', claim_token = NULL,
+                        error = 'Exceeded maximum attempts', updated_at = ? WHERE id = ?""",
+                        (now, row["id"])
+                    )
+                    exhausted.append(row)
+
+                if row is not None:
+                    self._conn.execute(
+                        """UPDATE jobs SET status = 'running', claim_token = ?, lease_expires_at = ?,
+                        attempts = attempts + 1, updated_at = ? WHERE id = ?""",
+                        (token, now + self.lease_seconds, now, row["id"])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        # Only once the failed status is committed, so a rolled-back claim keeps its payload
+        for failed in exhausted:
+            logger.warning("Job %s exceeded maximum attempts; giving up.", failed["id"])
+            _remove_payload(failed["payload_path"])
+
+        if row is None:
+            return None
+        return Job(row["id"], row["file_name"], row["payload_path"], token, row["attempts"] + 1)
+
+    def heartbeat(self, job: Job, stage: str, progress: int) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """UPDATE jobs SET stage = ?, progress = ?, lease_expires_at = ?, updated_at = ?
+                WHERE id = ? AND claim_token = ? AND status = 'running'""",
+                (stage, progress, now + self.lease_seconds, now, job.id, job.claim_token)
+            )
+        return cursor.rowcount == 1
+
+    def release(self, job: Job) -> None:
+        with self._lock:
+            self._conn.execute(
+                """UPDATE jobs SET status = 'queued', stage = 'queued', claim_token = NULL,
+                attempts = attempts - 1, updated_at = ? WHERE id = ? AND claim_token = ?""",
+                (time.time(), job.id, job.claim_token)
+            )
+
+    def complete(self, job: Job, resume_id: int) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                """UPDATE jobs SET status = 'completed', stage = 'completed', progress = 100,
+                resume_id = ?, claim_token = NULL, updated_at = ?
+                WHERE id = ? AND claim_token = ?""",
+                (resume_id, time.time(), job.id, job.claim_token)
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job: Job, error: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                """UPDATE jobs SET status = 'failed', stage = 'failed', error = ?,
+                claim_token = NULL, updated_at = ? WHERE id = ? AND claim_token = ?""",
+                (error, time.time(), job.id, job.claim_token)
+            )
+        return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT id, file_name, status, stage, progress, attempts, resume_id, error,
+                created_at, updated_at FROM jobs WHERE id = ?""",
+                (job_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+
+JOB_QUEUE_BACKENDS = {
+    "sqlite": lambda: SQLiteJobQueue(JOBS_DB_PATH, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS),
+}
+
+
+def create_job_queue(backend: str = JOB_QUEUE_BACKEND) -> JobQueue:
+    if backend not in JOB_QUEUE_BACKENDS:
+        raise ValueError(f"Unknown job queue backend: {backend}")
+    return JOB_QUEUE_BACKENDS[backend]()
+
+
+job_queue = create_job_queue()
+
+
+def save_job_payload(upload: SpooledUpload) -> str:
+    os.makedirs(JOBS_PAYLOAD_DIR, exist_ok=True)
+    payload_path = os.path.join(JOBS_PAYLOAD_DIR, uuid.uuid4().hex)
+    upload.move_to(payload_path)
+    return payload_path
+
+
+def submit_job(file_name: str, upload: SpooledUpload) -> str:
+    return job_queue.enqueue(file_name, save_job_payload(upload))
+
+
+def _remove_payload(payload_path: str) -> None:
+    try:
+        os.remove(payload_path)
+    except OSError:
+        pass
+
+
+async def _saved_resume_id(job_id: str) -> Optional[int]:
+    async with SessionLocal() as db:
+        return await crud.get_resume_id_by_job_id(db, job_id)
+
+
+async def process_job(queue: JobQueue, job: Job) -> None:
+    async def on_stage(stage: str, progress: int) -> None:
+        await asyncio.to_thread(queue.heartbeat, job, stage, progress)
+
+    # An earlier attempt may have saved the resume and died before marking the job complete
+    resume_id = await _saved_resume_id(job.id)
+    if resume_id is not None:
+        await asyncio.to_thread(queue.complete, job, resume_id)
+        _remove_payload(job.payload_path)
+        return
+
+    try:
+        processed = await pipeline.process_resume(job.file_name, job.payload_path, on_stage=on_stage)
+    except (ParserPoolSaturated, CircuitOpenError) as e:
+        # Not the job's fault; put it back for a later attempt
+        await asyncio.to_thread(queue.release, job)
+        await asyncio.sleep(e.retry_after)
+        return
+    except ValueError as e:
+        await asyncio.to_thread(queue.fail, job, str(e))
+        _remove_payload(job.payload_path)
+        return
+
+    # A lost lease means another worker now owns the job, so do not write a second row
+    if not await asyncio.to_thread(queue.heartbeat, job, "saving", 90):
+        logger.warning("Lost lease on job %s; skipping save.", job.id)
+        return
+
+    db_resume = await save_resume(
+        file_name=job.file_name,
+        raw_text=processed.raw_text,
+        extracted_data=processed.extracted_data,
+        llm_analysis_data=processed.llm_analysis,
+        llm_mode=processed.llm_mode,
+        file_hash=await blob_store.store_original(job.payload_path),
+        job_id=job.id
+    )
+    # The insert also fails when a row for the job already exists (unique job_id); that row is the result
+    resume_id = db_resume.id if db_resume else await _saved_resume_id(job.id)
+
+    if processed.error:
+        await asyncio.to_thread(queue.fail, job, processed.error)
+    elif resume_id is None:
+        await asyncio.to_thread(queue.fail, job, "Failed to save processed resume data to database.")
+    else:
+        await asyncio.to_thread(queue.complete, job, resume_id)
+        logger.info("Job %s: resume %s processed and saved successfully.", job.id, job.file_name)
+
+    _remove_payload(job.payload_path)
+
+
+class JobRunner:
+    def __init__(self, queue: JobQueue, workers: int, poll_interval: float):
+        self.queue = queue
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    async def _worker_loop(self, worker_index: int) -> None:
+        while not self._stopping:
+            job = await asyncio.to_thread(self.queue.claim)
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            try:
+                await process_job(self.queue, job)
+            except Exception as e:
+                logger.exception("Worker %d failed job %s: %s", worker_index, job.id, e)
+                # Only the worker that marks the job failed drops the payload; a lost lease means another worker needs it
+                if await asyncio.to_thread(self.queue.fail, job, "Unexpected error while processing resume."):
+                    _remove_payload(job.payload_path)
+
+    def start(self) -> None:
+        self._stopping = False
+        for i in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker_loop(i)))
+        if self.workers:
+            logger.info("Started %d upload job workers.", self.workers)
+
+    async def stop(self) -> None:
+        # Cancelled jobs keep their lease and are picked up again once it expires
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+job_runner = JobRunner(job_queue, JOB_WORKERS, JOB_POLL_INTERVAL_SECONDS)
+
+
+async def _run_forever() -> None:
+    job_runner.start()
+    await asyncio.gather(*job_runner._tasks)
+
+
+if __name__ == "__main__":
+    # Standalone worker process: `JOB_WORKERS=4 python jobs.py`
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+    asyncio.run(_run_forever())
@@ -0,0 +1,274 @@
+import os
+import time
+import random
+import asyncio
+import logging
+
+from typing import Awaitable, Callable, Optional, TypeVar
+from dotenv import load_dotenv
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "1"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "30"))
+LLM_CALL_TIMEOUT_SECONDS = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "120"))
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+LLM_CIRCUIT_RESET_SECONDS = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30"))
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {
+    "ResourceExhausted",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "InternalServerError",
+    "TooManyRequests",
+    "RateLimitError",
+    "APIConnectionError",
+}
+RETRYABLE_MESSAGE_MARKERS = ("429", "503", "rate limit", "quota", "overloaded", "temporarily unavailable")
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("LLM provider circuit is open")
+        self.retry_after = retry_after
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+
+    for attr in ("status_code", "code", "http_status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int) and value in RETRYABLE_STATUS_CODES:
+            return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) in RETRYABLE_STATUS_CODES:
+        return True
+
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in RETRYABLE_MESSAGE_MARKERS)
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute / 60` units per second up to `per_minute`."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(max(1, per_minute))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float) -> float:
+        """Waits until `amount` units are available and takes them; returns seconds waited."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def consume(self, amount: float) -> None:
+        # Settles the difference between estimated and actual usage; may go negative
+        self._refill()
+        self.tokens -= amount
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_in_flight = False
+
+    def before_call(self) -> bool:
+        """Raises CircuitOpenError while the circuit is open; returns True if the call is the half-open probe."""
+        if self.state == "closed":
+            return False
+        elapsed = time.monotonic() - self.opened_at
+        if self.state == "open" and elapsed >= self.reset_seconds:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probe_in_flight:
+            # Let exactly one call through to test whether the provider recovered
+            self._probe_in_flight = True
+            return True
+        raise CircuitOpenError(max(1.0, self.reset_seconds - elapsed))
+
+    def release_probe(self) -> None:
+        # A probe that ends without an outcome (cancelled) must not leave the circuit half-open for good
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+class LLMScheduler:
+    """Shared gate in front of every LLM call.
+
+    Calls wait for both the requests/min and tokens/min buckets, then for one
+    of `max_in_flight` slots. Retryable provider errors are retried with
+    full-jitter exponential backoff, and repeated failures open a circuit
+    breaker that fails calls fast until the provider recovers.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_in_flight: int,
+        max_retries: int,
+        retry_base_seconds: float,
+        retry_max_seconds: float,
+        call_timeout_seconds: float,
+        breaker: CircuitBreaker
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.semaphore = asyncio.Semaphore(max(1, max_in_flight))
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.call_timeout_seconds = call_timeout_seconds
+        self.breaker = breaker
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+        self.throttled_seconds = 0.0
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * (2 ** attempt)))
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 0,
+        usage_of: Optional[Callable[[T], Optional[int]]] = None
+    ) -> T:
+        attempt = 0
+        while True:
+            try:
+                probe = self.breaker.before_call()
+            except CircuitOpenError:
+                self.rejected += 1
+                raise
+
+            retry_delay = None
+            try:
+                self.waiting += 1
+                try:
+                    self.throttled_seconds += await self.request_bucket.acquire(1)
+                    self.throttled_seconds += await self.token_bucket.acquire(estimated_tokens)
+                    await self.semaphore.acquire()
+                finally:
+                    self.waiting -= 1
+
+                self.in_flight += 1
+                self.calls += 1
+                try:
+                    result = await asyncio.wait_for(call(), timeout=self.call_timeout_seconds)
+                except Exception as e:
+                    self.failures += 1
+                    retryable = is_retryable(e)
+                    if retryable:
+                        self.breaker.record_failure()
+                    else:
+                        # The provider answered; the request itself was bad
+                        self.breaker.record_success()
+                    if retryable and attempt < self.max_retries and self.breaker.state != "open":
+                        attempt += 1
+                        self.retries += 1
+                        retry_delay = self._backoff(attempt)
+                        logger.warning(
+                            "Retryable LLM error (%s); retry %d in %.1fs", type(e).__name__, attempt, retry_delay
+                        )
+                    else:
+                        raise
+                finally:
+                    self.in_flight -= 1
+                    self.semaphore.release()
+            finally:
+                # Also reached on cancellation, which neither records a success nor a failure
+                if probe:
+                    self.breaker.release_probe()
+
+            if retry_delay is not None:
+                # Back off without holding a slot, then queue for the buckets and semaphore again
+                await asyncio.sleep(retry_delay)
+                continue
+
+            self.successes += 1
+            self.breaker.record_success()
+            if usage_of is not None:
+                actual_tokens = usage_of(result)
+                if actual_tokens is not None:
+                    self.token_bucket.consume(actual_tokens - estimated_tokens)
+            return result
+
+    def stats(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "saturation": self.in_flight / self.max_in_flight,
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "retries": self.retries,
+            "rejected_by_circuit": self.rejected,
+            "throttled_seconds": self.throttled_seconds,
+            "circuit_state": self.breaker.state,
+            "circuit_opened": self.breaker.times_opened,
+        }
+
+
+llm_scheduler = LLMScheduler(
+    requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+    max_in_flight=LLM_MAX_IN_FLIGHT,
+    max_retries=LLM_MAX_RETRIES,
+    retry_base_seconds=LLM_RETRY_BASE_SECONDS,
+    retry_max_seconds=LLM_RETRY_MAX_SECONDS,
+    call_timeout_seconds=LLM_CALL_TIMEOUT_SECONDS,
+    breaker=CircuitBreaker(LLM_CIRCUIT_FAILURE_THRESHOLD, LLM_CIRCUIT_RESET_SECONDS),
+)
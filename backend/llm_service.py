@@ -1,87 +1,227 @@
 import os
 import re
 import json
+import hashlib
+import logging
+import threading
 import schemas
+import streaming_json
+import prompt_compaction
 
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, Optional, Tuple
 from dotenv import load_dotenv
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from pydantic import TypeAdapter
+from llm_scheduler import llm_scheduler, CircuitOpenError
 
 
 
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
 
+PROMPT_COMPACTION_ENABLED = os.getenv("PROMPT_COMPACTION_ENABLED", "true").lower() == "true"
 
-if not GEMINI_API_KEY:
-    raise ValueError("API key not present")
+# Rough output budget used to reserve tokens/min capacity before a call
+EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "1500"))
 
 
-try:
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
+def _create_gemini_llm():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    if not GEMINI_API_KEY:
+        raise ValueError("API key not present")
+    return ChatGoogleGenerativeAI(
+        model=GEMINI_MODEL,
         google_api_key=GEMINI_API_KEY,
         temperature=0.1
     )
-    print("LLM initialized successfully")
-except Exception as e:
-    print(f"Failed to initialize LLM: {e}")
 
 
-def parse_llm_json_output(ll_output_str: str, target_schema: type[schemas.BaseModel]) -> Optional[schemas.BaseModel]:
-    if not ll_output_str:
-        print("LLM output string is empty.")
+def _create_fake_llm():
+    from fake_llm import FakeChatModel
+
+    return FakeChatModel()
+
+
+# name -> (model id used in cache keys, factory); providers are only imported and built on first use
+LLM_PROVIDERS = {
+    "gemini": (f"gemini:{GEMINI_MODEL}", _create_gemini_llm),
+    "fake": ("fake", _create_fake_llm),
+}
+
+if LLM_PROVIDER not in LLM_PROVIDERS:
+    raise ValueError(f"Unknown LLM provider: {LLM_PROVIDER}")
+
+LLM_MODEL_ID = LLM_PROVIDERS[LLM_PROVIDER][0]
+
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def get_llm():
+    """The configured chat model, created on first use; None if it could not be initialized."""
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                try:
+                    _llm = LLM_PROVIDERS[LLM_PROVIDER][1]()
+                    logger.info("LLM provider %s initialized (%s)", LLM_PROVIDER, LLM_MODEL_ID)
+                except Exception as e:
+                    logger.error("Failed to initialize LLM provider %s: %s", LLM_PROVIDER, e)
+    return _llm
+
+
+def estimate_tokens(*texts: str) -> int:
+    # ~4 characters per token is close enough for rate budgeting
+    return sum(len(text) for text in texts) // 4
+
+
+def response_tokens(response) -> Optional[int]:
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
         return None
+    return usage.get("total_tokens")
+
+
+token_usage_stats = {
+    call: {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+    for call in ("extraction", "extraction_chunk", "analysis", "single_pass")
+}
 
+
+def record_token_usage(call: str, response) -> None:
+    usage = getattr(response, "usage_metadata", None) or {}
+    stats = token_usage_stats[call]
+    stats["calls"] += 1
+    stats["input_tokens"] += usage.get("input_tokens", 0)
+    stats["output_tokens"] += usage.get("output_tokens", 0)
+
+
+def prepare_resume_text(resume_text: str) -> str:
+    if not PROMPT_COMPACTION_ENABLED:
+        return resume_text
+    return prompt_compaction.normalize_resume_text(resume_text)
+
+
+def schema_json_str(model, exclude: Iterable[str] = ()) -> str:
+    schema = model.model_json_schema()
+    if exclude:
+        schema = prompt_compaction.drop_schema_properties(schema, exclude)
+    if PROMPT_COMPACTION_ENABLED:
+        return prompt_compaction.compact_schema_dict_json(schema)
+    return json.dumps(schema, indent=2)
+
+
+def _literal(template_text: str) -> str:
+    # Braces in embedded JSON must not be read as template variables
+    return template_text.replace("{", "{{").replace("}", "}}")
+
+
+def _extract_json_str(ll_output_str: str) -> str:
     cleaned_json_str = ll_output_str.strip()
     match = re.search(r"```json\s*([\s\S]+?)\s*```", cleaned_json_str, re.DOTALL)
 
     if match:
         json_data_str = match.group(1).strip()
-        print("Extracted JSON from markdown block.")
+        logger.debug("Extracted JSON from markdown block.")
     else:
         first_brace = cleaned_json_str.find('{')
         last_brace = cleaned_json_str.rfind('}')
 
         if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
             json_data_str = cleaned_json_str[first_brace : last_brace+1]
-            print("Extracted JSON using first/last brace method.")
+            logger.debug("Extracted JSON using first/last brace method.")
         else:
             json_data_str = cleaned_json_str
-            print("No markdown or clear braces found, attempting direct parse.")
+            logger.debug("No markdown or clear braces found, attempting direct parse.")
+    return json_data_str
+
+
+def parse_llm_json_dict(ll_output_str: str) -> Optional[dict]:
+    if not ll_output_str:
+        logger.warning("LLM output string is empty.")
+        return None
+
+    try:
+        parsed = json.loads(_extract_json_str(ll_output_str))
+    except Exception as e:
+        logger.warning("Failed to parse LLM output as JSON: %s", e)
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def parse_llm_json_output(ll_output_str: str, target_schema: type[schemas.BaseModel]) -> Optional[schemas.BaseModel]:
+    if not ll_output_str:
+        logger.warning("LLM output string is empty.")
+        return None
+
+    json_data_str = _extract_json_str(ll_output_str)
     
     try:
         parsed_dict = json.loads(json_data_str)
-        print("Parsed Data: ", parsed_dict);
+        logger.debug("Parsed Data: %s", parsed_dict)
         validated_data = target_schema.model_validate(parsed_dict) 
         
-        print(f"Successfully parsed and validated JSON against {target_schema.__name__}.")
+        logger.debug("Successfully parsed and validated JSON against %s.", target_schema.__name__)
         return validated_data
     except Exception as e:
-        print("Error: ", e)
+        logger.warning("Failed to parse or validate LLM output against %s: %s", target_schema.__name__, e)
     
     return None
 
 
+def validate_section(data: Optional[dict], target_schema: type[schemas.BaseModel]) -> Optional[schemas.BaseModel]:
+    if not isinstance(data, dict):
+        return None
+    try:
+        return target_schema.model_validate(data)
+    except Exception as e:
+        logger.warning("Failed to validate %s: %s", target_schema.__name__, e)
+        return None
+
+
+# One validator per top-level field, so streamed sections can be checked as they complete
+EXTRACTION_SECTION_ADAPTERS = {
+    name: TypeAdapter(field.annotation)
+    for name, field in schemas.ResumeExtractedData.model_fields.items()
+}
+
+
+def validate_extraction_section(name: str, value: Any) -> Optional[Any]:
+    """Validates one top-level section (streamed or chunked); returns it JSON-ready, or None if unknown or invalid."""
+    adapter = EXTRACTION_SECTION_ADAPTERS.get(name)
+    if adapter is None:
+        return None
+    try:
+        return adapter.dump_python(adapter.validate_python(value), mode="json")
+    except Exception as e:
+        logger.warning("Section '%s' failed validation: %s", name, e)
+        return None
+
+
 try:
-    raw_extraction_schema_json_str = json.dumps(schemas.ResumeExtractedData.model_json_schema(), indent=2)
-    raw_analysis_schema_json_str = json.dumps(schemas.LLMAnalysisSchema.model_json_schema(), indent=2)
+    raw_extraction_schema_json_str = schema_json_str(schemas.ResumeExtractedData)
+    raw_analysis_schema_json_str = schema_json_str(schemas.LLMAnalysisSchema)
+
+    raw_combined_schema_json_str = schema_json_str(schemas.CombinedResumeOutputSchema)
 
     LITERAL_EXTRACTION_SCHEMA_JSON_STR = raw_extraction_schema_json_str.replace("{", "{{").replace("}", "}}")
     LITERAL_ANALYSIS_SCHEMA_JSON_STR = raw_analysis_schema_json_str.replace("{", "{{").replace("}", "}}")
+    LITERAL_COMBINED_SCHEMA_JSON_STR = raw_combined_schema_json_str.replace("{", "{{").replace("}", "}}")
 except Exception as e:
-    print("Error: ", e)
+    logger.error("Failed to build the prompt schemas: %s", e)
     LITERAL_EXTRACTION_SCHEMA_JSON_STR = "{{ 'error': 'Schema for extraction not available' }}"
     LITERAL_ANALYSIS_SCHEMA_JSON_STR = "{{ 'error': 'Schema for analysis not available' }}"
+    LITERAL_COMBINED_SCHEMA_JSON_STR = "{{ 'error': 'Schema for combined output not available' }}"
 
 
-SYSTEM_EXTRACTION_CONTENT = f"""You are an highly intelligent and meticulous resume parsing assistant.
-Your primary function is to extract structured information from the provided resume text.
-You MUST output the information STRICTLY in JSON format, precisely adhering to the JSON schema provided below.
-- Do NOT include any conversational introductions, apologies, summaries, or any text outside the single JSON object.
+EXTRACTION_GUIDELINES = """- Do NOT include any conversational introductions, apologies, summaries, or any text outside the single JSON object.
 - If a specific piece of information or a section (e.g., 'awards') is not found in the resume, either omit that key from the JSON or set its value to `null` if the schema allows for it (usually omitting is better for optional fields/lists).
 - Only extract information explicitly present in the resume text. Do not infer or add information not found.
 - For dates (e.g., start_date, end_date, graduation_date), strive for consistency. "YYYY-MM-DD" is preferred if day is available, otherwise "YYYY-MM" or "YYYY". If only a year range is given (e.g., "2018-2020"), try to interpret it. "Present" for an end date is acceptable.
@@ -91,12 +231,39 @@ You MUST output the information STRICTLY in JSON format, precisely adhering to t
 - When extracting descriptions for projects or work experience, ensure all distinct bullet points or key achievements mentioned are captured, maintaining their original meaning.
 - Distinguish between formal 'work_experience' (paid or significant, ongoing roles) and 'leadership' roles within clubs or short-term achievements. If a leadership role has substantial responsibilities and duration, it can be considered work experience. One-off hackathon wins or similar should go into 'awards'.
 - If the resume contains a distinct section for 'Open Source Contributions' or 'Volunteering', extract details into corresponding fields if available in the schema.
-- For 'Relevant Coursework', if listed as a general section, attempt to create a top-level list in the JSON if the schema supports it. If courses are tied to a specific education entry, list them there.
+- For 'Relevant Coursework', if listed as a general section, attempt to create a top-level list in the JSON if the schema supports it. If courses are tied to a specific education entry, list them there."""
+
+ANALYSIS_GUIDELINES = """'resume_rating': Provide a rating from 1.0 to 10.0 (float). Be critical but fair.
+
+'overall_feedback': A concise (1-3 insightful sentences) summary of the resume's effectiveness.
+
+'strength_areas': List 2-4 key strengths evident from the resume data.
+
+'improvement_areas': List 3-5 specific, actionable areas where the resume could be improved. Focus on content, clarity, impact, and structure. Be concrete.
+
+'upskill_suggestions': Suggest 2-4 relevant skills for the candidate to learn or enhance, tailored to their apparent field/experience. For each, provide a brief 'reason' and optionally a list of 'resources' (e.g., "Online course on Advanced Python", "Official documentation for React").
+
+'suggested_keywords_for_ats': List 3-5 keywords relevant to the candidate's profile that could improve ATS (Applicant Tracking System) performance.
+
+'potential_roles': Suggest 1-3 job roles that seem like a good fit based on the resume."""
+
+
+def _extraction_system_content(literal_schema_json_str: str, exclude: FrozenSet[str] = frozenset()) -> str:
+    known_fields = ""
+    if exclude:
+        known_fields = f"\n- Do NOT output {', '.join(sorted(exclude))}: already extracted from the resume by other means."
+    return f"""You are an highly intelligent and meticulous resume parsing assistant.
+Your primary function is to extract structured information from the provided resume text.
+You MUST output the information STRICTLY in JSON format, precisely adhering to the JSON schema provided below.
+{EXTRACTION_GUIDELINES}{known_fields}
 
 Target JSON Schema:```json
-{LITERAL_EXTRACTION_SCHEMA_JSON_STR}
+{literal_schema_json_str}
 ```"""
 
+
+SYSTEM_EXTRACTION_CONTENT = _extraction_system_content(LITERAL_EXTRACTION_SCHEMA_JSON_STR)
+
 HUMAN_EXTRACTION_TEMPLATE = """Resume Text to Process:
 ```text
 {resume_text}
@@ -113,111 +280,348 @@ You MUST output your analysis STRICTLY in JSON format, adhering to the JSON sche
 
 Do NOT include any conversational introductions, apologies, summaries, or any text outside the single JSON object.
 
-'resume_rating': Provide a rating from 1.0 to 10.0 (float). Be critical but fair.
+{ANALYSIS_GUIDELINES}
 
-'overall_feedback': A concise (1-3 insightful sentences) summary of the resume's effectiveness.
+Target JSON Schema:
+```json
+{LITERAL_ANALYSIS_SCHEMA_JSON_STR}
+```"""
 
-'strength_areas': List 2-4 key strengths evident from the resume data.
+HUMAN_ANALYSIS_TEMPLATE = """Structured Resume Data (in JSON format) for Analysis:
+```json
+{structured_resume_data_json_str}
+```
 
-'improvement_areas': List 3-5 specific, actionable areas where the resume could be improved. Focus on content, clarity, impact, and structure. Be concrete.
+Your Analysis JSON Output:"""
 
-'upskill_suggestions': Suggest 2-4 relevant skills for the candidate to learn or enhance, tailored to their apparent field/experience. For each, provide a brief 'reason' and optionally a list of 'resources' (e.g., "Online course on Advanced Python", "Official documentation for React").
+SYSTEM_COMBINED_CONTENT = f"""You are a meticulous resume parsing assistant and an expert career coach.
+Your task has two parts, answered together in ONE JSON object with exactly two keys:
+1. 'extracted_data': the structured information extracted from the resume text.
+2. 'analysis': your analysis of that extracted information.
+You MUST output STRICTLY in JSON format, precisely adhering to the JSON schema provided below.
 
-'suggested_keywords_for_ats': List 3-5 keywords relevant to the candidate's profile that could improve ATS (Applicant Tracking System) performance.
+Rules for 'extracted_data':
+{EXTRACTION_GUIDELINES}
 
-'potential_roles': Suggest 1-3 job roles that seem like a good fit based on the resume.
+Rules for 'analysis':
+{ANALYSIS_GUIDELINES}
 
 Target JSON Schema:
 ```json
-{LITERAL_ANALYSIS_SCHEMA_JSON_STR}
+{LITERAL_COMBINED_SCHEMA_JSON_STR}
 ```"""
 
-HUMAN_ANALYSIS_TEMPLATE = """Structured Resume Data (in JSON format) for Analysis:
-```json
-{structured_resume_data_json_str}
+HUMAN_COMBINED_TEMPLATE = """Resume Text to Extract and Analyze:
+```text
+{resume_text}
 ```
 
-Your Analysis JSON Output:"""
+Your Combined JSON Output:"""
+
+
+# Changing a prompt changes its version, which invalidates only the cache layers built from it
+TEXT_PREPARATION_VERSION = prompt_compaction.NORMALIZATION_VERSION if PROMPT_COMPACTION_ENABLED else "raw"
+
 
+def _prompt_version(*parts: str) -> str:
+    return hashlib.sha256("".join(parts).encode("utf-8")).hexdigest()[:16]
 
-extraction_prompt = ChatPromptTemplate.from_messages(
-    [
-        ("system", SYSTEM_EXTRACTION_CONTENT),
-        ("human", HUMAN_EXTRACTION_TEMPLATE)
-    ]
-)
 
-analysis_prompt = ChatPromptTemplate.from_messages(
-    [
-        ("system", SYSTEM_ANALYSIS_CONTENT),
-        ("human", HUMAN_ANALYSIS_TEMPLATE)
-    ]
-)
+EXTRACTION_PROMPT_VERSION = _prompt_version(SYSTEM_EXTRACTION_CONTENT, HUMAN_EXTRACTION_TEMPLATE, TEXT_PREPARATION_VERSION)
+ANALYSIS_PROMPT_VERSION = _prompt_version(SYSTEM_ANALYSIS_CONTENT, HUMAN_ANALYSIS_TEMPLATE, str(PROMPT_COMPACTION_ENABLED))
+COMBINED_PROMPT_VERSION = _prompt_version(SYSTEM_COMBINED_CONTENT, HUMAN_COMBINED_TEMPLATE, TEXT_PREPARATION_VERSION)
+
+
+_chains: Dict[Any, Any] = {}
+
+
+def _get_chain(key, system_content: str, human_template: str):
+    """prompt | llm for one prompt, built on first use; None while the LLM is unavailable."""
+    chain = _chains.get(key)
+    if chain is None:
+        llm = get_llm()
+        if llm is None:
+            return None
+        from langchain_core.prompts import ChatPromptTemplate
 
-if llm:
-    extraction_chain = extraction_prompt | llm
-    analysis_chain = analysis_prompt | llm
+        prompt = ChatPromptTemplate.from_messages(
+            [
+                ("system", system_content),
+                ("human", human_template)
+            ]
+        )
+        chain = _chains[key] = prompt | llm
+    return chain
 
 
-async def extract_structured_data_from_text(resume_text: str) -> Optional[schemas.ResumeExtractedData]:
+_extraction_variants: Dict[FrozenSet[str], tuple] = {}
+
+
+def extraction_variant(exclude: FrozenSet[str] = frozenset()) -> tuple:
+    """(system content, prompt version) of the extraction prompt that leaves out `exclude`.
+
+    Fields filled by the rule-based fast path are excluded so the LLM does
+    not spend output tokens on them.
+    """
+    if not exclude:
+        return SYSTEM_EXTRACTION_CONTENT, EXTRACTION_PROMPT_VERSION
+
+    if exclude not in _extraction_variants:
+        system_content = _extraction_system_content(_literal(schema_json_str(schemas.ResumeExtractedData, exclude)), exclude)
+        _extraction_variants[exclude] = (
+            system_content,
+            _prompt_version(system_content, HUMAN_EXTRACTION_TEMPLATE, TEXT_PREPARATION_VERSION)
+        )
+    return _extraction_variants[exclude]
+
+
+def _extraction_chain(exclude: FrozenSet[str]):
+    system_content, _ = extraction_variant(exclude)
+    return _get_chain(("extraction", exclude), system_content, HUMAN_EXTRACTION_TEMPLATE)
+
+
+async def extract_structured_data_from_text(
+    resume_text: str,
+    exclude: FrozenSet[str] = frozenset()
+) -> Optional[schemas.ResumeExtractedData]:
+    system_content, _ = extraction_variant(exclude)
+    chain = _extraction_chain(exclude)
+    if not chain:
+        logger.error("LLM extraction service (chain) is not available. Cannot process request.")
+        return None
     if not resume_text or not resume_text.strip():
-        print("Resume text is empty or whitespace only; cannot extract data.")
+        logger.warning("Resume text is empty or whitespace only; cannot extract data.")
         return None
 
     try:
-        llm_response_str = await extraction_chain.ainvoke({
-            "resume_text": resume_text
-        })
+        prompt_text = prepare_resume_text(resume_text)
+        llm_response_str = await llm_scheduler.run(
+            lambda: chain.ainvoke({
+                "resume_text": prompt_text
+            }),
+            estimated_tokens=estimate_tokens(system_content, prompt_text) + EXPECTED_OUTPUT_TOKENS,
+            usage_of=response_tokens
+        )
+        record_token_usage("extraction", llm_response_str)
 
-        print("LLM Response: ", llm_response_str);
+        logger.debug("LLM Response: %s", llm_response_str)
 
 
         if not llm_response_str:
-            print("LLM returned an empty string for extraction.")
+            logger.warning("LLM returned an empty string for extraction.")
 
 
         extracted_data = parse_llm_json_output(llm_response_str.content, schemas.ResumeExtractedData)
 
-        print("Ext Data: ", extracted_data);
+        logger.debug("Ext Data: %s", extracted_data)
 
         return extracted_data
     
+    except CircuitOpenError:
+        raise
     except Exception as e:
-        print(f"Unexpected error during LLM data extraction: {e}")
+        logger.exception("Unexpected error during LLM data extraction: %s", e)
     
     return None
 
 
+async def stream_structured_data_from_text(
+    resume_text: str,
+    on_section: Callable[[str, Any], Awaitable[None]],
+    exclude: FrozenSet[str] = frozenset()
+) -> Optional[schemas.ResumeExtractedData]:
+    """Streaming variant of extract_structured_data_from_text.
+
+    `on_section(name, value)` is awaited as soon as each top-level section
+    has streamed in and validated. The return value comes from parsing the
+    full response exactly as the non-streaming call does. If the scheduler
+    retries the call, sections are sent again, so receivers should treat a
+    repeated section as a replacement.
+    """
+    system_content, _ = extraction_variant(exclude)
+    chain = _extraction_chain(exclude)
+    if not chain:
+        logger.error("LLM extraction service (chain) is not available. Cannot process request.")
+        return None
+    if not resume_text or not resume_text.strip():
+        logger.warning("Resume text is empty or whitespace only; cannot extract data.")
+        return None
+
+    prompt_text = prepare_resume_text(resume_text)
+
+    async def stream_call():
+        parser = streaming_json.IncrementalObjectParser()
+        response = None
+        async for chunk in chain.astream({"resume_text": prompt_text}):
+            response = chunk if response is None else response + chunk
+            if not isinstance(chunk.content, str):
+                continue
+            for name, value in parser.feed(chunk.content):
+                section = validate_extraction_section(name, value)
+                if section is not None:
+                    await on_section(name, section)
+        return response
+
+    try:
+        llm_response = await llm_scheduler.run(
+            stream_call,
+            estimated_tokens=estimate_tokens(system_content, prompt_text) + EXPECTED_OUTPUT_TOKENS,
+            usage_of=response_tokens
+        )
+        record_token_usage("extraction", llm_response)
+
+        if not llm_response:
+            logger.warning("LLM returned an empty stream for extraction.")
+            return None
+
+        return parse_llm_json_output(llm_response.content, schemas.ResumeExtractedData)
+
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        logger.exception("Unexpected error during streaming LLM data extraction: %s", e)
+
+    return None
+
+
+EXTRACTION_FIELDS = frozenset(schemas.ResumeExtractedData.model_fields)
+
+
+async def extract_sections_from_text(section_text: str, fields: FrozenSet[str]) -> Optional[Dict[str, Any]]:
+    """Asks for `fields` only, given the part of a resume that holds them (chunked extraction).
+
+    Each field is validated on its own sub-schema. Returns the valid ones as
+    {name: JSON-ready value}, or None if the call failed or did not return a
+    JSON object.
+    """
+    exclude = EXTRACTION_FIELDS - fields
+    system_content, _ = extraction_variant(exclude)
+    chain = _extraction_chain(exclude)
+    if not chain:
+        logger.error("LLM extraction service (chain) is not available. Cannot process request.")
+        return None
+    if not section_text or not section_text.strip():
+        return {}
+
+    try:
+        prompt_text = prepare_resume_text(section_text)
+        llm_response = await llm_scheduler.run(
+            lambda: chain.ainvoke({
+                "resume_text": prompt_text
+            }),
+            # Output shrinks with the fields asked for
+            estimated_tokens=estimate_tokens(system_content, prompt_text)
+            + EXPECTED_OUTPUT_TOKENS * len(fields) // len(EXTRACTION_FIELDS),
+            usage_of=response_tokens
+        )
+        record_token_usage("extraction_chunk", llm_response)
+
+        parsed = parse_llm_json_dict(llm_response.content if llm_response else "")
+        if parsed is None:
+            logger.warning("Failed to parse chunked extraction output for %s.", ", ".join(sorted(fields)))
+            return None
+
+        sections = {}
+        for name in fields:
+            if parsed.get(name) is not None:
+                value = validate_extraction_section(name, parsed[name])
+                if value is not None:
+                    sections[name] = value
+        return sections
+
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        logger.exception("Unexpected error during chunked LLM data extraction: %s", e)
+
+    return None
+
+
 async def analyze_resume_with_llm(extracted_data: schemas.ResumeExtractedData) -> Optional[schemas.LLMAnalysisSchema]:
+    analysis_chain = _get_chain("analysis", SYSTEM_ANALYSIS_CONTENT, HUMAN_ANALYSIS_TEMPLATE)
     if not analysis_chain:
-        print("LLM analysis service (chain) is not available. Cannot process request.")
+        logger.error("LLM analysis service (chain) is not available. Cannot process request.")
         return None
     if not extracted_data:
-        print("Extracted resume data is None or empty; cannot perform analysis.")
+        logger.warning("Extracted resume data is None or empty; cannot perform analysis.")
         return None
     
     try:
-        structured_resume_data_json_str = extracted_data.model_dump_json(indent=2)
+        if PROMPT_COMPACTION_ENABLED:
+            structured_resume_data_json_str = prompt_compaction.compact_model_json(extracted_data)
+        else:
+            structured_resume_data_json_str = extracted_data.model_dump_json(indent=2)
 
-        llm_response_str = await analysis_chain.ainvoke({
-            "structured_resume_data_json_str": structured_resume_data_json_str
-        })
+        llm_response_str = await llm_scheduler.run(
+            lambda: analysis_chain.ainvoke({
+                "structured_resume_data_json_str": structured_resume_data_json_str
+            }),
+            estimated_tokens=estimate_tokens(SYSTEM_ANALYSIS_CONTENT, structured_resume_data_json_str) + EXPECTED_OUTPUT_TOKENS,
+            usage_of=response_tokens
+        )
+        record_token_usage("analysis", llm_response_str)
 
 
         if not llm_response_str:
-            print("LLM returned an empty string for analysis.")
+            logger.warning("LLM returned an empty string for analysis.")
             return None
 
         analysis_data = parse_llm_json_output(llm_response_str.content, schemas.LLMAnalysisSchema)
 
 
         if analysis_data:
-            print("Successfully generated and validated LLM analysis of resume data.")
+            logger.debug("Successfully generated and validated LLM analysis of resume data.")
         else:
-            print("Failed to parse or validate LLM analysis output against schema.")
+            logger.warning("Failed to parse or validate LLM analysis output against schema.")
         return analysis_data
     
+    except CircuitOpenError:
+        raise
     except Exception as e:
-        print(f"Unexpected error during LLM resume analysis: {e}")
+        logger.exception("Unexpected error during LLM resume analysis: %s", e)
     
-    return None
\ No newline at end of file
+    return None
+
+
+async def extract_and_analyze_single_pass(
+    resume_text: str
+) -> Tuple[Optional[schemas.ResumeExtractedData], Optional[schemas.LLMAnalysisSchema]]:
+    """One LLM round trip returning both extraction and analysis.
+
+    Each half is validated on its own, so a bad analysis doesn't throw away
+    a good extraction; the caller decides how to fill in a missing half.
+    """
+    combined_chain = _get_chain("combined", SYSTEM_COMBINED_CONTENT, HUMAN_COMBINED_TEMPLATE)
+    if not combined_chain:
+        logger.error("LLM combined service (chain) is not available. Cannot process request.")
+        return None, None
+    if not resume_text or not resume_text.strip():
+        logger.warning("Resume text is empty or whitespace only; cannot extract data.")
+        return None, None
+
+    try:
+        prompt_text = prepare_resume_text(resume_text)
+        llm_response = await llm_scheduler.run(
+            lambda: combined_chain.ainvoke({
+                "resume_text": prompt_text
+            }),
+            estimated_tokens=estimate_tokens(SYSTEM_COMBINED_CONTENT, prompt_text) + 2 * EXPECTED_OUTPUT_TOKENS,
+            usage_of=response_tokens
+        )
+        record_token_usage("single_pass", llm_response)
+
+        parsed = parse_llm_json_dict(llm_response.content if llm_response else "")
+        if parsed is None:
+            logger.warning("Failed to parse combined LLM output.")
+            return None, None
+
+        extracted_data = validate_section(parsed.get("extracted_data"), schemas.ResumeExtractedData)
+        analysis_data = validate_section(parsed.get("analysis"), schemas.LLMAnalysisSchema)
+        return extracted_data, analysis_data
+
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        logger.exception("Unexpected error during single-pass LLM extraction and analysis: %s", e)
+
+    return None, None
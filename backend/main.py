@@ -1,19 +1,58 @@
+import os
+import asyncio
+import logging
+import metrics
+
 from routes import resume
-from db import Base, engine
-from fastapi import FastAPI
+from batch import BATCH_MAX_REQUEST_BYTES
+from uploads import UPLOAD_MAX_BYTES, UploadTooLarge
+from cache import result_cache
+from read_cache import resume_read_cache
+from parse_pool import parser_pool, PARSER_POOL_WARM_UP
+from llm_scheduler import llm_scheduler
+from pipeline import llm_mode_stats, fast_path_stats, extraction_mode_stats
+from llm_service import token_usage_stats
+from jobs import job_queue, job_runner
+from resume_writer import resume_writer, RESUME_WRITE_BEHIND_ENABLED
+from matching import match_index
+from skill_taxonomy import get_skill_taxonomy
+from init_db import create_tables
+from db import engine
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+# DEBUG also logs the raw LLM responses and parsed payloads
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+
 app = FastAPI()
 
-# ❌ This won't work with AsyncEngine
-# Base.metadata.create_all(bind=engine)
+# Schema creation is a deploy step (python init_db.py); set this for local development only
+DB_CREATE_TABLES_ON_STARTUP = os.getenv("DB_CREATE_TABLES_ON_STARTUP", "false").lower() == "true"
+
+# Allowance for multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
 
 
-async def create_tables():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+# Registered before CORS so that CORS stays the outermost middleware and 413s keep their headers
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    content_length = request.headers.get("content-length")
+    if request.method == "POST" and content_length and content_length.isdigit():
+        if request.url.path.endswith(("/resumes/upload", "/resumes/upload/stream")):
+            max_bytes = UPLOAD_MAX_BYTES
+        elif request.url.path.endswith("/resumes/upload/batch"):
+            max_bytes = BATCH_MAX_REQUEST_BYTES
+        else:
+            max_bytes = None
+
+        if max_bytes is not None and int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+            return JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": str(UploadTooLarge(max_bytes))}
+            )
+    return await call_next(request)
 
-# Run to.run(create_tables())
 
 origins = [
     "http://localhost:3000",
@@ -26,15 +65,139 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Content-Disposition", "Server-Timing"],
 )
 
 
 @app.on_event("startup")
 async def on_startup():
-    await create_tables()
+    if DB_CREATE_TABLES_ON_STARTUP:
+        await create_tables()
+    # Both off the event loop: a large taxonomy takes seconds to build, and each
+    # parser process seconds to spawn, which the first uploads would otherwise pay
+    await asyncio.gather(
+        asyncio.to_thread(get_skill_taxonomy),
+        parser_pool.warm_up() if PARSER_POOL_WARM_UP else asyncio.sleep(0)
+    )
+    if RESUME_WRITE_BEHIND_ENABLED:
+        resume_writer.start()
+    job_runner.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await job_runner.stop()
+    # After the job workers, whose last saves may still be queued
+    await resume_writer.stop()
+    parser_pool.shutdown()
 
 @app.get("/")
 async def root():
     return { "message": "API is working fine" }
 
+@app.get("/stats")
+async def stats():
+    return {
+        "result_cache": result_cache.stats() if result_cache else None,
+        "read_cache": resume_read_cache.stats() if resume_read_cache else None,
+        "parser_pool": parser_pool.stats(),
+        "jobs": job_queue.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "llm_modes": dict(llm_mode_stats),
+        "extraction_fast_path": dict(fast_path_stats),
+        "extraction_modes": dict(extraction_mode_stats),
+        "llm_tokens": token_usage_stats,
+        "match_index": match_index.stats(),
+        "resume_writer": resume_writer.stats(),
+        "db_pool": engine.pool.status(),
+    }
+
+
+def collect_cache_metrics():
+    samples = []
+    if result_cache:
+        # Read straight from the counters; result_cache.stats() also scans the cache table
+        samples += [
+            ("result_cache_hits_total", "counter", "Result cache hits per layer.",
+             [({"layer": layer}, count) for layer, count in result_cache.hits.items()]),
+            ("result_cache_misses_total", "counter", "Result cache misses per layer.",
+             [({"layer": layer}, count) for layer, count in result_cache.misses.items()]),
+        ]
+    if resume_read_cache:
+        samples += [
+            ("read_cache_lookups_total", "counter", "Resume read cache lookups by outcome.", [
+                ({"outcome": "local_hit"}, resume_read_cache.local_hits),
+                ({"outcome": "shared_hit"}, resume_read_cache.shared_hits),
+                ({"outcome": "miss"}, resume_read_cache.misses),
+            ]),
+            ("read_cache_entries", "gauge", "Entries in the local resume read cache.",
+             [({}, resume_read_cache.local.stats()["entries"])]),
+        ]
+    return samples
+
+
+def collect_llm_metrics():
+    scheduler = llm_scheduler.stats()
+    return [
+        ("llm_tokens_total", "counter", "Tokens reported by the LLM provider.", [
+            ({"call": call, "direction": direction}, usage[f"{direction}_tokens"])
+            for call, usage in token_usage_stats.items() for direction in ("input", "output")
+        ]),
+        ("llm_responses_total", "counter", "LLM calls that returned a response.",
+         [({"call": call}, usage["calls"]) for call, usage in token_usage_stats.items()]),
+        ("llm_scheduler_calls_total", "counter", "LLM calls through the scheduler by outcome.", [
+            ({"outcome": "success"}, scheduler["successes"]),
+            ({"outcome": "failure"}, scheduler["failures"]),
+            ({"outcome": "rejected_by_circuit"}, scheduler["rejected_by_circuit"]),
+        ]),
+        ("llm_scheduler_retries_total", "counter", "LLM call retries.", [({}, scheduler["retries"])]),
+        ("llm_scheduler_throttled_seconds_total", "counter", "Time spent waiting for rate limit capacity.",
+         [({}, scheduler["throttled_seconds"])]),
+        ("llm_scheduler_in_flight", "gauge", "LLM calls in flight.", [({}, scheduler["in_flight"])]),
+        ("llm_scheduler_waiting", "gauge", "LLM calls waiting for a slot.", [({}, scheduler["waiting"])]),
+        ("llm_circuit_open", "gauge", "1 while the LLM circuit breaker is not closed.",
+         [({}, 0 if scheduler["circuit_state"] == "closed" else 1)]),
+        ("llm_mode_total", "counter", "Uploads by LLM mode.",
+         [({"mode": mode}, count) for mode, count in llm_mode_stats.items()]),
+        ("llm_extraction_mode_total", "counter", "LLM extractions by mode (single call or chunked by section).",
+         [({"mode": mode}, count) for mode, count in extraction_mode_stats.items()]),
+    ]
+
+
+def collect_parser_metrics():
+    pool = parser_pool.stats()
+    return [
+        ("parser_pool_parses_total", "counter", "Text extractions by outcome.", [
+            ({"outcome": "completed"}, pool["completed"]),
+            ({"outcome": "failed"}, pool["failed"]),
+            ({"outcome": "rejected"}, pool["rejected"]),
+        ]),
+        ("parser_pool_in_flight", "gauge", "Text extractions running.", [({}, pool["in_flight"])]),
+        ("parser_pool_queue_depth", "gauge", "Text extractions waiting for a worker.", [({}, pool["queue_depth"])]),
+    ]
+
+
+def collect_db_pool_metrics():
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return []
+    return [
+        ("db_pool_connections", "gauge", "Pooled database connections by state.", [
+            ({"state": "checked_out"}, pool.checkedout()),
+            ({"state": "idle"}, pool.checkedin()),
+        ]),
+        ("db_pool_overflow", "gauge", "Connections open beyond DB_POOL_SIZE (negative while the pool is not full).",
+         [({}, pool.overflow())]),
+    ]
+
+
+metrics.register_collector(collect_cache_metrics)
+metrics.register_collector(collect_llm_metrics)
+metrics.register_collector(collect_parser_metrics)
+metrics.register_collector(collect_db_pool_metrics)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 app.include_router(resume.router, prefix="/api/v1")
\ No newline at end of file
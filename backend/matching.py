@@ -0,0 +1,310 @@
+import os
+import re
+import sys
+import json
+import math
+import zlib
+import fcntl
+import asyncio
+import logging
+import threading
+import numpy as np
+
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+MATCH_INDEX_DIR = os.getenv("MATCH_INDEX_DIR", "match_index")
+MATCH_DIMENSIONS = int(os.getenv("MATCH_DIMENSIONS", "1024"))
+# Rows scored per step, so float16 -> float32 conversion never materializes the whole matrix
+MATCH_SCORE_CHUNK_ROWS = int(os.getenv("MATCH_SCORE_CHUNK_ROWS", "16384"))
+MATCH_MAX_TOP_K = int(os.getenv("MATCH_MAX_TOP_K", "200"))
+
+# Vectors are stored as float16 to halve the memory-mapped footprint
+STORAGE_DTYPE = np.float16
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the this to was we were will with "
+    "you your experience years work working team ability strong skills".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    words = [word for word in _TOKEN.findall(text.lower()) if word not in _STOPWORDS]
+    # Bigrams keep phrases like "machine learning" apart from their parts
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def hash_vector(text: str, dimensions: int = MATCH_DIMENSIONS) -> np.ndarray:
+    """L2-normalized, sublinear term-frequency vector using the signed hashing trick.
+
+    crc32 rather than hash(): the index is shared between processes, and
+    str hashes are randomized per process.
+    """
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for token, count in Counter(tokenize(text)).items():
+        h = zlib.crc32(token.encode("utf-8"))
+        sign = 1.0 if h & 0x80000000 else -1.0
+        vector[h % dimensions] += sign * (1.0 + math.log(count))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def resume_match_text(db_resume) -> str:
+    """Skills, experience and summary: the parts of a resume a job description is matched on."""
+    parts = []
+    skills = db_resume.skills or {}
+    for item in skills.get("technical", []) + skills.get("tools", []):
+        # Listed twice: an explicit skill weighs more than a passing mention
+        parts += [item.get("name", "")] * 2
+    parts += skills.get("soft", [])
+    for exp in db_resume.work_experience or []:
+        parts += [exp.get("role") or "", exp.get("description") or ""]
+        parts += exp.get("responsibilities", [])
+    parts.append(db_resume.summary or "")
+    return "\n".join(part for part in parts if part)
+
+
+class MatchIndex:
+    """Append-only matrix of resume vectors on disk, memory-mapped for scoring.
+
+    Files in `directory`:
+      vectors.f16 - rows of `dimensions` float16 values
+      ids.i64     - resume id per row; -1 marks a row replaced by a newer one
+      df.npy      - per-dimension document frequency, for IDF
+      meta.json   - committed row count; rows past it are an interrupted append
+
+    Vectors hold plain term frequencies and IDF is applied at query time, so
+    adding a resume never requires re-weighting the others. Appends take an
+    exclusive file lock so several workers can share one index.
+    """
+
+    def __init__(self, directory: str, dimensions: int):
+        self.directory = directory
+        self.dimensions = dimensions
+        self.vectors_path = os.path.join(directory, "vectors.f16")
+        self.ids_path = os.path.join(directory, "ids.i64")
+        self.df_path = os.path.join(directory, "df.npy")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.lock_path = os.path.join(directory, ".lock")
+
+        self._lock = threading.Lock()
+        self._seen_meta_version = None
+        self.count = 0
+        self.df = np.zeros(dimensions, dtype=np.float64)
+        self.vectors: Optional[np.memmap] = None
+        self.ids: Optional[np.memmap] = None
+        self._rows_by_id: Dict[int, int] = {}
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return {"dimensions": self.dimensions, "count": 0}
+        if meta["dimensions"] != self.dimensions:
+            raise ValueError(
+                f"Match index at {self.directory} has {meta['dimensions']} dimensions, expected {self.dimensions}; rebuild it"
+            )
+        return meta
+
+    def _write_meta(self) -> None:
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"dimensions": self.dimensions, "count": self.count}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.meta_path)
+
+    def _meta_version(self) -> Optional[Tuple[int, int]]:
+        # The inode changes when a rebuild swaps meta.json in, even if the mtime happens to match
+        try:
+            st = os.stat(self.meta_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def refresh(self) -> None:
+        """Re-maps the files if another process (or this one) appended since the last look."""
+        version = self._meta_version()
+        if version == self._seen_meta_version and self.vectors is not None:
+            return
+
+        meta = self._read_meta()
+        self.count = meta["count"]
+        self._seen_meta_version = version
+        if self.count == 0:
+            self.vectors, self.ids, self._rows_by_id = None, None, {}
+            return
+
+        self.df = np.load(self.df_path)
+        self._map()
+        self._rows_by_id = {int(resume_id): row for row, resume_id in enumerate(self.ids) if resume_id >= 0}
+
+    def _map(self) -> None:
+        self.vectors = np.memmap(self.vectors_path, dtype=STORAGE_DTYPE, mode="r", shape=(self.count, self.dimensions))
+        self.ids = np.memmap(self.ids_path, dtype=np.int64, mode="r", shape=(self.count,))
+
+    def add(self, entries: List[Tuple[int, np.ndarray]]) -> None:
+        """Appends (resume_id, vector) rows; a resume already in the index is replaced."""
+        if not entries:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+
+        with self._lock, open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self.refresh()
+
+            replaced = [self._rows_by_id[resume_id] for resume_id, _ in entries if resume_id in self._rows_by_id]
+            if replaced:
+                ids = np.memmap(self.ids_path, dtype=np.int64, mode="r+", shape=(self.count,))
+                stale = np.asarray(np.memmap(self.vectors_path, dtype=STORAGE_DTYPE, mode="r", shape=(self.count, self.dimensions))[replaced], dtype=np.float32)
+                self.df -= (stale != 0).sum(axis=0)
+                ids[replaced] = -1
+                ids.flush()
+
+            vectors = np.stack([vector for _, vector in entries]).astype(STORAGE_DTYPE)
+            new_ids = np.array([resume_id for resume_id, _ in entries], dtype=np.int64)
+
+            # Drop bytes left by an append that crashed before meta.json was updated
+            for path, row_bytes in ((self.vectors_path, self.dimensions * 2), (self.ids_path, 8)):
+                with open(path, "ab") as f:
+                    f.truncate(self.count * row_bytes)
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.ids_path, "ab") as f:
+                f.write(new_ids.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            self.df += (vectors != 0).sum(axis=0)
+            np.save(self.df_path, self.df)
+            start = self.count
+            self.count += len(entries)
+            self._write_meta()
+
+            # Our own append: update in place instead of rescanning every id on the next refresh
+            for offset, resume_id in enumerate(new_ids):
+                self._rows_by_id[int(resume_id)] = start + offset
+            self._map()
+            self._seen_meta_version = self._meta_version()
+
+    def replace_files(self, source: "MatchIndex") -> None:
+        """Moves the files of a freshly built index over this one's, under the same lock as appends."""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            for name in ("vectors.f16", "ids.i64", "df.npy"):
+                if os.path.exists(os.path.join(source.directory, name)):
+                    os.replace(os.path.join(source.directory, name), os.path.join(self.directory, name))
+            # meta.json last: until it moves, readers keep using the old row count
+            if os.path.exists(source.meta_path):
+                os.replace(source.meta_path, self.meta_path)
+            # Reloaded under the lock, so the next append starts from the new row count
+            self._seen_meta_version = None
+            self.refresh()
+
+    def top_k(self, query_text: str, k: int) -> List[Tuple[int, float]]:
+        """(resume_id, cosine score) of the best k resumes under TF-IDF weighting."""
+        with self._lock:
+            self.refresh()
+            if self.count == 0:
+                return []
+            vectors, ids, df, count = self.vectors, self.ids, self.df, self.count
+            live_docs = len(self._rows_by_id) or 1
+
+        idf = np.log((1.0 + live_docs) / (1.0 + df)).astype(np.float32) + 1.0
+        query = hash_vector(query_text, self.dimensions) * idf
+        query_norm = np.linalg.norm(query)
+        if not query_norm:
+            return []
+        # cos(q*idf, r*idf) = r . (q*idf*idf) / (|r*idf| |q*idf|)
+        weighted_query = query * idf / query_norm
+        idf_squared = idf * idf
+
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, MATCH_SCORE_CHUNK_ROWS):
+            chunk = np.asarray(vectors[start:start + MATCH_SCORE_CHUNK_ROWS], dtype=np.float32)
+            norms = np.sqrt((chunk * chunk) @ idf_squared)
+            norms[norms == 0] = 1.0
+            scores[start:start + len(chunk)] = (chunk @ weighted_query) / norms
+        scores[np.asarray(ids) < 0] = -np.inf
+
+        k = min(k, count)
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        # Tombstoned rows score -inf; a resume sharing no terms with the JD is not a match
+        return [(int(ids[row]), float(scores[row])) for row in best if scores[row] > 0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, resumes = self.count, len(self._rows_by_id)
+        return {
+            "rows": count,
+            "resumes": resumes,
+            "dimensions": self.dimensions,
+            "bytes": count * self.dimensions * np.dtype(STORAGE_DTYPE).itemsize,
+        }
+
+
+match_index = MatchIndex(MATCH_INDEX_DIR, MATCH_DIMENSIONS)
+
+
+async def index_resumes(db_resumes) -> None:
+    """Adds stored resumes with extracted data to the match index, off the event loop."""
+    entries = []
+    for db_resume in db_resumes:
+        text = resume_match_text(db_resume)
+        if db_resume.id is not None and text:
+            entries.append((db_resume.id, hash_vector(text)))
+    if not entries:
+        return
+    try:
+        await asyncio.to_thread(match_index.add, entries)
+    except Exception as e:
+        # The resume is already saved; it only misses out on matching until the next rebuild
+        logger.warning("Failed to add %d resumes to the match index: %s", len(entries), e)
+
+
+async def rebuild(batch_size: int = 500) -> int:
+    """Builds a fresh index from every stored resume, streaming rows from the database."""
+    import models
+    from db import SessionLocal
+    from sqlalchemy import select
+
+    tmp_index = MatchIndex(MATCH_INDEX_DIR + ".rebuild", MATCH_DIMENSIONS)
+    for name in ("vectors.f16", "ids.i64", "df.npy", "meta.json"):
+        path = os.path.join(tmp_index.directory, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+    total = 0
+    async with SessionLocal() as db:
+        result = await db.stream(
+            select(models.Resume.id, models.Resume.skills, models.Resume.work_experience, models.Resume.summary)
+            .order_by(models.Resume.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            entries = [(row.id, hash_vector(resume_match_text(row))) for row in rows]
+            await asyncio.to_thread(tmp_index.add, [(i, v) for i, v in entries if v.any()])
+            total += len(entries)
+            print(f"Indexed {total} resumes")
+
+    await asyncio.to_thread(match_index.replace_files, tmp_index)
+    return total
+
+
+if __name__ == "__main__":
+    # Backfill or recover the index: `python matching.py --rebuild`
+    if "--rebuild" not in sys.argv:
+        print("Usage: python matching.py --rebuild")
+        sys.exit(1)
+    print(f"Rebuilt match index with {asyncio.run(rebuild())} resumes")
@@ -0,0 +1,196 @@
+"""In-process counters and histograms, rendered in the Prometheus text format at GET /metrics.
+
+Values are per process; with several workers, scrape each one (or sum in
+the query). Gauges for state that other modules already track (caches,
+the LLM scheduler, the parser pool) are read at scrape time through
+registered collectors instead of being counted twice; the same goes for
+token usage, which llm_service already totals per call type.
+"""
+import math
+import time
+import logging
+import threading
+import contextvars
+
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds; spans cache hits (ms) through slow LLM calls (a minute or more)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per label set: [bucket counts..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, state):
+                    cumulative += count
+                    le = 'le="' + _number(bound) + '"'
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {_number(cumulative)}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(state[-2])}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {_number(state[-1])}")
+        return lines
+
+
+# (name, type, help, [(labels dict, value)]) per metric, computed at scrape time
+Collector = Callable[[], List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+_metrics: List = []
+_collectors: List[Collector] = []
+
+
+def counter(name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    metric = Counter(name, help, labelnames)
+    _metrics.append(metric)
+    return metric
+
+
+def histogram(name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+    metric = Histogram(name, help, labelnames, buckets)
+    _metrics.append(metric)
+    return metric
+
+
+def register_collector(collector: Collector) -> None:
+    _collectors.append(collector)
+
+
+def render() -> str:
+    lines = []
+    for metric in _metrics:
+        lines += metric.render()
+    for collector in _collectors:
+        try:
+            samples = collector()
+        except Exception as e:
+            # One broken collector must not take the whole scrape down
+            logger.warning("Metrics collector %s failed: %s", getattr(collector, '__name__', collector), e)
+            continue
+        for name, kind, help, values in samples:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            for labels, value in values:
+                label_text = _labels(tuple(labels), tuple(labels.values()))
+                lines.append(f"{name}{label_text} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = histogram(
+    "resume_stage_seconds", "Time spent in each processing stage of a resume.", ("stage",)
+)
+STAGE_FAILURES = counter(
+    "resume_stage_failures_total", "Processing stages that raised or returned no result.", ("stage",)
+)
+
+
+# Stage durations of the request being handled, for its Server-Timing header
+_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("stage_timings", default=None)
+
+
+class Span:
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.failed = False
+
+    def fail(self) -> None:
+        """Marks the stage as failed without an exception (e.g. the LLM returned nothing usable)."""
+        self.failed = True
+
+
+@contextmanager
+def stage(name: str) -> Iterator[Span]:
+    """Times a block into resume_stage_seconds and the current request's timings."""
+    span = Span(name)
+    start = time.perf_counter()
+    try:
+        yield span
+    except Exception:
+        span.failed = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        if span.failed:
+            STAGE_FAILURES.inc(stage=name)
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def start_timings() -> Dict[str, float]:
+    """Collects the stage durations of the current task (and tasks it creates from here on)."""
+    timings: Dict[str, float] = {}
+    _timings.set(timings)
+    return timings
+
+
+def server_timing(timings: Dict[str, float]) -> str:
+    """Server-Timing header value; browsers show it in the network panel."""
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
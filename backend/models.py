@@ -1,15 +1,29 @@
 from db import Base
 
-from sqlalchemy import Column, Integer, String, JSON, Text, func, DateTime
+from sqlalchemy import Column, Integer, String, JSON, Text, Float, func, DateTime, Index, ForeignKey, LargeBinary
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 
 class Resume(Base):
     __tablename__ = "resumes"
+    # Server defaults (uploaded_at) come back with the INSERT, so no refresh round trip is needed
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
 
     file_name = Column(String, index=True)
-    raw_text = Column(Text, nullable=True)
+
+    # Raw text and original upload live in `blobs` (see blob_store.py); rows only point at them by hash
+    raw_text_hash = Column(String(64), nullable=True)
+    file_hash = Column(String(64), nullable=True)
+    # Upload job that created the row (see jobs.py); uniquely indexed so a retried job cannot insert twice
+    job_id = Column(String(32), nullable=True)
+    # Inline raw text of rows stored before blobs existed; NULL for newer rows
+    legacy_raw_text = deferred(Column("raw_text", Text, nullable=True))
+    # Not mapped: set on new rows by crud.build_resume and on loaded rows by blob_store.load_raw_texts
+    raw_text = None
 
     skills = Column(JSON, nullable=True)
     awards = Column(JSON, nullable=True)
@@ -20,9 +34,90 @@ class Resume(Base):
     certifications = Column(JSON, nullable=True)
     work_experience = Column(JSON, nullable=True)
 
-    uploaded_at = Column(DateTime(timezone=True), server_default=func.now())  # auto-timestamp
+    # SQLite keeps CURRENT_TIMESTAMP text without fractional seconds, and compares as text; binding cursor and
+    # filter values in the same format keeps `uploaded_at < :value` correct at second boundaries
+    uploaded_at = Column(
+        DateTime(timezone=True).with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite"),
+        server_default=func.now()
+    )  # auto-timestamp
+    # Bumped by every update of a stored row; part of the read cache key (NULL until the first update)
+    version = Column(Integer, nullable=True)
 
     llm_analysis = Column(JSON, nullable=True)
+    llm_mode = Column(String, nullable=True)  # two_pass / single_pass / single_pass_fallback
+
+    # ResumeSectionsSchema JSON built at insert time and served without re-validation; NULL for older rows
+    payload = Column(Text, nullable=True)
+
+    # Denormalized from the JSON columns at insert time so filters can use indexes
+    candidate_name = Column(String, nullable=True, index=True)
+    candidate_email = Column(String, nullable=True, index=True)
+    resume_rating = Column(Float, nullable=True, index=True)
+    total_experience_months = Column(Integer, nullable=True, index=True)
+    highest_degree = Column(String, nullable=True, index=True)
+    highest_degree_level = Column(Integer, nullable=True, index=True)
+
+    # Weighted full-text vector (see search.py); SQLite keeps its index in the resume_search FTS5 table instead
+    search_vector = Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True)
+
+    roles = relationship("ResumeRole", back_populates="resume", cascade="all, delete-orphan", lazy="raise")
+    canonical_skills = relationship("ResumeSkill", back_populates="resume", cascade="all, delete-orphan", lazy="raise")
+
+    __table_args__ = (
+        # Backs keyset pagination on (uploaded_at, id); btrees scan backwards for DESC order
+        Index("ix_resumes_uploaded_at_id", "uploaded_at", "id"),
+        Index("ix_resumes_job_id", "job_id", unique=True),
+        Index("ix_resumes_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Resume(id={self.id}, filename={self.file_name})>"
+
+
+class ResumeRole(Base):
+    __tablename__ = "resume_roles"
+
+    id = Column(Integer, primary_key=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False, index=True)
+    role = Column(String, nullable=False)  # normalized: lowercase, single spaces
+
+    resume = relationship("Resume", back_populates="roles")
+
+    __table_args__ = (
+        Index("ix_resume_roles_role_resume_id", "role", "resume_id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ResumeRole(resume_id={self.resume_id}, role={self.role})>"
+
+
+class ResumeSkill(Base):
+    __tablename__ = "resume_skills"
+
+    id = Column(Integer, primary_key=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False, index=True)
+    skill_id = Column(String, nullable=False)  # canonical id from skill_taxonomy.json
+
+    resume = relationship("Resume", back_populates="canonical_skills")
+
+    __table_args__ = (
+        Index("ix_resume_skills_skill_id_resume_id", "skill_id", "resume_id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ResumeSkill(resume_id={self.resume_id}, skill_id={self.skill_id})>"
+
+
+class Blob(Base):
+    __tablename__ = "blobs"
+
+    hash = Column(String(64), primary_key=True)  # SHA-256 of the uncompressed content
+    codec = Column(String, nullable=False)  # zstd / zlib / none
+    size = Column(Integer, nullable=False)  # uncompressed bytes
+    stored_size = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     def __repr__(self) -> str:
-        return f"<Resume(id={self.id}, filename={self.file_name})>"
\ No newline at end of file
+        return f"<Blob(hash={self.hash}, codec={self.codec}, size={self.size})>"
@@ -0,0 +1,23 @@
+import json
+import base64
+
+from datetime import datetime
+from typing import Tuple
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(uploaded_at: datetime, resume_id: int) -> str:
+    payload = json.dumps([uploaded_at.isoformat(), resume_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        uploaded_at, resume_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(uploaded_at), int(resume_id)
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
@@ -0,0 +1,124 @@
+import os
+import time
+import asyncio
+import multiprocessing
+
+from typing import Optional
+from dotenv import load_dotenv
+from concurrent.futures import ProcessPoolExecutor
+
+
+load_dotenv()
+
+PARSER_POOL_WORKERS = int(os.getenv("PARSER_POOL_WORKERS", str(os.cpu_count() or 2)))
+PARSER_POOL_MAX_QUEUE = int(os.getenv("PARSER_POOL_MAX_QUEUE", "16"))
+PARSER_POOL_RETRY_AFTER_SECONDS = int(os.getenv("PARSER_POOL_RETRY_AFTER_SECONDS", "5"))
+# Start the workers at startup instead of on the first upload
+PARSER_POOL_WARM_UP = os.getenv("PARSER_POOL_WARM_UP", "true").lower() == "true"
+
+
+class ParserPoolSaturated(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Parser pool is saturated")
+        self.retry_after = retry_after
+
+
+def _timed_call(fn, *args):
+    # Runs inside the worker process so the measured time excludes queue wait
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _warm_up() -> int:
+    # The parser imports (pdfminer, python-docx) are most of a worker's start-up time
+    import resume_parser  # noqa: F401
+    return os.getpid()
+
+
+class ParserPool:
+    """Process pool for blocking document parsing with admission control.
+
+    At most `workers` jobs run at once and at most `max_queue` more wait for a
+    free worker; anything beyond that is rejected immediately so latency stays
+    bounded instead of growing with the backlog.
+    """
+
+    def __init__(self, workers: int, max_queue: int, retry_after: int):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_parse_seconds = 0.0
+        self.max_parse_seconds = 0.0
+        self.total_wait_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn avoids forking the event loop and open DB connections into workers
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def warm_up(self) -> int:
+        """Starts every worker process and loads the parsers in it; returns the number of workers started."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        # Submitted together, so no worker is idle yet and the executor spawns one per task
+        pids = await asyncio.gather(*(loop.run_in_executor(executor, _warm_up) for _ in range(self.workers)))
+        return len(set(pids))
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.in_flight - self.workers)
+
+    async def run(self, fn, *args):
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise ParserPoolSaturated(self.retry_after)
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, parse_seconds = await loop.run_in_executor(self._get_executor(), _timed_call, fn, *args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+        self.completed += 1
+        self.total_parse_seconds += parse_seconds
+        self.max_parse_seconds = max(self.max_parse_seconds, parse_seconds)
+        self.total_wait_seconds += max(0.0, time.perf_counter() - start - parse_seconds)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_parse_seconds": self.total_parse_seconds / self.completed if self.completed else 0.0,
+            "max_parse_seconds": self.max_parse_seconds,
+            "avg_wait_seconds": self.total_wait_seconds / self.completed if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+parser_pool = ParserPool(PARSER_POOL_WORKERS, PARSER_POOL_MAX_QUEUE, PARSER_POOL_RETRY_AFTER_SECONDS)
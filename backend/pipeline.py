@@ -0,0 +1,455 @@
+import os
+import random
+import schemas
+import asyncio
+import logging
+import metrics
+import llm_service
+import resume_parser
+
+from dotenv import load_dotenv
+from typing import Any, Dict, FrozenSet, List, Optional, Union, Callable, Awaitable, Tuple
+from pydantic import ValidationError
+from parse_pool import parser_pool
+from skill_taxonomy import get_skill_taxonomy, SKILL_EXTRACTION_MODE
+from cache import result_cache, hash_bytes, hash_file, hash_text, normalize_text, make_key
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Fraction of uploads that use one combined LLM call instead of extraction + analysis;
+# 0 keeps the two-call path, 1 always uses single-pass, anything between is an A/B split
+LLM_SINGLE_PASS_RATIO = float(os.getenv("LLM_SINGLE_PASS_RATIO", "0"))
+
+# Fill contact info with resume_parser's rules and ask the LLM for the rest only
+EXTRACTION_FAST_PATH_ENABLED = os.getenv("EXTRACTION_FAST_PATH_ENABLED", "true").lower() == "true"
+
+# Resumes with at least this many characters of text are extracted section by section,
+# one smaller prompt per section, run concurrently; 0 disables chunked extraction
+EXTRACTION_CHUNKED_MIN_CHARS = int(os.getenv("EXTRACTION_CHUNKED_MIN_CHARS", "12000"))
+
+# resume_parser sections that get their own call when found; the section names are the field names.
+# Everything else (header, summary, skills, publications, unrecognised text) goes to one call for the remaining fields
+CHUNKED_SECTION_GROUPS = (
+    ("work_experience",),
+    ("education",),
+    ("projects",),
+    ("certifications", "awards"),
+)
+# Shorter sections stay in the call for the remaining fields
+MIN_CHUNK_CHARS = 300
+
+fast_path_stats = {"used": 0, "skipped": 0}
+
+extraction_mode_stats = {"single_call": 0, "chunked": 0, "chunked_fallback": 0}
+
+llm_mode_stats = {
+    "two_pass": 0,
+    "single_pass": 0,
+    "single_pass_fallback_extraction": 0,
+    "single_pass_fallback_analysis": 0,
+}
+
+
+async def get_raw_text(
+    file_name: str,
+    file_source: Union[bytes, memoryview, str],
+    file_hash: Optional[str] = None
+) -> str:
+    # Only bytes or a path can cross into the parser processes; a view is copied once, here
+    parser_source = bytes(file_source) if isinstance(file_source, memoryview) else file_source
+    if result_cache is None:
+        with metrics.stage("parse"):
+            return await parser_pool.run(resume_parser.extract_text_from_resume, file_name, parser_source)
+
+    if file_hash is None:
+        if isinstance(file_source, str):
+            file_hash = await asyncio.to_thread(hash_file, file_source)
+        else:
+            file_hash = hash_bytes(file_source)
+
+    file_ext = file_name.split('.')[-1].lower()
+    key = make_key(file_hash, file_ext, resume_parser.PARSER_VERSION)
+
+    cached_text = await result_cache.aget("text", key)
+    if cached_text is not None:
+        return cached_text
+
+    with metrics.stage("parse"):
+        raw_text = await parser_pool.run(resume_parser.extract_text_from_resume, file_name, parser_source)
+    await result_cache.aset("text", key, raw_text)
+    return raw_text
+
+
+def fast_path_fields(raw_text: str) -> Dict[str, Any]:
+    """Fields the rule-based extractors fill confidently enough to leave out of the LLM prompt."""
+    known = {}
+    if not raw_text:
+        return known
+
+    if EXTRACTION_FAST_PATH_ENABLED:
+        contact = resume_parser.extract_contact_info(raw_text)
+        try:
+            contact_info = schemas.ContactInfoSchema.model_validate(contact)
+        except ValidationError:
+            contact.pop("email", None)
+            contact_info = schemas.ContactInfoSchema.model_validate(contact)
+
+        # A name alone is too easy to get wrong; with an email or phone the header was found
+        if contact_info.name and (contact_info.email or contact_info.phone):
+            fast_path_stats["used"] += 1
+            known["contact_info"] = contact_info
+        else:
+            fast_path_stats["skipped"] += 1
+
+    taxonomy = get_skill_taxonomy()
+    if taxonomy is not None and SKILL_EXTRACTION_MODE == "replace":
+        known["skills"] = taxonomy.skill_set(taxonomy.find(raw_text))
+    return known
+
+
+def taxonomy_skills(skills: Optional[schemas.SkillSetSchema], raw_text: str) -> Optional[schemas.SkillSetSchema]:
+    """Skills found in the text by the taxonomy matcher, merged into the LLM's unless in replace mode.
+
+    None when skill matching is off.
+    """
+    taxonomy = get_skill_taxonomy()
+    if taxonomy is None:
+        return None
+    found = taxonomy.find(raw_text or "")
+    if SKILL_EXTRACTION_MODE == "replace":
+        return taxonomy.skill_set(found)
+    return taxonomy.canonicalize(skills, found)
+
+
+def apply_rule_fields(
+    extracted_data: Optional[schemas.ResumeExtractedData],
+    raw_text: str,
+    known: Dict[str, Any]
+) -> Optional[schemas.ResumeExtractedData]:
+    """Merges the rule-based fields into the LLM's extraction.
+
+    Done after the extraction cache, so changing the rules or the taxonomy
+    never serves a stale merge.
+    """
+    if extracted_data is None:
+        return None
+    if known:
+        extracted_data = extracted_data.model_copy(update=known)
+    if "skills" not in known:
+        skills = taxonomy_skills(extracted_data.skills, raw_text)
+        if skills is not None:
+            extracted_data = extracted_data.model_copy(update={"skills": skills})
+    return extracted_data
+
+
+async def _timed_llm_call(stage: str, call: Awaitable):
+    # The llm_service calls swallow their errors and return None, which counts as a failure here too
+    with metrics.stage(stage) as span:
+        result = await call
+        if not (all(result) if isinstance(result, tuple) else result):
+            span.fail()
+        return result
+
+
+def _section_block(name: str, text: str) -> str:
+    return text if name == "header" else f"{name.replace('_', ' ').title()}\n{text}"
+
+
+def plan_extraction_chunks(raw_text: str, exclude: FrozenSet[str] = frozenset()) -> Optional[List[Tuple[FrozenSet[str], str]]]:
+    """(fields, text) per LLM call for chunked extraction.
+
+    None when the text is under EXTRACTION_CHUNKED_MIN_CHARS or too few
+    sections were recognised for splitting to help.
+    """
+    if not EXTRACTION_CHUNKED_MIN_CHARS or len(raw_text) < EXTRACTION_CHUNKED_MIN_CHARS:
+        return None
+
+    sections = resume_parser.split_sections(raw_text)
+    chunks = []
+    for group in CHUNKED_SECTION_GROUPS:
+        names = [name for name in group if name not in exclude and len(sections.get(name, "")) >= MIN_CHUNK_CHARS]
+        if names:
+            chunks.append((frozenset(names), "\n\n".join(_section_block(name, sections.pop(name)) for name in names)))
+    if not chunks:
+        return None
+
+    remaining_fields = llm_service.EXTRACTION_FIELDS - exclude - frozenset().union(*(fields for fields, _ in chunks))
+    remaining_text = "\n\n".join(_section_block(name, text) for name, text in sections.items() if text)
+    if remaining_fields and remaining_text:
+        chunks.append((remaining_fields, remaining_text))
+    return chunks if len(chunks) > 1 else None
+
+
+async def get_chunked_extraction(
+    chunks: List[Tuple[FrozenSet[str], str]],
+    on_section: Optional[Callable[[str, Any], Awaitable[None]]] = None
+) -> Optional[schemas.ResumeExtractedData]:
+    """Runs the chunk calls concurrently and merges them; None if any chunk failed."""
+    async def run_chunk(fields: FrozenSet[str], text: str) -> Optional[Dict[str, Any]]:
+        sections = await llm_service.extract_sections_from_text(text, fields)
+        if sections is not None and on_section:
+            for name, value in sections.items():
+                await on_section(name, value)
+        return sections
+
+    results = await asyncio.gather(*(run_chunk(fields, text) for fields, text in chunks))
+    if any(sections is None for sections in results):
+        return None
+    merged = {}
+    for sections in results:
+        merged.update(sections)
+    return schemas.ResumeExtractedData.model_validate(merged)
+
+
+async def _llm_extraction(
+    raw_text: str,
+    exclude: FrozenSet[str],
+    on_section: Optional[Callable[[str, Any], Awaitable[None]]] = None
+) -> Optional[schemas.ResumeExtractedData]:
+    """Chunked extraction for long resumes, one call otherwise.
+
+    If a chunk fails, the whole text goes through the single call instead, so
+    the result is never worse than without chunking.
+    """
+    chunks = plan_extraction_chunks(raw_text, exclude)
+    if chunks is not None:
+        extracted_data = await get_chunked_extraction(chunks, on_section)
+        if extracted_data is not None:
+            extraction_mode_stats["chunked"] += 1
+            return extracted_data
+        extraction_mode_stats["chunked_fallback"] += 1
+    else:
+        extraction_mode_stats["single_call"] += 1
+
+    if on_section:
+        return await llm_service.stream_structured_data_from_text(raw_text, on_section, exclude)
+    return await llm_service.extract_structured_data_from_text(raw_text, exclude)
+
+
+def _extraction_key(raw_text: str, exclude: FrozenSet[str] = frozenset()) -> str:
+    _, prompt_version = llm_service.extraction_variant(exclude)
+    return make_key(hash_text(normalize_text(raw_text)), prompt_version, llm_service.LLM_MODEL_ID)
+
+
+async def get_extracted_data(raw_text: str) -> Optional[schemas.ResumeExtractedData]:
+    known = fast_path_fields(raw_text)
+    exclude = frozenset(known)
+    key = _extraction_key(raw_text, exclude) if result_cache is not None and raw_text else None
+
+    cached_data = await result_cache.aget_json("extraction", key) if key else None
+    if cached_data is not None:
+        extracted_data = schemas.ResumeExtractedData.model_validate(cached_data)
+    else:
+        extracted_data = await _timed_llm_call("llm_extract", _llm_extraction(raw_text, exclude))
+        if key and extracted_data:
+            await result_cache.aset_json("extraction", key, extracted_data.model_dump(mode="json"))
+    return apply_rule_fields(extracted_data, raw_text, known)
+
+
+async def stream_extracted_data(
+    raw_text: str,
+    on_section: Callable[[str, Any], Awaitable[None]]
+) -> Optional[schemas.ResumeExtractedData]:
+    """get_extracted_data, reporting each section through `on_section` as it becomes available.
+
+    Shares the extraction cache layer with the non-streaming path; a cache hit
+    reports every section at once.
+    """
+    known = fast_path_fields(raw_text)
+    exclude = frozenset(known)
+    key = _extraction_key(raw_text, exclude) if result_cache is not None and raw_text else None
+
+    cached_data = await result_cache.aget_json("extraction", key) if key else None
+    if cached_data is not None:
+        extracted_data = apply_rule_fields(schemas.ResumeExtractedData.model_validate(cached_data), raw_text, known)
+        for name, value in extracted_data.model_dump(mode="json").items():
+            await on_section(name, value)
+        return extracted_data
+
+    # Rule-based fields are ready before the LLM has produced anything
+    for name, value in known.items():
+        await on_section(name, value.model_dump(mode="json"))
+
+    async def on_llm_section(name: str, value: Any) -> None:
+        if name == "skills":
+            skills = taxonomy_skills(schemas.SkillSetSchema.model_validate(value), raw_text)
+            value = skills.model_dump(mode="json") if skills is not None else value
+        await on_section(name, value)
+
+    extracted_data = await _timed_llm_call(
+        "llm_extract", _llm_extraction(raw_text, exclude, on_llm_section)
+    )
+    if key and extracted_data:
+        await result_cache.aset_json("extraction", key, extracted_data.model_dump(mode="json"))
+    return apply_rule_fields(extracted_data, raw_text, known)
+
+
+async def get_llm_analysis(extracted_data: schemas.ResumeExtractedData) -> Optional[schemas.LLMAnalysisSchema]:
+    if result_cache is None or not extracted_data:
+        return await _timed_llm_call("llm_analyze", llm_service.analyze_resume_with_llm(extracted_data))
+
+    key = make_key(
+        hash_text(extracted_data.model_dump_json()),
+        llm_service.ANALYSIS_PROMPT_VERSION,
+        llm_service.LLM_MODEL_ID
+    )
+
+    cached_analysis = await result_cache.aget_json("analysis", key)
+    if cached_analysis is not None:
+        return schemas.LLMAnalysisSchema.model_validate(cached_analysis)
+
+    llm_analysis = await _timed_llm_call("llm_analyze", llm_service.analyze_resume_with_llm(extracted_data))
+    if llm_analysis:
+        await result_cache.aset_json("analysis", key, llm_analysis.model_dump(mode="json"))
+    return llm_analysis
+
+
+async def get_single_pass_results(
+    raw_text: str
+) -> Tuple[Optional[schemas.ResumeExtractedData], Optional[schemas.LLMAnalysisSchema]]:
+    if result_cache is None:
+        return await _timed_llm_call("llm_single_pass", llm_service.extract_and_analyze_single_pass(raw_text))
+
+    # Both halves come from the same text, so both layers are keyed by it
+    key = make_key(
+        hash_text(normalize_text(raw_text)),
+        llm_service.COMBINED_PROMPT_VERSION,
+        llm_service.LLM_MODEL_ID
+    )
+
+    cached_data = await result_cache.aget_json("extraction", key)
+    cached_analysis = await result_cache.aget_json("analysis", key)
+    if cached_data is not None and cached_analysis is not None:
+        return (
+            schemas.ResumeExtractedData.model_validate(cached_data),
+            schemas.LLMAnalysisSchema.model_validate(cached_analysis)
+        )
+
+    extracted_data, llm_analysis = await _timed_llm_call(
+        "llm_single_pass", llm_service.extract_and_analyze_single_pass(raw_text)
+    )
+    if extracted_data:
+        await result_cache.aset_json("extraction", key, extracted_data.model_dump(mode="json"))
+    if llm_analysis:
+        await result_cache.aset_json("analysis", key, llm_analysis.model_dump(mode="json"))
+    return extracted_data, llm_analysis
+
+
+def use_single_pass(single_pass: Optional[bool] = None) -> bool:
+    if single_pass is not None:
+        return single_pass
+    return LLM_SINGLE_PASS_RATIO > 0 and random.random() < LLM_SINGLE_PASS_RATIO
+
+
+async def get_llm_results(
+    raw_text: str,
+    single_pass: Optional[bool] = None,
+    on_stage: Optional[Callable[[str, int], Awaitable[None]]] = None
+) -> Tuple[Optional[schemas.ResumeExtractedData], Optional[schemas.LLMAnalysisSchema], str]:
+    """Returns (extracted_data, llm_analysis, llm_mode).
+
+    In single-pass mode a half that fails validation is redone with the
+    matching two-call step, so the result is never worse than two-pass.
+    """
+    if not use_single_pass(single_pass):
+        llm_mode_stats["two_pass"] += 1
+        extracted_data = await get_extracted_data(raw_text)
+        if not extracted_data:
+            return None, None, "two_pass"
+        if on_stage:
+            await on_stage("analyzing", 65)
+        return extracted_data, await get_llm_analysis(extracted_data), "two_pass"
+
+    llm_mode_stats["single_pass"] += 1
+    extracted_data, llm_analysis = await get_single_pass_results(raw_text)
+    # The combined prompt asks for every field, so only the skills are post-processed
+    extracted_data = apply_rule_fields(extracted_data, raw_text, {})
+
+    if not extracted_data:
+        llm_mode_stats["single_pass_fallback_extraction"] += 1
+        extracted_data = await get_extracted_data(raw_text)
+        llm_analysis = await get_llm_analysis(extracted_data) if extracted_data else None
+        return extracted_data, llm_analysis, "single_pass_fallback"
+
+    if not llm_analysis:
+        llm_mode_stats["single_pass_fallback_analysis"] += 1
+        llm_analysis = await get_llm_analysis(extracted_data)
+        return extracted_data, llm_analysis, "single_pass_fallback"
+
+    return extracted_data, llm_analysis, "single_pass"
+
+
+async def get_llm_results_streaming(
+    raw_text: str,
+    on_section: Callable[[str, Any], Awaitable[None]]
+) -> Tuple[Optional[schemas.ResumeExtractedData], Optional[schemas.LLMAnalysisSchema], str]:
+    """Two-pass get_llm_results with extraction sections reported as they stream in."""
+    llm_mode_stats["two_pass"] += 1
+    extracted_data = await stream_extracted_data(raw_text, on_section)
+    if not extracted_data:
+        return None, None, "two_pass"
+    return extracted_data, await get_llm_analysis(extracted_data), "two_pass"
+
+
+MIN_RAW_TEXT_LENGTH = 30
+
+
+class ProcessedResume:
+    def __init__(
+        self,
+        file_name: str,
+        raw_text: str,
+        extracted_data: Optional[schemas.ResumeExtractedData] = None,
+        llm_analysis: Optional[schemas.LLMAnalysisSchema] = None,
+        error: Optional[str] = None,
+        llm_mode: Optional[str] = None
+    ):
+        self.file_name = file_name
+        self.raw_text = raw_text
+        self.extracted_data = extracted_data
+        self.llm_analysis = llm_analysis
+        self.error = error
+        self.llm_mode = llm_mode
+
+
+async def process_resume(
+    file_name: str,
+    file_source: Union[bytes, memoryview, str],
+    file_hash: Optional[str] = None,
+    on_stage: Optional[Callable[[str, int], Awaitable[None]]] = None,
+    single_pass: Optional[bool] = None
+) -> ProcessedResume:
+    """Runs parse, extraction and analysis for one file.
+
+    Parsing errors (unsupported type, saturated parser pool) propagate to the
+    caller. Later failures are reported through `error` so the raw text can
+    still be saved, matching the single-upload endpoint.
+    """
+    if on_stage:
+        await on_stage("parsing", 10)
+    raw_text = await get_raw_text(file_name, file_source, file_hash)
+
+    if not raw_text or len(raw_text.strip()) < MIN_RAW_TEXT_LENGTH:
+        return ProcessedResume(
+            file_name,
+            raw_text or "Extraction failed or empty",
+            error="Could not extract sufficient text."
+        )
+
+    if on_stage:
+        await on_stage("extracting", 35)
+    extracted_data, llm_analysis, llm_mode = await get_llm_results(raw_text, single_pass, on_stage)
+    if not extracted_data:
+        return ProcessedResume(
+            file_name,
+            raw_text,
+            error="LLM failed to extract structured data. Raw text has been saved.",
+            llm_mode=llm_mode
+        )
+
+    if not llm_analysis:
+        logger.warning("LLM analysis failed for %s", file_name)
+
+    return ProcessedResume(file_name, raw_text, extracted_data, llm_analysis, llm_mode=llm_mode)
@@ -0,0 +1,108 @@
+import re
+import json
+
+from collections import Counter
+from typing import List
+
+
+# Bump when normalization output changes so cached LLM results keyed on it are not reused
+NORMALIZATION_VERSION = "1"
+
+# Lines within this many lines of a page's top or bottom are candidate headers/footers
+PAGE_EDGE_LINES = 3
+
+_PAGE_NUMBER_LINE = re.compile(r"^\s*(page\s*)?[-–]?\s*\d{1,3}\s*(of\s*\d{1,3})?\s*[-–]?\s*$", re.IGNORECASE)
+_INLINE_SPACE = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def _edge_lines(page_lines: List[str]) -> set:
+    non_empty = [line for line in page_lines if line]
+    return set(non_empty[:PAGE_EDGE_LINES] + non_empty[-PAGE_EDGE_LINES:])
+
+
+def normalize_resume_text(text: str) -> str:
+    """Removes what costs tokens without carrying resume content.
+
+    Collapses runs of spaces, drops page-number lines, and strips header and
+    footer lines that repeat at the edges of most pages (pdfminer separates
+    pages with form feeds).
+    """
+    if not text:
+        return text
+
+    pages = [
+        [_INLINE_SPACE.sub(" ", line).strip() for line in page.splitlines()]
+        for page in text.split("\f")
+    ]
+
+    repeated = set()
+    if len(pages) > 1:
+        counts = Counter(line for page in pages for line in _edge_lines(page))
+        threshold = max(2, (len(pages) + 1) // 2)
+        repeated = {line for line, count in counts.items() if count >= threshold}
+
+    kept = []
+    for page in pages:
+        edges = _edge_lines(page)
+        for line in page:
+            if line in edges and (line in repeated or _PAGE_NUMBER_LINE.match(line)):
+                continue
+            kept.append(line)
+        kept.append("")
+
+    return _BLANK_LINES.sub("\n\n", "\n".join(kept)).strip()
+
+
+def _strip_schema_noise(node):
+    if isinstance(node, dict):
+        compact = {}
+        for key, value in node.items():
+            # "title" is a schema keyword only when it holds a string; under
+            # "properties" it would be a field name mapped to a dict
+            if key == "title" and isinstance(value, str):
+                continue
+            if key == "default" and value in (None, [], {}):
+                continue
+            compact[key] = _strip_schema_noise(value)
+        return compact
+    if isinstance(node, list):
+        return [_strip_schema_noise(item) for item in node]
+    return node
+
+
+def compact_schema_json(model) -> str:
+    """JSON schema of a Pydantic model without titles, empty defaults or indentation."""
+    return compact_schema_dict_json(model.model_json_schema())
+
+
+def compact_schema_dict_json(schema: dict) -> str:
+    return json.dumps(_strip_schema_noise(schema), separators=(",", ":"))
+
+
+def drop_schema_properties(schema: dict, names) -> dict:
+    """Copy of a JSON schema without the given top-level properties or the $defs only they used."""
+    names = set(names)
+    schema = dict(schema)
+    schema["properties"] = {key: value for key, value in schema.get("properties", {}).items() if key not in names}
+    if "required" in schema:
+        schema["required"] = [key for key in schema["required"] if key not in names]
+
+    defs = schema.pop("$defs", None)
+    if defs:
+        # Keep only definitions still reachable from what is left, following refs between definitions
+        referenced, pending = set(), [schema]
+        while pending:
+            text = json.dumps(pending.pop())
+            for name in defs:
+                if name not in referenced and f'"#/$defs/{name}"' in text:
+                    referenced.add(name)
+                    pending.append(defs[name])
+        if referenced:
+            schema["$defs"] = {name: value for name, value in defs.items() if name in referenced}
+    return schema
+
+
+def compact_model_json(instance) -> str:
+    """Serializes a Pydantic instance without nulls, empty lists or indentation."""
+    return instance.model_dump_json(exclude_none=True, exclude_defaults=True)
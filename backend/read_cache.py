@@ -0,0 +1,228 @@
+import os
+import time
+import hashlib
+import logging
+import compression
+
+from collections import OrderedDict
+from typing import Optional
+from dotenv import load_dotenv
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+READ_CACHE_ENABLED = os.getenv("READ_CACHE_ENABLED", "true").lower() == "true"
+READ_CACHE_MAX_ENTRIES = int(os.getenv("READ_CACHE_MAX_ENTRIES", "2000"))
+READ_CACHE_MAX_BYTES = int(os.getenv("READ_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+READ_CACHE_TTL_SECONDS = float(os.getenv("READ_CACHE_TTL_SECONDS", "3600"))
+# Empty keeps the cache per-process; "redis" adds a tier shared by all workers
+READ_CACHE_SHARED_BACKEND = os.getenv("READ_CACHE_SHARED_BACKEND", "")
+READ_CACHE_REDIS_URL = os.getenv("READ_CACHE_REDIS_URL", "redis://localhost:6379/0")
+# Browsers may reuse a response this long before revalidating it with If-None-Match
+READ_CACHE_HTTP_MAX_AGE = int(os.getenv("READ_CACHE_HTTP_MAX_AGE", "60"))
+
+
+class CachedPayload:
+    """A serialized response body, its strong ETag and any compressed copies made so far."""
+
+    def __init__(self, body: bytes, etag: Optional[str] = None):
+        self.body = body
+        self.etag = etag or make_etag(body)
+        self._encoded = {}
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        # Compressed once per entry, then served from memory like the plain body
+        if encoding is None:
+            return self.body
+        if encoding not in self._encoded:
+            self._encoded[encoding] = compression.compress(self.body, encoding)
+        return self._encoded[encoding]
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        # Each content-coding is a different representation, so it needs its own strong ETag
+        if encoding is None:
+            return self.etag
+        return self.etag[:-1] + "-" + encoding + '"'
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison, so a W/ prefix still matches
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class MemoryReadCache:
+    """Per-process LRU bounded by entry count, total bytes and TTL.
+
+    Only touched from the event loop, so it needs no locking.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.bytes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CachedPayload]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        payload, expires_at = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def set(self, key: str, payload: CachedPayload) -> None:
+        if len(payload.body) > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (payload, time.monotonic() + self.ttl_seconds)
+        self.bytes += len(payload.body)
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= len(entry[0].body)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class RedisReadCache:
+    """Shared tier so all workers reuse each other's payloads; needs the optional `redis` package."""
+
+    def __init__(self, url: str, ttl_seconds: float):
+        import redis.asyncio as redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[CachedPayload]:
+        try:
+            values = await self.client.hmget(key, "etag", "body")
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Shared read cache unavailable: %s", e)
+            return None
+        etag, body = values
+        if etag is None or body is None:
+            return None
+        return CachedPayload(body, etag.decode("ascii"))
+
+    async def set(self, key: str, payload: CachedPayload) -> None:
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={"etag": payload.etag, "body": payload.body})
+                pipe.expire(key, int(self.ttl_seconds))
+                await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Shared read cache unavailable: %s", e)
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "errors": self.errors}
+
+
+READ_CACHE_SHARED_BACKENDS = {
+    "redis": lambda: RedisReadCache(READ_CACHE_REDIS_URL, READ_CACHE_TTL_SECONDS),
+}
+
+
+class ResumeReadCache:
+    """Serialized resume payloads: the local LRU first, then the shared tier if configured.
+
+    Entries are keyed on the row version (models.Resume.version), which every
+    update bumps. A resume changed by another process, such as reanalyze.py,
+    is therefore never served from an older entry by any worker, with or
+    without the shared tier; old entries just age out. Sparse `?fields=`
+    bodies are cached as entries of their own, keyed by the field list too.
+    """
+
+    def __init__(self, local: MemoryReadCache, shared=None, namespace: str = "resume"):
+        self.local = local
+        self.shared = shared
+        self.namespace = namespace
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def _key(self, resume_id: int, version: int, variant: Optional[str]) -> str:
+        key = f"{self.namespace}:{resume_id}:{version}"
+        return key if variant is None else f"{key}:{variant}"
+
+    async def get(self, resume_id: int, version: int, variant: Optional[str] = None) -> Optional[CachedPayload]:
+        key = self._key(resume_id, version, variant)
+        payload = self.local.get(key)
+        if payload is not None:
+            self.local_hits += 1
+            return payload
+
+        if self.shared is not None:
+            payload = await self.shared.get(key)
+            if payload is not None:
+                self.shared_hits += 1
+                self.local.set(key, payload)
+                return payload
+
+        self.misses += 1
+        return None
+
+    async def set(self, resume_id: int, version: int, payload: CachedPayload, variant: Optional[str] = None) -> None:
+        key = self._key(resume_id, version, variant)
+        self.local.set(key, payload)
+        if self.shared is not None:
+            await self.shared.set(key, payload)
+
+    def stats(self) -> dict:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return {
+            **self.local.stats(),
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.local_hits + self.shared_hits) / lookups if lookups else 0.0,
+            "shared": self.shared.stats() if self.shared is not None else None,
+        }
+
+
+def create_resume_read_cache() -> Optional[ResumeReadCache]:
+    if not READ_CACHE_ENABLED:
+        return None
+
+    shared = None
+    if READ_CACHE_SHARED_BACKEND:
+        if READ_CACHE_SHARED_BACKEND not in READ_CACHE_SHARED_BACKENDS:
+            raise ValueError(f"Unknown read cache backend: {READ_CACHE_SHARED_BACKEND}")
+        try:
+            shared = READ_CACHE_SHARED_BACKENDS[READ_CACHE_SHARED_BACKEND]()
+        except ImportError as e:
+            logger.warning("Shared read cache disabled, backend not installed: %s", e)
+
+    return ResumeReadCache(MemoryReadCache(READ_CACHE_MAX_ENTRIES, READ_CACHE_MAX_BYTES, READ_CACHE_TTL_SECONDS), shared)
+
+
+resume_read_cache = create_resume_read_cache()
@@ -0,0 +1,249 @@
+"""Re-runs extraction and/or analysis over stored resumes after a prompt or model change.
+
+    python reanalyze.py                          # refresh llm_analysis from the stored sections
+    python reanalyze.py --extraction --analysis  # re-extract from raw_text, then re-analyze
+    python reanalyze.py --dry-run                # count what a run would touch, no LLM calls
+
+Rows are read in id order, a page at a time, processed with bounded
+concurrency and written back one transaction per page. After every page the
+last committed id is saved to the checkpoint file, so an interrupted run
+picks up where it stopped when started again with the same options.
+
+Every updated row gets a new version, which the API's read cache is keyed
+on, so running workers serve the new bodies and ETags right away.
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+
+import crud
+import models
+import pipeline
+import blob_store
+import llm_service
+
+from db import SessionLocal
+from typing import List, Optional
+from dotenv import load_dotenv
+from sqlalchemy import select, func
+from sqlalchemy.orm import selectinload
+from llm_scheduler import llm_scheduler, CircuitOpenError
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+REANALYZE_CHECKPOINT_PATH = os.getenv("REANALYZE_CHECKPOINT_PATH", "reanalyze.checkpoint.json")
+REANALYZE_PAGE_SIZE = int(os.getenv("REANALYZE_PAGE_SIZE", "100"))
+REANALYZE_CONCURRENCY = int(os.getenv("REANALYZE_CONCURRENCY", "8"))
+# Failed ids kept in the checkpoint for a targeted re-run
+MAX_RECORDED_FAILURES = 1000
+
+
+class Checkpoint:
+    """Progress of one run, rewritten atomically after every committed page."""
+
+    def __init__(self, path: str, options: dict):
+        self.path = path
+        self.options = options
+        self.last_id = 0
+        self.max_id: Optional[int] = None
+        self.counts = {"updated": 0, "skipped": 0, "failed": 0}
+        self.failed_ids: List[int] = []
+
+    @classmethod
+    def load(cls, path: str, options: dict) -> "Checkpoint":
+        checkpoint = cls(path, options)
+        if not os.path.exists(path):
+            return checkpoint
+        with open(path) as f:
+            data = json.load(f)
+        if data["options"] != options:
+            raise ValueError(
+                f"{path} belongs to a run with options {data['options']}; "
+                "finish it with the same options or pass --restart"
+            )
+        checkpoint.last_id = data["last_id"]
+        checkpoint.max_id = data["max_id"]
+        checkpoint.counts = data["counts"]
+        checkpoint.failed_ids = data["failed_ids"]
+        return checkpoint
+
+    def save(self) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "options": self.options,
+                "last_id": self.last_id,
+                "max_id": self.max_id,
+                "counts": self.counts,
+                "failed_ids": self.failed_ids,
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def record(self, resume_id: int, status: str) -> None:
+        self.counts[status] += 1
+        if status == "failed" and len(self.failed_ids) < MAX_RECORDED_FAILURES:
+            self.failed_ids.append(resume_id)
+
+
+def _page_query(after_id: int, max_id: int, page_size: int):
+    return (
+        select(models.Resume)
+        .options(selectinload(models.Resume.roles), selectinload(models.Resume.canonical_skills))
+        .where(models.Resume.id > after_id, models.Resume.id <= max_id)
+        .order_by(models.Resume.id)
+        .limit(page_size)
+    )
+
+
+async def reanalyze_resume(db_resume: models.Resume, extraction: bool, analysis: bool) -> str:
+    """Updates one loaded row in place; returns "updated", "skipped" or "failed"."""
+    if extraction:
+        raw_text = db_resume.raw_text or ""
+        if len(raw_text.strip()) < pipeline.MIN_RAW_TEXT_LENGTH:
+            return "skipped"
+        extracted_data = await pipeline.get_extracted_data(raw_text)
+        if not extracted_data:
+            return "failed"
+    else:
+        extracted_data = crud.stored_extraction(db_resume)
+        if extracted_data is None:
+            return "skipped"
+
+    if analysis:
+        llm_analysis = await pipeline.get_llm_analysis(extracted_data)
+        if not llm_analysis:
+            return "failed"
+    else:
+        llm_analysis = crud.stored_analysis(db_resume)
+
+    if extraction:
+        db_resume.llm_mode = "two_pass"
+    crud.populate_resume(db_resume, extracted_data, llm_analysis)
+    return "updated"
+
+
+async def _reanalyze_with_retry(db_resume: models.Resume, extraction: bool, analysis: bool) -> str:
+    while True:
+        try:
+            return await reanalyze_resume(db_resume, extraction, analysis)
+        except CircuitOpenError as e:
+            # The provider is down or rate limiting hard; wait instead of failing every row
+            logger.warning("LLM circuit open, retrying resume %d in %.0fs", db_resume.id, e.retry_after)
+            await asyncio.sleep(e.retry_after)
+        except Exception as e:
+            logger.error("Re-analysis of resume %d failed: %s", db_resume.id, e)
+            return "failed"
+
+
+async def run(args) -> tuple:
+    """Returns (checkpoint, finished); not finished when stopped by --limit."""
+    options = {"extraction": args.extraction, "analysis": args.analysis}
+    if args.restart and os.path.exists(args.checkpoint) and not args.dry_run:
+        os.remove(args.checkpoint)
+    checkpoint = Checkpoint.load(args.checkpoint, options)
+
+    async with SessionLocal() as db:
+        if checkpoint.max_id is None:
+            # Rows inserted after the run starts were produced with the current prompts already
+            checkpoint.max_id = (await db.execute(select(func.max(models.Resume.id)))).scalar() or 0
+        remaining = (await db.execute(
+            select(func.count()).select_from(models.Resume)
+            .where(models.Resume.id > checkpoint.last_id, models.Resume.id <= checkpoint.max_id)
+        )).scalar()
+    finished = args.limit is None or remaining <= args.limit
+    if not finished:
+        remaining = args.limit
+
+    mode = "dry run" if args.dry_run else "run"
+    print(f"Re-analysis {mode}: {remaining} resumes after id {checkpoint.last_id} (up to id {checkpoint.max_id}), options {options}")
+
+    semaphore = asyncio.Semaphore(max(1, args.concurrency))
+
+    async def bounded(db_resume: models.Resume) -> str:
+        async with semaphore:
+            return await _reanalyze_with_retry(db_resume, args.extraction, args.analysis)
+
+    started = time.monotonic()
+    done = 0
+    while done < remaining:
+        page_size = min(args.page_size, remaining - done)
+        # A session per page keeps memory flat however many rows the run covers
+        async with SessionLocal() as db:
+            rows = (await db.execute(_page_query(checkpoint.last_id, checkpoint.max_id, page_size))).scalars().all()
+            if not rows:
+                break
+            if not args.dry_run:
+                # Re-extraction reads it, and the full-text index rewritten for updated rows covers it
+                await blob_store.load_raw_texts(db, rows)
+            # End the read transaction before the LLM calls; loaded rows stay usable (expire_on_commit=False)
+            await db.commit()
+
+            if args.dry_run:
+                # "updated" here means the row has what a real run needs
+                statuses = [
+                    "updated" if args.extraction or crud.stored_extraction(row) is not None else "skipped"
+                    for row in rows
+                ]
+            else:
+                statuses = await asyncio.gather(*(bounded(row) for row in rows))
+                updated = [row for row, status in zip(rows, statuses) if status == "updated"]
+                # Updating bumps the row versions, so no API worker serves the old bodies from its read cache
+                if updated and not await crud.update_resume_entries(db, updated):
+                    statuses = ["failed" if status == "updated" else status for status in statuses]
+
+        for row, status in zip(rows, statuses):
+            checkpoint.record(row.id, status)
+        checkpoint.last_id = rows[-1].id
+        if not args.dry_run:
+            checkpoint.save()
+
+        done += len(rows)
+        elapsed = time.monotonic() - started
+        rate = done / elapsed if elapsed else 0.0
+        eta = (remaining - done) / rate if rate else 0.0
+        print(
+            f"{done}/{remaining} resumes, {rate:.2f}/s, eta {eta:.0f}s - "
+            + ", ".join(f"{name} {count}" for name, count in checkpoint.counts.items())
+        )
+
+    elapsed = time.monotonic() - started
+    print(f"Finished {done} resumes in {elapsed:.1f}s ({done / elapsed if elapsed else 0.0:.2f}/s)")
+    if not args.dry_run:
+        print(f"LLM tokens: {json.dumps(llm_service.token_usage_stats)}")
+        print(f"LLM scheduler: {json.dumps(llm_scheduler.stats())}")
+        if checkpoint.failed_ids:
+            print(f"Failed ids (also in {args.checkpoint}): {checkpoint.failed_ids[:20]}{' ...' if len(checkpoint.failed_ids) > 20 else ''}")
+    return checkpoint, finished
+
+
+def main() -> None:
+    # Progress goes to stdout; retries and per-resume failures are logged
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--extraction", action="store_true", help="Re-extract the structured sections from raw_text")
+    parser.add_argument("--analysis", action="store_true", help="Re-run the analysis (the default when neither is given)")
+    parser.add_argument("--concurrency", type=int, default=REANALYZE_CONCURRENCY, help="Resumes in flight at once")
+    parser.add_argument("--page-size", type=int, default=REANALYZE_PAGE_SIZE, help="Resumes read and committed together")
+    parser.add_argument("--limit", type=int, help="Stop after this many resumes")
+    parser.add_argument("--checkpoint", default=REANALYZE_CHECKPOINT_PATH)
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start from the first resume")
+    parser.add_argument("--dry-run", action="store_true", help="Read and count only; no LLM calls, writes or checkpoint")
+    args = parser.parse_args()
+    if not args.extraction and not args.analysis:
+        args.analysis = True
+
+    _, finished = asyncio.run(run(args))
+    if finished and not args.dry_run and os.path.exists(args.checkpoint):
+        # Kept for its counts and failed ids; the next run starts a fresh pass
+        os.replace(args.checkpoint, args.checkpoint + ".done")
+
+
+if __name__ == "__main__":
+    main()
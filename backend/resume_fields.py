@@ -0,0 +1,86 @@
+import re
+import schemas
+
+from datetime import date
+from typing import Optional, List, Tuple
+
+
+# Ordered so that a higher level means a higher degree
+DEGREE_LEVELS = {
+    "high_school": 1,
+    "associate": 2,
+    "bachelor": 3,
+    "master": 4,
+    "doctorate": 5,
+}
+
+# Checked in order; "high school" comes before "diploma" so a High School Diploma is not an associate degree
+_DEGREE_PATTERNS = [
+    ("doctorate", re.compile(r"\b(ph\.?\s?d|doctor(ate)?|d\.?phil|ed\.?d)\b", re.IGNORECASE)),
+    ("master", re.compile(r"\b(master'?s?|m\.?\s?s\.?c?|m\.?\s?tech|m\.?\s?eng|m\.?\s?b\.?a|m\.?\s?a|m\.?\s?e|mca)\b", re.IGNORECASE)),
+    ("bachelor", re.compile(r"\b(bachelor'?s?|b\.?\s?s\.?c?|b\.?\s?tech|b\.?\s?eng|b\.?\s?a|b\.?\s?e|bca|undergraduate)\b", re.IGNORECASE)),
+    ("high_school", re.compile(r"\b(high\s+school|secondary|hsc|ssc|12th|10th|ged)\b", re.IGNORECASE)),
+    ("associate", re.compile(r"\b(associate'?s?|a\.?\s?a\.?s?|diploma)\b", re.IGNORECASE)),
+]
+
+_DATE_PATTERN = re.compile(r"(\d{4})(?:[-/.](\d{1,2}))?")
+_PRESENT_WORDS = ("present", "current", "now", "ongoing", "till date", "today")
+
+
+def normalize_role(role: str) -> str:
+    return " ".join(role.lower().split())
+
+
+def _parse_month(value: Optional[str], today: date) -> Optional[Tuple[int, int]]:
+    if not value:
+        return None
+    if value.strip().lower() in _PRESENT_WORDS:
+        return today.year, today.month
+    match = _DATE_PATTERN.search(value)
+    if not match:
+        return None
+    year = int(match.group(1))
+    month = int(match.group(2)) if match.group(2) else 1
+    return (year, month) if 1 <= month <= 12 else (year, 1)
+
+
+def experience_months(item: schemas.WorkExperienceItemSchema, today: Optional[date] = None) -> int:
+    if item.duration_months is not None:
+        return max(0, item.duration_months)
+
+    today = today or date.today()
+    start = _parse_month(item.start_date, today)
+    end = _parse_month(item.end_date, today)
+    if not start or not end:
+        return 0
+    return max(0, (end[0] - start[0]) * 12 + (end[1] - start[1]))
+
+
+def total_experience_months(work_experience: List[schemas.WorkExperienceItemSchema]) -> Optional[int]:
+    if not work_experience:
+        return None
+    return sum(experience_months(item) for item in work_experience)
+
+
+def degree_level(degree: Optional[str]) -> Optional[str]:
+    if not degree:
+        return None
+    for level, pattern in _DEGREE_PATTERNS:
+        if pattern.search(degree):
+            return level
+    return None
+
+
+def highest_degree(education: List[schemas.EducationItemSchema]) -> Optional[str]:
+    levels = [degree_level(edu.degree) for edu in education]
+    levels = [level for level in levels if level]
+    if not levels:
+        return None
+    return max(levels, key=DEGREE_LEVELS.get)
+
+
+def potential_roles(llm_analysis: Optional[schemas.LLMAnalysisSchema]) -> List[str]:
+    if not llm_analysis:
+        return []
+    roles = {normalize_role(role) for role in llm_analysis.potential_roles if role and role.strip()}
+    return sorted(roles)
@@ -1,23 +1,48 @@
+import re
+import mmap
+
 from docx import Document
 from io import BytesIO
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Union, BinaryIO
 from pdfminer.high_level import extract_text
 
 
+# Bump when extraction output changes so cached text is not reused
+PARSER_VERSION = "1"
+
+# Raw bytes, a path to a file on disk, or an open binary file object
+FileSource = Union[bytes, str, BinaryIO]
+
+
+@contextmanager
+def open_source(source: FileSource):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        # BytesIO shares the buffer of an immutable bytes object until it is written to
+        with BytesIO(source) as buffer:
+            yield buffer
+    elif isinstance(source, str):
+        with open(source, "rb") as f:
+            yield f
+    else:
+        source.seek(0)
+        yield source
+
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
+def extract_text_from_pdf(source: FileSource) -> str:
     try:
-        with BytesIO(file_bytes) as buffer:
-            text = extract_text(buffer)
+        with open_source(source) as f:
+            text = extract_text(f)
         return text.strip()
     except Exception as e:
         print(f"Failed to extract text from PDF: {str(e)}")
         return ""
 
 
-def extract_text_from_docx(file_bytes: bytes) -> str:
+def extract_text_from_docx(source: FileSource) -> str:
     try:
-        file_stream = BytesIO(file_bytes)
-        doc = Document(file_stream)
+        with open_source(source) as f:
+            doc = Document(f)
         text = "\n".join([para.text for para in doc.paragraphs])
         return text.strip()
     except Exception as e:
@@ -25,24 +50,147 @@ def extract_text_from_docx(file_bytes: bytes) -> str:
         return ""
 
 
-def extract_text_from_txt(file_bytes: bytes) -> str:
+def extract_text_from_txt(source: FileSource) -> str:
     try:
-        return file_bytes.decode("utf-8").strip()
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                if f.seek(0, 2) == 0:
+                    return ""
+                # Decode straight from the page cache instead of reading into a bytes copy
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return str(mapped, "utf-8").strip()
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return str(source, "utf-8").strip()
+        source.seek(0)
+        return source.read().decode("utf-8").strip()
     except UnicodeDecodeError:
         raise ValueError("Text file must be UTF-8 encoded.")
 
 
-def extract_text_from_resume(filename: str, file_content: bytes) -> str:
+def extract_text_from_resume(filename: str, source: FileSource) -> str:
     if not filename:
         raise ValueError("Filename cannot be empty")
 
     file_ext = filename.split('.')[-1].lower()
 
     if file_ext == "pdf":
-        return extract_text_from_pdf(file_content)
+        return extract_text_from_pdf(source)
     elif file_ext == "docx":
-        return extract_text_from_docx(file_content)
+        return extract_text_from_docx(source)
     elif file_ext == "txt":
-        return extract_text_from_txt(file_content)
+        return extract_text_from_txt(source)
     else:
         raise ValueError(f"Unsupported file type: .{file_ext}. Please upload PDF, DOCX, or TXT.")
+
+
+
+# Rule-based fast path: fields that compiled regexes get right without an LLM
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "about me", "objective", "career objective"),
+    "work_experience": ("experience", "work experience", "professional experience", "employment", "employment history", "work history"),
+    "education": ("education", "academic background", "academics", "qualifications"),
+    "skills": ("skills", "technical skills", "core competencies", "technologies", "skills and tools"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects"),
+    "certifications": ("certifications", "certificates", "licenses and certifications", "courses and certifications"),
+    "awards": ("awards", "honors", "honours", "achievements", "awards and achievements"),
+    "publications": ("publications", "research", "papers"),
+}
+
+_HEADING_TO_SECTION = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+_HEADING_LINE = re.compile(r"^[\W_]*([A-Za-z][A-Za-z &/]{1,40}?)[\s:\-–—_]*$")
+
+_EMAIL = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_PHONE = re.compile(r"(?<![\w/])\+?\(?\d[\d ()./-]{7,}\d(?![\w/])")
+_LINKEDIN = re.compile(r"(?:https?://)?(?:[\w-]+\.)?linkedin\.com/(?:in|pub)/[\w%-]+/?", re.IGNORECASE)
+_GITHUB = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[A-Za-z0-9-]+/?", re.IGNORECASE)
+_URL = re.compile(r"(?:https?://|www\.)[^\s|,;]+", re.IGNORECASE)
+_NAME = re.compile(r"^[A-Za-z][A-Za-z.'-]*(?: [A-Za-z][A-Za-z.'-]*){1,3}$")
+
+MIN_PHONE_DIGITS = 9
+
+
+def section_heading(line: str) -> Optional[str]:
+    """Canonical section name if the line is a heading such as "WORK EXPERIENCE:", else None."""
+    match = _HEADING_LINE.match(line.strip())
+    if not match:
+        return None
+    return _HEADING_TO_SECTION.get(" ".join(match.group(1).lower().replace("&", "and").split()))
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """Splits resume text at recognised headings.
+
+    Text before the first heading is returned as "header"; a repeated
+    heading appends to the same section.
+    """
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for line in text.splitlines():
+        heading = section_heading(line)
+        if heading:
+            current = heading
+            sections.setdefault(current, [])
+            continue
+        sections[current].append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items()}
+
+
+def _first_phone(text: str) -> Optional[str]:
+    for match in _PHONE.finditer(text):
+        if sum(ch.isdigit() for ch in match.group()) >= MIN_PHONE_DIGITS:
+            return match.group().strip()
+    return None
+
+
+def _candidate_name(header: str) -> Optional[str]:
+    for line in header.splitlines()[:5]:
+        line = " ".join(line.replace("|", " ").split())
+        if not line or _EMAIL.search(line) or _URL.search(line) or any(ch.isdigit() for ch in line):
+            continue
+        if line.lower() in ("resume", "curriculum vitae", "cv"):
+            continue
+        if not _NAME.match(line):
+            return None
+        return line.title() if line.isupper() else line
+    return None
+
+
+def extract_contact_info(text: str, sections: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Name, email, phone and profile URLs, looked for in the header first.
+
+    Only the header is trusted for the name and phone; email and profile
+    links fall back to the whole text, since they are unambiguous.
+    """
+    sections = sections if sections is not None else split_sections(text)
+    header = sections.get("header") or text[:1000]
+    contact = {}
+
+    name = _candidate_name(header)
+    if name:
+        contact["name"] = name
+
+    email = _EMAIL.search(header) or _EMAIL.search(text)
+    if email:
+        contact["email"] = email.group().rstrip(".")
+
+    phone = _first_phone(header)
+    if phone:
+        contact["phone"] = phone
+
+    # Substring checks first: the profile patterns are slow to scan over a whole resume
+    lowered = text.lower()
+    linkedin = _LINKEDIN.search(text) if "linkedin.com/" in lowered else None
+    if linkedin:
+        contact["linkedin"] = linkedin.group()
+    github = _GITHUB.search(text) if "github.com/" in lowered else None
+    if github:
+        contact["github"] = github.group()
+
+    for url in _URL.finditer(header):
+        value = url.group().rstrip(".")
+        if "linkedin.com" not in value.lower() and "github.com" not in value.lower():
+            contact["portfolio_url"] = value
+            break
+
+    return contact
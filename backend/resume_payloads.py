@@ -0,0 +1,52 @@
+import json
+import schemas
+
+from datetime import datetime
+from typing import Optional, Set
+
+
+# In serialization order; `?fields=` may name any of these
+RESUME_FIELDS = tuple(schemas.ResumeReadSchema.model_fields)
+
+
+def sections_json(db_resume) -> str:
+    """Serializes the structured columns of a Resume row; validated here once instead of on every read."""
+    return schemas.ResumeSectionsSchema.model_validate(db_resume).model_dump_json()
+
+
+def detail_body(resume_id: int, file_name: str, uploaded_at: datetime, raw_text: Optional[str], sections: str) -> bytes:
+    """Splices the stored sections JSON after the header fields.
+
+    Produces the same bytes as serializing ResumeReadSchema, without
+    re-validating the nested sections.
+    """
+    header = schemas.ResumeHeaderSchema(
+        id=resume_id,
+        file_name=file_name,
+        uploaded_at=uploaded_at,
+        raw_text=raw_text
+    ).model_dump_json()
+    return (header[:-1] + "," + sections[1:]).encode("utf-8")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Set[str]]:
+    """Parses a comma-separated `?fields=` value; None means every field. `id` is always included."""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(RESUME_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(RESUME_FIELDS)}")
+    return requested | {"id"}
+
+
+def fields_key(fields: Set[str]) -> str:
+    # The same selection in any order or with repeats caches as one variant
+    return ",".join(name for name in RESUME_FIELDS if name in fields)
+
+
+def select_fields(body: bytes, fields: Set[str]) -> bytes:
+    data = json.loads(body)
+    sparse = {name: data[name] for name in RESUME_FIELDS if name in fields and name in data}
+    # Same compact, UTF-8 output as pydantic's model_dump_json
+    return json.dumps(sparse, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,187 @@
+"""Saves new resumes, holding a database connection only for the insert itself.
+
+With RESUME_WRITE_BEHIND_ENABLED, inserts from concurrent uploads are queued
+and committed together: up to RESUME_WRITE_BATCH_SIZE rows per transaction,
+and no row waits more than RESUME_WRITE_FLUSH_MS for its batch to fill.
+Callers still wait for the commit of their batch, so a saved resume is on
+disk before the response goes out; what is given up is a few milliseconds
+of latency, not durability.
+"""
+import os
+import asyncio
+import logging
+
+import crud
+import models
+import schemas
+import metrics
+
+from db import SessionLocal
+from typing import List, Optional, Tuple
+from dotenv import load_dotenv
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+RESUME_WRITE_BEHIND_ENABLED = os.getenv("RESUME_WRITE_BEHIND_ENABLED", "false").lower() == "true"
+RESUME_WRITE_BATCH_SIZE = int(os.getenv("RESUME_WRITE_BATCH_SIZE", "50"))
+RESUME_WRITE_FLUSH_MS = float(os.getenv("RESUME_WRITE_FLUSH_MS", "20"))
+# Saves waiting beyond this block their callers instead of growing the queue
+RESUME_WRITE_QUEUE_SIZE = int(os.getenv("RESUME_WRITE_QUEUE_SIZE", "1000"))
+
+BATCH_ROWS = metrics.histogram(
+    "resume_write_batch_rows", "Resumes committed per write-behind transaction.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+
+# Arguments of crud.build_resume
+ResumeFields = Tuple[
+    str, str, Optional[schemas.ResumeExtractedData], Optional[schemas.LLMAnalysisSchema],
+    Optional[str], Optional[str], Optional[str]
+]
+
+
+def _resolve(future: asyncio.Future, db_resume: Optional[models.Resume]) -> None:
+    # A caller that went away (client disconnect) has cancelled its future; the row is saved regardless
+    if not future.done():
+        future.set_result(db_resume)
+
+
+class ResumeWriter:
+    def __init__(self, batch_size: int, flush_seconds: float, max_queue: int):
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._item_added: Optional[asyncio.Event] = None
+        self._max_queue = max_queue
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.rows = 0
+        self.retried_rows = 0
+        self.failed_rows = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        # The queue belongs to the loop that runs the writer
+        self._queue = asyncio.Queue(self._max_queue)
+        self._item_added = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "Started resume write-behind writer (batches of %d, flushed every %.0f ms).", self.batch_size, self.flush_seconds * 1000
+        )
+
+    async def stop(self) -> None:
+        """Commits everything already queued, then stops."""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def save(self, fields: ResumeFields) -> Optional[models.Resume]:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((fields, future))
+        self._item_added.set()
+        return await future
+
+    async def _next_batch(self) -> List[Tuple[ResumeFields, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            # Only the wake-up is timed out, never a get(): a get cancelled by wait_for can lose its item
+            self._item_added.clear()
+            try:
+                await asyncio.wait_for(self._item_added.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                logger.exception("Write-behind flush of %d resumes failed: %s", len(batch), e)
+                for _, future in batch:
+                    _resolve(future, None)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[Tuple[ResumeFields, asyncio.Future]]) -> None:
+        rows = [crud.build_resume(*fields) for fields, _ in batch]
+        async with SessionLocal() as db:
+            saved = await crud.create_resume_entries(db, rows)
+        self.batches += 1
+        BATCH_ROWS.observe(len(rows))
+
+        if saved:
+            self.rows += len(rows)
+            for (_, future), db_resume in zip(batch, rows):
+                _resolve(future, db_resume)
+            return
+
+        # One bad row must not fail the rest of the batch: retry each on its own, from fresh objects
+        for fields, future in batch:
+            if len(batch) > 1:
+                self.retried_rows += 1
+                db_resume = await _save_now(fields)
+            else:
+                db_resume = None
+            if db_resume is None:
+                self.failed_rows += 1
+            else:
+                self.rows += 1
+            _resolve(future, db_resume)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batch_size": self.batch_size,
+            "flush_ms": self.flush_seconds * 1000,
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_rows": (self.rows + self.failed_rows) / self.batches if self.batches else 0.0,
+            "retried_rows": self.retried_rows,
+            "failed_rows": self.failed_rows,
+        }
+
+
+resume_writer = ResumeWriter(RESUME_WRITE_BATCH_SIZE, RESUME_WRITE_FLUSH_MS / 1000, RESUME_WRITE_QUEUE_SIZE)
+
+
+async def _save_now(fields: ResumeFields) -> Optional[models.Resume]:
+    async with SessionLocal() as db:
+        return await crud.create_resume_entry(db, *fields)
+
+
+async def save_resume(
+    file_name: str,
+    raw_text: str,
+    extracted_data: Optional[schemas.ResumeExtractedData],
+    llm_analysis_data: Optional[schemas.LLMAnalysisSchema],
+    llm_mode: Optional[str] = None,
+    file_hash: Optional[str] = None,
+    job_id: Optional[str] = None
+) -> Optional[models.Resume]:
+    """Inserts one resume, through the write-behind writer when it is running; None if saving failed."""
+    fields = (file_name, raw_text, extracted_data, llm_analysis_data, llm_mode, file_hash, job_id)
+    if resume_writer.running:
+        return await resume_writer.save(fields)
+    return await _save_now(fields)
@@ -1,109 +1,469 @@
+import jobs
+import json
 import crud
+import logging
+import batch
+import export
 import schemas
-import llm_service
-import resume_parser
+import asyncio
+import uploads
+import pipeline
+import blob_store
+import matching
+import metrics
+import pagination
+import read_cache
+import compression
+import resume_payloads
 
-from db import get_db
-from typing import List, Optional
+from db import get_db, SessionLocal
+from read_cache import resume_read_cache
+from resume_writer import save_resume
+from parse_pool import ParserPoolSaturated
+from llm_scheduler import CircuitOpenError
+from datetime import datetime
+from typing import AsyncIterator, List, Literal, Optional, Tuple
 # from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Header, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/resumes",
     tags=["users"]
 )
 
 
-@router.post("/upload", response_model=schemas.ResumeReadSchema, status_code=status.HTTP_201_CREATED)
-async def upload_resume(
-    file: UploadFile = File(...),
-    db: AsyncSession = Depends(get_db)
-):
+async def _spool_upload(file: UploadFile) -> uploads.SpooledUpload:
     if not file.filename:
        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No file uploaded")
 
-    contents = await file.read()
-
     try:
-        raw_text = resume_parser.extract_text_from_resume(file.filename, contents)
+        return await uploads.spool_upload(file)
+    except uploads.UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+
+
+async def _extract_upload_text(file_name: str, upload: uploads.SpooledUpload) -> Tuple[str, Optional[str]]:
+    """Parses a spooled upload and keeps the original; returns (raw_text, file_hash).
 
-        if not raw_text or len(raw_text.strip()) < 30:
-            print(f"Could not extract sufficient text from resume: {file.filename}.")
-            await crud.create_resume_entry(db, file_name=file.filename, raw_text=raw_text or "Extraction failed or empty", extracted_data=None, llm_analysis_data=None)
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Could not extract sufficient text.")
+    Parser failures map to HTTP errors. Always closes the upload.
+    """
+    try:
+        raw_text = await pipeline.get_raw_text(file_name, upload.source, upload.sha256)
+        # Only files that parsed are kept, so rejected uploads leave no blob behind
+        return raw_text, await blob_store.store_original(upload.source, upload.sha256)
+    except ParserPoolSaturated as e:
+        logger.warning("Parser pool saturated, rejecting %s", file_name)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy parsing other resumes. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except ValueError as e:
-        print(f"Unsupported file type or encoding for {file.filename}: {e}")
+        logger.warning("Unsupported file type or encoding for %s: %s", file_name, e)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        print(f"Unexpected error during text extraction for {file.filename}: {e}")
+        logger.exception("Unexpected error during text extraction for %s: %s", file_name, e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error processing resume file during text extraction.")
+    finally:
+        upload.close()
+
+
+async def _reject_insufficient_text(file_name: str, raw_text: str, file_hash: Optional[str]) -> None:
+    if not raw_text or len(raw_text.strip()) < pipeline.MIN_RAW_TEXT_LENGTH:
+        logger.warning("Could not extract sufficient text from resume: %s.", file_name)
+        await save_resume(
+            file_name=file_name, raw_text=raw_text or "Extraction failed or empty",
+            extracted_data=None, llm_analysis_data=None, file_hash=file_hash
+        )
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Could not extract sufficient text.")
 
-    extracted_data: Optional[schemas.ResumeExtractedData] = await llm_service.extract_structured_data_from_text(raw_text)
+
+@router.post("/upload", response_model=schemas.ResumeReadSchema, status_code=status.HTTP_201_CREATED)
+async def upload_resume(
+    request: Request,
+    response: Response,
+    file: UploadFile = File(...),
+    mode: str = Query("sync", pattern="^(sync|async)$"),
+    single_pass: Optional[bool] = None
+):
+    # No session for the request: a connection is only taken for the insert, not held across the LLM calls
+    upload = await _spool_upload(file)
+
+    if mode == "async":
+        # The parser would reject it too, but only after the client was told the job was accepted
+        if not batch.is_supported_file(file.filename):
+            upload.close()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Unsupported file type. Please upload PDF, DOCX, or TXT."
+            )
+        job_id = await asyncio.to_thread(jobs.submit_job, file.filename, upload)
+        accepted = schemas.JobAcceptedSchema(
+            job_id=job_id,
+            status="queued",
+            status_url=str(request.url_for("get_upload_job", job_id=job_id))
+        )
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=accepted.model_dump())
+
+    timings = metrics.start_timings()
+    raw_text, file_hash = await _extract_upload_text(file.filename, upload)
+    await _reject_insufficient_text(file.filename, raw_text, file_hash)
+
+    try:
+        extracted_data, llm_analysis, llm_mode = await pipeline.get_llm_results(raw_text, single_pass)
+    except CircuitOpenError as e:
+        logger.warning("LLM provider unavailable, rejecting %s", file.filename)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The LLM provider is temporarily unavailable. Please retry shortly.",
+            headers={"Retry-After": str(int(e.retry_after))}
+        )
     
     if not extracted_data:
-        print(f"LLM failed to extract structured data for {file.filename}.")
-        await crud.create_resume_entry(db, file_name=file.filename, raw_text=raw_text, extracted_data=None, llm_analysis_data=None)
+        logger.warning("LLM failed to extract structured data for %s.", file.filename)
+        await save_resume(
+            file_name=file.filename, raw_text=raw_text, extracted_data=None, llm_analysis_data=None,
+            llm_mode=llm_mode, file_hash=file_hash
+        )
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="LLM failed to extract structured data. Raw text has been saved.")
 
 
-    llm_analysis = await llm_service.analyze_resume_with_llm(extracted_data)
     if not llm_analysis:
-        print(f"LLM analysis failed for {file.filename}")
+        logger.warning("LLM analysis failed for %s", file.filename)
 
 
 
-    db_resume = await crud.create_resume_entry(
-        db=db, 
+    db_resume = await save_resume(
         file_name=file.filename,
         raw_text=raw_text,
         extracted_data=extracted_data,
-        llm_analysis_data=llm_analysis
+        llm_analysis_data=llm_analysis,
+        llm_mode=llm_mode,
+        file_hash=file_hash
     )
 
     if not db_resume:
-        print(f"Failed to save processed resume data to database for {file.filename}.")
+        logger.error("Failed to save processed resume data to database for %s.", file.filename)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to save processed resume data to database.")
             
-    print(f"Resume {file.filename} processed and saved successfully.")
+    response.headers["Server-Timing"] = metrics.server_timing(timings)
+    logger.info("Resume %s processed and saved successfully (%s).", file.filename, response.headers["Server-Timing"])
     return schemas.ResumeReadSchema.model_validate(db_resume)
 
 
 
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# Streams keep running to completion after a client disconnects, so the record is still saved
+_stream_tasks = set()
+
+
+async def _stream_llm_results(file_name: str, raw_text: str, file_hash: Optional[str]) -> AsyncIterator[str]:
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def on_section(name, value):
+        await events.put(_sse("section", {"name": name, "data": value}))
+
+    async def produce():
+        try:
+            extracted_data, llm_analysis, llm_mode = await pipeline.get_llm_results_streaming(raw_text, on_section)
+
+            if not extracted_data:
+                logger.warning("LLM failed to extract structured data for %s.", file_name)
+                await save_resume(
+                    file_name=file_name, raw_text=raw_text, extracted_data=None, llm_analysis_data=None,
+                    llm_mode=llm_mode, file_hash=file_hash
+                )
+                await events.put(_sse("error", {"status_code": 500, "detail": "LLM failed to extract structured data. Raw text has been saved."}))
+                return
+
+            if llm_analysis:
+                await events.put(_sse("analysis", llm_analysis.model_dump(mode="json")))
+            else:
+                logger.warning("LLM analysis failed for %s", file_name)
+
+            db_resume = await save_resume(
+                file_name=file_name,
+                raw_text=raw_text,
+                extracted_data=extracted_data,
+                llm_analysis_data=llm_analysis,
+                llm_mode=llm_mode,
+                file_hash=file_hash
+            )
+            if not db_resume:
+                logger.error("Failed to save processed resume data to database for %s.", file_name)
+                await events.put(_sse("error", {"status_code": 500, "detail": "Failed to save processed resume data to database."}))
+                return
+
+            logger.info("Resume %s processed and saved successfully.", file_name)
+            await events.put(_sse("done", schemas.ResumeReadSchema.model_validate(db_resume).model_dump(mode="json")))
+        except CircuitOpenError as e:
+            logger.warning("LLM provider unavailable, rejecting %s", file_name)
+            await events.put(_sse("error", {
+                "status_code": 503,
+                "detail": "The LLM provider is temporarily unavailable. Please retry shortly.",
+                "retry_after": int(e.retry_after)
+            }))
+        except Exception as e:
+            logger.exception("Unexpected error while streaming results for %s: %s", file_name, e)
+            await events.put(_sse("error", {"status_code": 500, "detail": "Failed to process resume."}))
+        finally:
+            await events.put(None)
+
+    task = asyncio.create_task(produce())
+    _stream_tasks.add(task)
+    task.add_done_callback(_stream_tasks.discard)
+
+    while (event := await events.get()) is not None:
+        yield event
+
+
+@router.post("/upload/stream")
+async def upload_resume_stream(file: UploadFile = File(...)):
+    """Uploads a resume and streams results as server-sent events.
+
+    Events: `section` ({name, data}) for each extracted section as soon as it
+    has streamed in and validated, `analysis` once the analysis is ready,
+    then `done` with the saved record (same body as POST /upload) or `error`.
+    Upload and parsing errors are returned as regular HTTP errors before the
+    stream starts.
+    """
+    upload = await _spool_upload(file)
+    raw_text, file_hash = await _extract_upload_text(file.filename, upload)
+    await _reject_insufficient_text(file.filename, raw_text, file_hash)
+
+    return StreamingResponse(
+        _stream_llm_results(file.filename, raw_text, file_hash),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+
+@router.post("/upload/batch", response_model=schemas.BatchUploadResponseSchema)
+async def upload_resume_batch(
+    files: List[UploadFile] = File(...)
+):
+    if not files:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No files uploaded")
+
+    # Like the single uploads, no session for the request: each insert batch opens its own
+    result = await batch.process_batch(files)
+    logger.info(
+        "Batch upload finished: %d created, %d failed, %d skipped.", result.created, result.failed, result.skipped
+    )
+    return result
+
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.JobStatusSchema)
+async def get_upload_job(job_id: str):
+    job = await asyncio.to_thread(jobs.job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return schemas.JobStatusSchema.model_validate(job)
+
+
+
 @router.get("/", response_model=List[schemas.ResumeListDetailSchema])
 async def list_resumes(
-    skip: int = 0, limit: int = 20, 
+    response: Response,
+    skip: int = 0, limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    filters: schemas.ResumeFilterSchema = Depends(),
     db:AsyncSession = Depends(get_db)
 ):
-    resumes_db = await crud.get_all_resumes(db, skip=skip, limit=limit)
-    if resumes_db is None: 
+    try:
+        after = pagination.decode_cursor(cursor) if cursor else None
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # One extra row tells us whether another page exists
+    rows = await crud.get_resume_list_page(db, limit=limit + 1, cursor=after, skip=skip, filters=filters)
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = pagination.encode_cursor(last.uploaded_at, last.id)
+
+    return [
+        schemas.ResumeListDetailSchema(
+            id=row.id,
+            file_name=row.file_name,
+            uploaded_at=row.uploaded_at,
+            name=row.name,
+            email=row.email,
+            resume_rating=row.resume_rating,
+        )
+        for row in rows
+    ]
+
+
+
+@router.get("/export")
+async def export_resumes(
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+    columns: Optional[str] = None,
+    uploaded_from: Optional[datetime] = None,
+    uploaded_to: Optional[datetime] = None,
+    filters: schemas.ResumeFilterSchema = Depends()
+):
+    """Streams every matching resume (or the chosen `columns`) as NDJSON, CSV or Parquet, oldest first."""
+    try:
+        selected = export.parse_columns(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    try:
+        encoder = export.EXPORT_FORMATS[format](selected)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    query = export.export_query(selected, uploaded_from, uploaded_to, filters)
+
+    async def body() -> AsyncIterator[bytes]:
+        # Opened here rather than through Depends: the response outlives the endpoint function
+        async with SessionLocal() as db:
+            try:
+                async for chunk in export.stream_export(db, encoder, query):
+                    yield chunk
+            except Exception as e:
+                # Headers are already sent; the client sees a truncated body
+                logger.exception("Export failed mid-stream: %s", e)
+                raise
+
+    return StreamingResponse(
+        body(),
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f'attachment; filename="resumes.{encoder.extension}"'}
+    )
+
+
+
+@router.get("/search", response_model=List[schemas.ResumeSearchResultSchema])
+async def search_resumes(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    filters: schemas.ResumeFilterSchema = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    """Ranked full-text search over raw text, skills, roles and projects; combines with the list filters."""
+    rows = await crud.search_resumes(db, q, limit=limit, offset=offset, filters=filters)
+    return [
+        schemas.ResumeSearchResultSchema(
+            id=row.id,
+            file_name=row.file_name,
+            uploaded_at=row.uploaded_at,
+            name=row.name,
+            email=row.email,
+            resume_rating=row.resume_rating,
+            score=row.score,
+        )
+        for row in rows
+    ]
+
+
+
+@router.post("/match", response_model=List[schemas.ResumeMatchResultSchema])
+async def match_resumes(
+    request: schemas.JobMatchRequestSchema,
+    db: AsyncSession = Depends(get_db)
+):
+    """Top-k stored resumes for a job description, by TF-IDF cosine similarity; no LLM calls."""
+    top_k = min(request.top_k, matching.MATCH_MAX_TOP_K)
+    matches = await asyncio.to_thread(matching.match_index.top_k, request.job_description, top_k)
+    if not matches:
         return []
-        
-    results = []
-    for r_db in resumes_db:
-        name = r_db.contact_info.get("name") if isinstance(r_db.contact_info, dict) else None
-        email = r_db.contact_info.get("email") if isinstance(r_db.contact_info, dict) else None
-        results.append(schemas.ResumeListDetailSchema(
-            id=r_db.id,
-            file_name=r_db.file_name,
-            uploaded_at=r_db.uploaded_at,
-            name=name,
-            email=email,
-        ))
-
-    return results
+
+    rows = {row.id: row for row in await crud.get_resume_list_rows_by_ids(db, [resume_id for resume_id, _ in matches])}
+    return [
+        schemas.ResumeMatchResultSchema(
+            id=row.id,
+            file_name=row.file_name,
+            uploaded_at=row.uploaded_at,
+            name=row.name,
+            email=row.email,
+            resume_rating=row.resume_rating,
+            score=score,
+        )
+        # Ids without a row were deleted after they were indexed
+        for resume_id, score in matches if (row := rows.get(resume_id)) is not None
+    ]
+
+
+
+async def _load_resume_payload(db: AsyncSession, resume_id: int) -> Optional[read_cache.CachedPayload]:
+    row = await crud.get_resume_detail_row(db, resume_id=resume_id)
+    if row is None:
+        return None
+
+    if row.payload is not None:
+        body = resume_payloads.detail_body(row.id, row.file_name, row.uploaded_at, row.raw_text, row.payload)
+    else:
+        # Rows stored before payloads existed are serialized from the ORM object
+        db_resume = await crud.get_resume_by_id(db, resume_id=resume_id)
+        if db_resume is None:
+            return None
+        db_resume.raw_text = row.raw_text
+        body = schemas.ResumeReadSchema.model_validate(db_resume).model_dump_json().encode("utf-8")
+    return read_cache.CachedPayload(body)
 
 
 @router.get("/{resume_id}", response_model=schemas.ResumeReadSchema)
 async def get_resume(
-    resume_id: int, 
+    resume_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. contact_info,llm_analysis"),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
     db:AsyncSession = Depends(get_db)
 ):
-    db_resume = await crud.get_resume_by_id(db, resume_id=resume_id)
-    
-    if db_resume is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found")
-    
-    # Use model_validate for SQLAlchemy ORM instance to Pydantic model conversion
-    return schemas.ResumeReadSchema.model_validate(db_resume)
+    try:
+        selected = resume_payloads.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    variant = resume_payloads.fields_key(selected) if selected is not None else None
+    payload = None
+    if resume_read_cache:
+        # A primary-key lookup of one column; a hit skips the JSON columns, the raw text blob and serialization
+        version = await crud.get_resume_version(db, resume_id)
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found")
+        payload = await resume_read_cache.get(resume_id, version, variant)
+
+    if payload is None:
+        full = None
+        if resume_read_cache and variant is not None:
+            full = await resume_read_cache.get(resume_id, version)
+        if full is None:
+            full = await _load_resume_payload(db, resume_id)
+            if full is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found")
+            if resume_read_cache:
+                await resume_read_cache.set(resume_id, version, full)
+
+        payload = full
+        if selected is not None:
+            # Cut from the full body once per version and selection; later hits reuse the bytes and ETag
+            payload = read_cache.CachedPayload(resume_payloads.select_fields(full.body, selected))
+            if resume_read_cache:
+                await resume_read_cache.set(resume_id, version, payload, variant)
+
+    encoding = compression.choose_encoding(accept_encoding, len(payload.body))
+    headers = {
+        "ETag": payload.etag_for(encoding),
+        "Cache-Control": f"private, max-age={read_cache.READ_CACHE_HTTP_MAX_AGE}",
+        "Vary": "Accept-Encoding",
+    }
+    if read_cache.etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=payload.encoded(encoding), media_type="application/json", headers=headers)
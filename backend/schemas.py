@@ -4,7 +4,7 @@ from pydantic import (
     Field
 )
 
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Literal
 from datetime import datetime
 
 
@@ -100,12 +100,13 @@ class LLMAnalysisSchema(BaseModel):
     potential_roles: List[str] = Field(default_factory=list)
 
 
-class ResumeReadSchema(BaseModel):
-    id: int
-    file_name: str
-    uploaded_at: datetime
-    raw_text: Optional[str] = None
+class CombinedResumeOutputSchema(BaseModel):
+    extracted_data: ResumeExtractedData
+    analysis: LLMAnalysisSchema
+
 
+class ResumeSectionsSchema(BaseModel):
+    """The structured part of a resume, serialized once at insert time into `Resume.payload`."""
     contact_info: Optional[ContactInfoSchema] = None
     summary: Optional[str] = None
     work_experience: List[WorkExperienceItemSchema] = Field(default_factory=list)
@@ -115,7 +116,21 @@ class ResumeReadSchema(BaseModel):
     certifications: List[CertificationItemSchema] = Field(default_factory=list)
     awards: List[AwardItemSchema] = Field(default_factory=list)
     llm_analysis: Optional[LLMAnalysisSchema] = None
+    llm_mode: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
 
+class ResumeHeaderSchema(BaseModel):
+    id: int
+    file_name: str
+    uploaded_at: datetime
+    raw_text: Optional[str] = None
+
+
+# Base order makes the header fields serialize first, as they did before the split
+class ResumeReadSchema(ResumeSectionsSchema, ResumeHeaderSchema):
     class Config:
         from_attributes = True
 
@@ -125,6 +140,65 @@ class ResumeListDetailSchema(BaseModel):
     uploaded_at: datetime
     name: Optional[str] = None
     email: Optional[EmailStr] = None
+    resume_rating: Optional[float] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class ResumeSearchResultSchema(ResumeListDetailSchema):
+    score: float
+
+
+class JobMatchRequestSchema(BaseModel):
+    job_description: str = Field(..., min_length=1, max_length=50000)
+    top_k: int = Field(50, ge=1, le=200)
+
+
+class ResumeMatchResultSchema(ResumeListDetailSchema):
+    score: float
+
+
+class ResumeFilterSchema(BaseModel):
+    min_rating: Optional[float] = Field(None, ge=1, le=10)
+    max_rating: Optional[float] = Field(None, ge=1, le=10)
+    role: Optional[str] = None
+    skill: Optional[str] = None  # canonical skill id or any alias, e.g. "reactjs"
+    min_experience_months: Optional[int] = Field(None, ge=0)
+    max_experience_months: Optional[int] = Field(None, ge=0)
+    min_degree: Optional[Literal["high_school", "associate", "bachelor", "master", "doctorate"]] = None
+    name: Optional[str] = None
+    email: Optional[str] = None
+
+class JobAcceptedSchema(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+
+class JobStatusSchema(BaseModel):
+    id: str
+    file_name: str
+    status: str
+    stage: str
+    progress: int
+    attempts: int
+    resume_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class BatchUploadItemSchema(BaseModel):
+    file_name: str
+    status: str
+    resume_id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BatchUploadResponseSchema(BaseModel):
+    total: int
+    created: int
+    failed: int
+    skipped: int
+    items: List[BatchUploadItemSchema] = Field(default_factory=list)
@@ -0,0 +1,156 @@
+import os
+import re
+import models
+
+from typing import List
+from dotenv import load_dotenv
+from sqlalchemy import DDL, Text, cast, column, event, exists, func, literal_column, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+
+load_dotenv()
+
+# Postgres text search configuration used both when indexing and when querying
+SEARCH_TEXT_CONFIG = os.getenv("SEARCH_TEXT_CONFIG", "english")
+
+_SEARCH_TERM = re.compile(r"\w+", re.UNICODE)
+
+resume_search_table = table("resume_search", column("rowid"))
+
+
+def search_fields(db_resume: models.Resume) -> dict:
+    """Text of a resume grouped by search weight, most important first."""
+    skills = db_resume.skills or {}
+    skill_names = [item.get("name", "") for item in skills.get("technical", []) + skills.get("tools", [])]
+    skill_names += skills.get("soft", []) + skills.get("languages", [])
+
+    roles = [exp.get("role") or "" for exp in db_resume.work_experience or []]
+    roles += [role.role for role in db_resume.roles]
+
+    projects = []
+    for project in db_resume.projects or []:
+        projects += [project.get("name") or "", project.get("description") or ""]
+        projects += project.get("technologies_used", [])
+
+    return {
+        "skills": " ".join(skill_names),
+        "roles": " ".join(roles),
+        "projects": " ".join(projects),
+        "raw_text": db_resume.raw_text or "",
+    }
+
+
+class PostgresSearchIndex:
+    """Weighted tsvector in `resumes.search_vector`, GIN-indexed and written with the row itself."""
+
+    WEIGHTS = {"skills": "A", "roles": "B", "projects": "C", "raw_text": "D"}
+
+    async def index(self, db: AsyncSession, db_resumes: List[models.Resume]) -> None:
+        for db_resume in db_resumes:
+            vector = None
+            for field, value in search_fields(db_resume).items():
+                weighted = func.setweight(
+                    func.to_tsvector(cast(SEARCH_TEXT_CONFIG, REGCONFIG), cast(value, Text)),
+                    self.WEIGHTS[field]
+                )
+                vector = weighted if vector is None else vector.op("||")(weighted)
+            # Rendered into the row's own INSERT/UPDATE, so indexing costs no extra round trip
+            db_resume.search_vector = vector
+
+    def unindexed(self):
+        return models.Resume.search_vector.is_(None)
+
+    def query(self, terms: str):
+        ts_query = func.websearch_to_tsquery(cast(SEARCH_TEXT_CONFIG, REGCONFIG), cast(terms, Text))
+        score = func.ts_rank_cd(models.Resume.search_vector, ts_query)
+        return (
+            select(score.label("score"))
+            .select_from(models.Resume)
+            .where(models.Resume.search_vector.op("@@")(ts_query))
+            .order_by(score.desc(), models.Resume.id.desc())
+        )
+
+
+class SQLiteSearchIndex:
+    """FTS5 table `resume_search` keyed by resume id, for local runs and tests."""
+
+    # bm25 column weights, in table column order
+    WEIGHTS = (10.0, 6.0, 3.0, 1.0)
+
+    async def index(self, db: AsyncSession, db_resumes: List[models.Resume]) -> None:
+        # Ids are needed for the FTS rowids
+        await db.flush()
+        for db_resume in db_resumes:
+            fields = search_fields(db_resume)
+            await db.execute(text("DELETE FROM resume_search WHERE rowid = :id"), {"id": db_resume.id})
+            await db.execute(
+                text(
+                    "INSERT INTO resume_search (rowid, skills, roles, projects, raw_text) "
+                    "VALUES (:id, :skills, :roles, :projects, :raw_text)"
+                ),
+                {"id": db_resume.id, **fields}
+            )
+
+    def unindexed(self):
+        return ~exists().where(resume_search_table.c.rowid == models.Resume.id)
+
+    def query(self, terms: str):
+        # Quote every term so user input can't inject FTS5 query syntax
+        match = " ".join('"' + term + '"' for term in _SEARCH_TERM.findall(terms))
+        fts = literal_column("resume_search")
+        # bm25 is lower for better matches
+        score = -func.bm25(fts, *self.WEIGHTS)
+        return (
+            select(score.label("score"))
+            .select_from(models.Resume)
+            .join(resume_search_table, resume_search_table.c.rowid == models.Resume.id)
+            .where(fts.op("MATCH")(match))
+            .order_by(score.desc(), models.Resume.id.desc())
+        )
+
+
+SEARCH_BACKENDS = {
+    "postgresql": PostgresSearchIndex(),
+    "sqlite": SQLiteSearchIndex(),
+}
+
+
+# On the metadata rather than the table, so the FTS table is also added to existing local databases
+event.listen(
+    models.Base.metadata,
+    "after_create",
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS resume_search "
+        "USING fts5(skills, roles, projects, raw_text, tokenize='porter unicode61')"
+    ).execute_if(dialect="sqlite")
+)
+
+
+def get_search_backend(db: AsyncSession):
+    return SEARCH_BACKENDS.get(db.bind.dialect.name)
+
+
+async def index_resumes(db: AsyncSession, db_resumes: List[models.Resume]) -> None:
+    """Adds or replaces resumes in the search index inside the caller's transaction.
+
+    Call after the rows are added to the session and before commit;
+    `roles` must be loaded.
+    """
+    backend = get_search_backend(db)
+    if backend is not None:
+        await backend.index(db, db_resumes)
+
+
+def unindexed_clause(db: AsyncSession):
+    """A filter on resumes missing from the search index (rows stored before it existed); None if unsupported."""
+    backend = get_search_backend(db)
+    return backend.unindexed() if backend is not None else None
+
+
+def search_query(db: AsyncSession, terms: str):
+    """A select of `score` over matching resumes, best first; add the columns to return. None if unsupported."""
+    backend = get_search_backend(db)
+    if backend is None or not _SEARCH_TERM.search(terms):
+        return None
+    return backend.query(terms)
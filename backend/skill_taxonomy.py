@@ -0,0 +1,294 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+import schemas
+
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+SKILL_TAXONOMY_PATH = os.getenv(
+    "SKILL_TAXONOMY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_taxonomy.json")
+)
+# merge: canonicalize the LLM's skills and add the ones found in the text
+# replace: leave skills out of the LLM prompt and use the matcher's alone
+# off: store whatever the LLM returns
+SKILL_EXTRACTION_MODE = os.getenv("SKILL_EXTRACTION_MODE", "merge").lower()
+
+# SkillSetSchema field each taxonomy category goes into
+CATEGORY_FIELDS = {
+    "technical": "technical",
+    "tool": "tools",
+    "soft": "soft",
+    "language": "languages",
+}
+
+
+@dataclass
+class Skill:
+    id: str
+    name: str
+    category: str
+    aliases: List[str] = field(default_factory=list)
+    # Matched in text only with this exact casing ("REST", "Slack"); everything else ignores case
+    exact: List[str] = field(default_factory=list)
+
+
+def _normalize_alias(alias: str) -> str:
+    return " ".join(alias.lower().split())
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _lower_same_length(text: str) -> str:
+    """Lowercases without changing offsets (a few characters, like 'İ', lowercase to two)."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: finds every pattern occurrence in one pass over the text.
+
+    Transitions live in a single dict keyed by (state << 21 | code point)
+    rather than a dict per node, which keeps tens of thousands of patterns
+    to a few tens of MB.
+    """
+
+    def __init__(self):
+        self._goto: Dict[int, int] = {}
+        self._fail: List[int] = [0]
+        self._out: Dict[int, Tuple[Tuple[int, int], ...]] = {}
+        self._states = 1
+        self._built = False
+
+    def add(self, pattern: str, value: int) -> None:
+        state = 0
+        for ch in pattern:
+            key = (state << 21) | ord(ch)
+            next_state = self._goto.get(key)
+            if next_state is None:
+                next_state = self._states
+                self._states += 1
+                self._fail.append(0)
+                self._goto[key] = next_state
+            state = next_state
+        self._out[state] = self._out.get(state, ()) + ((len(pattern), value),)
+        self._built = False
+
+    def build(self) -> None:
+        children: Dict[int, List[Tuple[int, int]]] = {}
+        for key, child in self._goto.items():
+            children.setdefault(key >> 21, []).append((key & 0x1FFFFF, child))
+
+        queue = deque()
+        for _, child in children.get(0, []):
+            self._fail[child] = 0
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            for code, child in children.get(state, []):
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ((fallback << 21) | code) not in self._goto:
+                    fallback = self._fail[fallback]
+                target = self._goto.get((fallback << 21) | code, 0)
+                self._fail[child] = target
+                # Patterns ending at the fail state also end here
+                if target in self._out:
+                    self._out[child] = self._out.get(child, ()) + self._out[target]
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yields (start, end, value) for every occurrence, overlaps included."""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, ch in enumerate(text):
+            code = ord(ch)
+            next_state = goto.get((state << 21) | code)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = goto.get((state << 21) | code)
+            state = next_state or 0
+            if state in out:
+                end = index + 1
+                for length, value in out[state]:
+                    yield end - length, end, value
+
+    @property
+    def states(self) -> int:
+        return self._states
+
+
+class SkillTaxonomy:
+    """Canonical skills with aliases, and a matcher over all of them."""
+
+    def __init__(self, skills: List[Skill], version: str):
+        self.skills = skills
+        self.version = version
+        self.by_id: Dict[str, Skill] = {skill.id: skill for skill in skills}
+        self._by_alias: Dict[str, int] = {}
+        self._by_exact: Dict[str, int] = {}
+        # Per pattern: (skill index, exact alias or None)
+        self._patterns: List[Tuple[int, Optional[str]]] = []
+        self.matcher = AhoCorasick()
+
+        for index, skill in enumerate(skills):
+            exact = set(skill.exact)
+            for alias in [skill.name] + skill.aliases:
+                normalized = _normalize_alias(alias)
+                if not normalized or normalized in self._by_alias:
+                    continue
+                self._by_alias[normalized] = index
+                # Single letters ("C", "R") are only resolved from the LLM's output, never matched in text
+                if alias not in exact and len(normalized) > 1:
+                    self._add_pattern(normalized, index, None)
+            for alias in skill.exact:
+                if alias not in self._by_exact:
+                    self._by_exact[alias] = index
+                    self._add_pattern(_lower_same_length(alias), index, alias)
+        self.matcher.build()
+
+    def _add_pattern(self, pattern: str, index: int, exact: Optional[str]) -> None:
+        self.matcher.add(pattern, len(self._patterns))
+        self._patterns.append((index, exact))
+
+    @classmethod
+    def load(cls, path: str) -> "SkillTaxonomy":
+        with open(path, "rb") as f:
+            content = f.read()
+        data = json.loads(content)
+        skills = [Skill(**entry) for entry in data["skills"]]
+        unknown = {skill.category for skill in skills} - set(CATEGORY_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown skill categories in {path}: {', '.join(sorted(unknown))}")
+        return cls(skills, hashlib.sha256(content).hexdigest()[:16])
+
+    def lookup(self, name: str) -> Optional[Skill]:
+        """The canonical skill for a name or alias, if it is in the taxonomy."""
+        index = self._by_exact.get(name.strip())
+        if index is None:
+            index = self._by_alias.get(_normalize_alias(name))
+        return self.skills[index] if index is not None else None
+
+    def find(self, text: str) -> Counter:
+        """Skill id -> occurrences in `text`, leftmost-longest and on word boundaries."""
+        # Aliases are stored with single spaces; "Machine\nLearning" must still match
+        text = " ".join(text.split())
+        lowered = _lower_same_length(text)
+        candidates = []
+        for start, end, pattern in self.matcher.iter_matches(lowered):
+            if start > 0 and _is_word_char(lowered[start - 1]) and _is_word_char(lowered[start]):
+                continue
+            if end < len(lowered) and _is_word_char(lowered[end]) and _is_word_char(lowered[end - 1]):
+                continue
+            index, exact = self._patterns[pattern]
+            if exact is not None and text[start:end] != exact:
+                continue
+            candidates.append((start, -(end - start), index))
+
+        # "React Native" wins over "React" when both start at the same place
+        found = Counter()
+        last_end = 0
+        for start, negative_length, index in sorted(candidates):
+            if start >= last_end:
+                found[self.skills[index].id] += 1
+                last_end = start - negative_length
+        return found
+
+    def skill_set(self, skill_ids) -> schemas.SkillSetSchema:
+        skill_set = schemas.SkillSetSchema()
+        for skill_id in skill_ids:
+            skill = self.by_id[skill_id]
+            _append(skill_set, CATEGORY_FIELDS[skill.category], skill.name, None)
+        return skill_set
+
+    def canonicalize(
+        self,
+        skills: Optional[schemas.SkillSetSchema],
+        found_ids=()
+    ) -> schemas.SkillSetSchema:
+        """Renames the LLM's skills to their canonical names, drops duplicates and adds `found_ids`.
+
+        A skill the taxonomy knows goes into its category's list; unknown
+        names stay where the LLM put them.
+        """
+        merged = schemas.SkillSetSchema()
+        seen = set()
+
+        def add(field_name: str, name: str, proficiency: Optional[str]) -> None:
+            skill = self.lookup(name)
+            if skill is not None:
+                field_name, name, key = CATEGORY_FIELDS[skill.category], skill.name, skill.id
+            else:
+                key = _normalize_alias(name)
+            if key and key not in seen:
+                seen.add(key)
+                _append(merged, field_name, name, proficiency)
+
+        if skills is not None:
+            for field_name in ("technical", "tools"):
+                for item in getattr(skills, field_name):
+                    add(field_name, item.name, item.proficiency)
+            for field_name in ("soft", "languages"):
+                for name in getattr(skills, field_name):
+                    add(field_name, name, None)
+        for skill_id in found_ids:
+            add(CATEGORY_FIELDS[self.by_id[skill_id].category], self.by_id[skill_id].name, None)
+        return merged
+
+    def skill_ids(self, skills: Optional[schemas.SkillSetSchema]) -> List[str]:
+        """Canonical ids of the skills in a skill set that the taxonomy knows, in order."""
+        if skills is None:
+            return []
+        names = [item.name for item in skills.technical + skills.tools] + skills.soft + skills.languages
+        ids = []
+        for name in names:
+            skill = self.lookup(name)
+            if skill is not None and skill.id not in ids:
+                ids.append(skill.id)
+        return ids
+
+
+def _append(skill_set: schemas.SkillSetSchema, field_name: str, name: str, proficiency: Optional[str]) -> None:
+    if field_name in ("technical", "tools"):
+        getattr(skill_set, field_name).append(schemas.SkillItemSchema(name=name, proficiency=proficiency))
+    else:
+        getattr(skill_set, field_name).append(name)
+
+
+_taxonomy: Optional[SkillTaxonomy] = None
+_taxonomy_lock = threading.Lock()
+
+
+def get_skill_taxonomy() -> Optional[SkillTaxonomy]:
+    """The taxonomy at SKILL_TAXONOMY_PATH, built on first use; None when skill matching is off.
+
+    Built lazily since a large taxonomy takes a moment to compile and not
+    every process needs it.
+    """
+    global _taxonomy
+    if SKILL_EXTRACTION_MODE == "off":
+        return None
+    if _taxonomy is None:
+        with _taxonomy_lock:
+            if _taxonomy is None:
+                _taxonomy = SkillTaxonomy.load(SKILL_TAXONOMY_PATH)
+                logger.info(
+                    "Loaded %d skills from %s (%d matcher states)",
+                    len(_taxonomy.skills), SKILL_TAXONOMY_PATH, _taxonomy.matcher.states
+                )
+    return _taxonomy
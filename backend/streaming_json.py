@@ -0,0 +1,75 @@
+import json
+import logging
+
+from typing import Any, List, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalObjectParser:
+    """Yields the top-level members of a JSON object as soon as each one is complete.
+
+    Text is fed in chunks as the LLM streams it. Anything before the first
+    '{' (such as a ```json fence) is skipped, and so is anything after the
+    object closes. Each character is scanned once; a member is only decoded
+    once its closing ',' or '}' has arrived.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = 0
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        if self.done or not chunk:
+            return []
+
+        self._text += chunk
+        text = self._text
+        members = []
+
+        i = self._pos
+        while i < len(text) and not self.done:
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._member_start = i + 1
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    members.extend(self._decode_member(text[self._member_start:i]))
+                    self.done = True
+            elif ch == "," and self._depth == 1:
+                members.extend(self._decode_member(text[self._member_start:i]))
+                self._member_start = i + 1
+            i += 1
+
+        self._pos = i
+        return members
+
+    def _decode_member(self, member_text: str) -> List[Tuple[str, Any]]:
+        if not member_text.strip():
+            return []
+        try:
+            return list(json.loads("{" + member_text + "}").items())
+        except ValueError as e:
+            # The full-response parse decides the final result; a bad member only loses its early event
+            logger.warning("Could not decode streamed JSON member: %s", e)
+            return []
@@ -0,0 +1,48 @@
+import os
+import asyncio
+import tempfile
+
+import pytest
+
+# Modules read their configuration at import time, so point everything at a scratch directory first
+_work_dir = tempfile.mkdtemp(prefix="resume-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite+aiosqlite:///{os.path.join(_work_dir, 'test.db')}",
+    LLM_PROVIDER="fake",
+    RESULT_CACHE_PATH=os.path.join(_work_dir, "result_cache.sqlite3"),
+    JOBS_DB_PATH=os.path.join(_work_dir, "jobs.sqlite3"),
+    JOBS_PAYLOAD_DIR=os.path.join(_work_dir, "job_payloads"),
+    MATCH_INDEX_DIR=os.path.join(_work_dir, "match_index"),
+    UPLOAD_TMP_DIR=_work_dir,
+    BLOB_STORE_ORIGINALS="false",
+)
+
+
+@pytest.fixture
+def work_dir() -> str:
+    return _work_dir
+
+
+@pytest.fixture
+def run_db():
+    """Empties the test database and returns a runner for async scenarios against it."""
+    import db
+    import models
+    import init_db
+
+    def run(scenario):
+        async def wrapper():
+            try:
+                return await scenario()
+            finally:
+                # Pooled connections belong to this event loop; the next asyncio.run gets new ones
+                await db.engine.dispose()
+        return asyncio.run(wrapper())
+
+    async def reset():
+        async with db.engine.begin() as conn:
+            await conn.run_sync(models.Base.metadata.drop_all)
+        await init_db.create_tables()
+
+    run(reset)
+    return run
@@ -0,0 +1,69 @@
+import pytest
+
+import pipeline
+import resume_parser
+
+
+RESUME = """JANE DOE
+Senior Data Engineer | jane.doe@example.com | +1 (415) 555-0123
+linkedin.com/in/jane-doe | https://github.com/janedoe | https://janedoe.dev.
+
+SUMMARY:
+Builds data pipelines.
+
+Work Experience
+Acme Corp, 2019-2023
+Reach me at jane@acme.example for references.
+
+SKILLS & TOOLS
+Python, Spark
+"""
+
+
+@pytest.mark.parametrize("line, section", [
+    ("SUMMARY:", "summary"),
+    ("  Work Experience", "work_experience"),
+    ("## Awards & Achievements", "awards"),
+    ("Experience at Acme Corp", None),
+    ("Python, Spark", None),
+])
+def test_section_heading(line, section):
+    assert resume_parser.section_heading(line) == section
+
+
+def test_split_sections_keeps_the_header_apart():
+    sections = resume_parser.split_sections(RESUME)
+
+    assert sections["header"].startswith("JANE DOE")
+    assert sections["summary"] == "Builds data pipelines."
+    assert sections["work_experience"].startswith("Acme Corp")
+
+
+def test_extract_contact_info_from_the_header():
+    assert resume_parser.extract_contact_info(RESUME) == {
+        "name": "Jane Doe",
+        "email": "jane.doe@example.com",
+        "phone": "+1 (415) 555-0123",
+        "linkedin": "linkedin.com/in/jane-doe",
+        "github": "https://github.com/janedoe",
+        "portfolio_url": "https://janedoe.dev",
+    }
+
+
+def test_date_ranges_and_short_numbers_are_not_phones():
+    contact = resume_parser.extract_contact_info("John Smith\nAcme 2019-2021 | Room 12-345\njohn@example.com")
+
+    assert "phone" not in contact
+    assert contact["name"] == "John Smith"
+
+
+def test_sentence_in_the_header_is_not_a_name():
+    contact = resume_parser.extract_contact_info("Looking for a data role in Berlin now\njane@example.com")
+
+    assert "name" not in contact
+    assert contact["email"] == "jane@example.com"
+
+
+def test_fast_path_needs_a_name_and_a_way_to_reach_them():
+    assert pipeline.fast_path_fields(RESUME)["contact_info"].email == "jane.doe@example.com"
+    assert "contact_info" not in pipeline.fast_path_fields("Jane Doe\nBuilds data pipelines.")
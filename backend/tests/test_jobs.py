@@ -0,0 +1,78 @@
+import os
+
+from jobs import SQLiteJobQueue
+
+
+def make_queue(tmp_path, lease_seconds: int = 300, max_attempts: int = 3) -> SQLiteJobQueue:
+    return SQLiteJobQueue(str(tmp_path / "jobs.sqlite3"), lease_seconds, max_attempts)
+
+
+def make_payload(tmp_path, name: str) -> str:
+    path = tmp_path / name
+    path.write_bytes(b"resume")
+    return str(path)
+
+
+def test_claims_jobs_oldest_first_and_only_once(tmp_path):
+    queue = make_queue(tmp_path)
+    first = queue.enqueue("a.pdf", make_payload(tmp_path, "a"))
+    second = queue.enqueue("b.pdf", make_payload(tmp_path, "b"))
+
+    job = queue.claim()
+    assert (job.id, job.attempts) == (first, 1)
+    assert queue.claim().id == second
+    assert queue.claim() is None
+    assert queue.get(first)["status"] == "running"
+
+
+def test_state_changes_need_the_current_claim_token(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue("a.pdf", make_payload(tmp_path, "a"))
+    job = queue.claim()
+    job.claim_token, token = "stale", job.claim_token
+
+    assert not queue.heartbeat(job, "extracting", 50)
+    assert not queue.complete(job, resume_id=1)
+    assert not queue.fail(job, "boom")
+
+    job.claim_token = token
+    assert queue.heartbeat(job, "extracting", 50)
+    assert queue.complete(job, resume_id=1)
+    assert queue.get(job.id)["status"] == "completed"
+    assert not queue.fail(job, "late failure")
+
+
+def test_expired_lease_is_claimed_again_with_a_new_token(tmp_path):
+    queue = make_queue(tmp_path, lease_seconds=-1)
+    queue.enqueue("a.pdf", make_payload(tmp_path, "a"))
+    lost = queue.claim()
+
+    reclaimed = queue.claim()
+    assert reclaimed.id == lost.id
+    assert reclaimed.attempts == 2
+    # The worker that lost its lease can no longer finish the job
+    assert not queue.complete(lost, resume_id=1)
+    assert queue.complete(reclaimed, resume_id=1)
+
+
+def test_release_does_not_count_as_an_attempt(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=1)
+    queue.enqueue("a.pdf", make_payload(tmp_path, "a"))
+    queue.release(queue.claim())
+
+    job = queue.claim()
+    assert job is not None
+    assert job.attempts == 1
+
+
+def test_exhausted_jobs_are_failed_and_the_next_one_claimed(tmp_path):
+    queue = make_queue(tmp_path, lease_seconds=-1, max_attempts=1)
+    exhausted_payload = make_payload(tmp_path, "a")
+    exhausted = queue.enqueue("a.pdf", exhausted_payload)
+    queue.claim()  # its worker dies, the lease runs out
+    waiting = queue.enqueue("b.pdf", make_payload(tmp_path, "b"))
+
+    assert queue.claim().id == waiting
+    assert queue.get(exhausted)["status"] == "failed"
+    assert queue.get(exhausted)["error"] == "Exceeded maximum attempts"
+    assert not os.path.exists(exhausted_payload)
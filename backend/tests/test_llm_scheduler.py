@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from llm_scheduler import CircuitBreaker, CircuitOpenError, LLMScheduler
+
+
+def make_scheduler(breaker: CircuitBreaker) -> LLMScheduler:
+    return LLMScheduler(
+        requests_per_minute=600000,
+        tokens_per_minute=600000,
+        max_in_flight=4,
+        max_retries=0,
+        retry_base_seconds=0,
+        retry_max_seconds=0,
+        call_timeout_seconds=5,
+        breaker=breaker,
+    )
+
+
+async def _unavailable():
+    raise ConnectionError("503 service unavailable")
+
+
+async def _ok():
+    return "ok"
+
+
+async def _open_circuit(scheduler: LLMScheduler) -> None:
+    with pytest.raises(ConnectionError):
+        await scheduler.run(_unavailable)
+    assert scheduler.breaker.state == "open"
+
+
+def test_cancelled_half_open_probe_releases_the_circuit():
+    async def scenario():
+        scheduler = make_scheduler(CircuitBreaker(failure_threshold=1, reset_seconds=0))
+        await _open_circuit(scheduler)
+
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(60)
+
+        probe = asyncio.create_task(scheduler.run(hang))
+        await started.wait()
+        assert scheduler.breaker.state == "half_open"
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        # Without releasing the probe every later call would be rejected for good
+        assert await scheduler.run(_ok) == "ok"
+        assert scheduler.breaker.state == "closed"
+        assert scheduler.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_half_open_admits_a_single_probe():
+    async def scenario():
+        scheduler = make_scheduler(CircuitBreaker(failure_threshold=1, reset_seconds=0))
+        await _open_circuit(scheduler)
+
+        release = asyncio.Event()
+
+        async def wait_for_release():
+            await release.wait()
+            return "ok"
+
+        probe = asyncio.create_task(scheduler.run(wait_for_release))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await scheduler.run(_ok)
+
+        release.set()
+        assert await probe == "ok"
+        assert scheduler.breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_failed_probe_reopens_the_circuit():
+    async def scenario():
+        scheduler = make_scheduler(CircuitBreaker(failure_threshold=1, reset_seconds=60))
+        await _open_circuit(scheduler)
+        scheduler.breaker.opened_at -= 60
+
+        with pytest.raises(ConnectionError):
+            await scheduler.run(_unavailable)
+        assert scheduler.breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            await scheduler.run(_ok)
+
+    asyncio.run(scenario())
+
+
+def test_backing_off_retry_frees_its_slot():
+    async def scenario():
+        scheduler = LLMScheduler(
+            requests_per_minute=600000,
+            tokens_per_minute=600000,
+            max_in_flight=1,
+            max_retries=1,
+            retry_base_seconds=0,
+            retry_max_seconds=0,
+            call_timeout_seconds=5,
+            breaker=CircuitBreaker(failure_threshold=10, reset_seconds=60),
+        )
+        scheduler._backoff = lambda attempt: 60.0  # no jitter
+
+        failed = asyncio.Event()
+
+        async def fail_once():
+            failed.set()
+            raise ConnectionError("503 service unavailable")
+
+        retrying = asyncio.create_task(scheduler.run(fail_once))
+        await failed.wait()
+
+        # The retry sleeps for a minute; the only slot must be free for other callers meanwhile
+        assert await asyncio.wait_for(scheduler.run(_ok), timeout=1) == "ok"
+        assert scheduler.in_flight == 0
+
+        retrying.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await retrying
+
+    asyncio.run(scenario())
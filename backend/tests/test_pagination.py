@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import crud
+import export
+import models
+import pagination
+from db import SessionLocal
+from sqlalchemy import select
+
+
+def test_cursor_round_trips():
+    uploaded_at = datetime(2026, 10, 18, 20, 30, 52, 123456, tzinfo=timezone.utc)
+    cursor = pagination.encode_cursor(uploaded_at, 42)
+
+    assert "=" not in cursor
+    assert pagination.decode_cursor(cursor) == (uploaded_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "W10", "WyJ5ZXN0ZXJkYXkiLDFd"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(pagination.InvalidCursor):
+        pagination.decode_cursor(cursor)
+
+
+def test_following_cursors_visits_every_row_once(run_db):
+    async def scenario():
+        async with SessionLocal() as db:
+            # All inserted within the same second, so paging leans on the id tiebreak
+            db.add_all(models.Resume(file_name=f"resume-{i}.pdf") for i in range(7))
+            await db.commit()
+
+        seen = []
+        cursor = None
+        while True:
+            async with SessionLocal() as db:
+                after = pagination.decode_cursor(cursor) if cursor else None
+                rows = await crud.get_resume_list_page(db, limit=2, cursor=after)
+            if not rows:
+                return seen
+            seen += [row.id for row in rows]
+            assert len(seen) <= 7, f"paging repeated rows: {seen}"
+            cursor = pagination.encode_cursor(rows[-1].uploaded_at, rows[-1].id)
+
+    ids = run_db(scenario)
+    assert ids == sorted(set(ids), reverse=True)
+    assert len(ids) == 7
+
+
+def test_upload_date_filters_match_at_second_boundaries(run_db):
+    async def scenario():
+        async with SessionLocal() as db:
+            db.add(models.Resume(file_name="resume.pdf"))
+            await db.commit()
+            uploaded_at = (await db.execute(select(models.Resume.uploaded_at))).scalar_one()
+
+            async def exported_ids(**bounds):
+                return (await db.execute(export.export_query(["id"], **bounds))).scalars().all()
+
+            # A datetime bound renders as '...:52.000000' unless it is bound in the stored format
+            since = uploaded_at.replace(microsecond=0)
+            return await exported_ids(uploaded_from=since), await exported_ids(uploaded_to=since)
+
+    included, excluded = run_db(scenario)
+    assert included == [1]
+    assert excluded == []
@@ -0,0 +1,45 @@
+import time
+import asyncio
+
+import pytest
+
+from parse_pool import ParserPool, ParserPoolSaturated
+
+
+def test_rejects_work_beyond_workers_plus_queue():
+    async def scenario():
+        pool = ParserPool(workers=1, max_queue=1, retry_after=7)
+        try:
+            running = asyncio.ensure_future(pool.run(time.sleep, 0.5))
+            queued = asyncio.ensure_future(pool.run(time.sleep, 0))
+            await asyncio.sleep(0)
+            assert pool.in_flight == 2
+            assert pool.queue_depth == 1
+
+            with pytest.raises(ParserPoolSaturated) as rejected:
+                await pool.run(time.sleep, 0)
+            assert rejected.value.retry_after == 7
+
+            await asyncio.gather(running, queued)
+            # Capacity comes back once the backlog drains
+            assert await pool.run(divmod, 7, 2) == (3, 1)
+            return pool.stats()
+        finally:
+            pool.shutdown()
+
+    stats = asyncio.run(scenario())
+    assert (stats["completed"], stats["rejected"], stats["in_flight"]) == (3, 1, 0)
+
+
+def test_failures_are_counted_and_reraised():
+    async def scenario():
+        pool = ParserPool(workers=1, max_queue=0, retry_after=1)
+        try:
+            with pytest.raises(ValueError):
+                await pool.run(int, "not a number")
+            return pool.stats()
+        finally:
+            pool.shutdown()
+
+    stats = asyncio.run(scenario())
+    assert (stats["failed"], stats["in_flight"]) == (1, 0)
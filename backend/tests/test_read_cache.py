@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+import read_cache
+from read_cache import CachedPayload, MemoryReadCache, ResumeReadCache, etag_matches
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(read_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_lru_evicts_least_recently_read(clock):
+    cache = MemoryReadCache(max_entries=2, max_bytes=1 << 20, ttl_seconds=60)
+    cache.set("a", CachedPayload(b"a"))
+    cache.set("b", CachedPayload(b"b"))
+    cache.get("a")
+
+    cache.set("c", CachedPayload(b"c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a").body == b"a"
+    assert cache.evictions == 1
+
+
+def test_byte_bound_and_replacement(clock):
+    cache = MemoryReadCache(max_entries=10, max_bytes=8, ttl_seconds=60)
+    cache.set("a", CachedPayload(b"1234"))
+    cache.set("a", CachedPayload(b"123"))
+    cache.set("b", CachedPayload(b"12345"))
+    assert cache.bytes == 8
+
+    cache.set("c", CachedPayload(b"1"))
+    assert cache.get("a") is None
+    cache.set("too-big", CachedPayload(b"123456789"))
+    assert cache.get("too-big") is None
+    assert cache.bytes == 6
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = MemoryReadCache(max_entries=10, max_bytes=1 << 20, ttl_seconds=60)
+    cache.set("a", CachedPayload(b"a"))
+
+    clock[0] += 59
+    assert cache.get("a") is not None
+    clock[0] += 2
+    assert cache.get("a") is None
+    assert cache.bytes == 0
+
+
+def test_resume_entries_are_keyed_on_version_and_variant():
+    cache = ResumeReadCache(MemoryReadCache(10, 1 << 20, 60))
+
+    async def scenario():
+        await cache.set(1, 0, CachedPayload(b"full"))
+        await cache.set(1, 0, CachedPayload(b"sparse"), "id,summary")
+        return (
+            await cache.get(1, 0),
+            await cache.get(1, 0, "id,summary"),
+            await cache.get(1, 1),
+        )
+
+    full, sparse, newer = asyncio.run(scenario())
+    assert (full.body, sparse.body, newer) == (b"full", b"sparse", None)
+    assert cache.stats()["misses"] == 1
+
+
+def test_each_encoding_has_its_own_strong_etag():
+    payload = CachedPayload(b'{"id":1}')
+
+    assert payload.etag.startswith('"') and payload.etag.endswith('"')
+    assert payload.etag_for(None) == payload.etag
+    assert payload.etag_for("gzip") == payload.etag[:-1] + '-gzip"'
+    assert payload.etag_for("gzip") != payload.etag_for("br")
+
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    (None, False),
+    ("", False),
+    ("*", True),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"other", "abc"', True),
+    ('"other"', False),
+    ('"abc-gzip"', False),
+])
+def test_if_none_match(if_none_match, matches):
+    assert etag_matches(if_none_match, '"abc"') is matches
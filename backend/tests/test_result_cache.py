@@ -0,0 +1,71 @@
+import asyncio
+import itertools
+
+import pytest
+
+import cache
+from cache import ResultCache, make_key, normalize_text
+
+
+@pytest.fixture(autouse=True)
+def ticking_clock(monkeypatch):
+    # Every access gets a distinct, increasing timestamp, so LRU order is exact
+    ticks = itertools.count(1)
+    monkeypatch.setattr(cache.time, "time", lambda: float(next(ticks)))
+
+
+def make_cache(tmp_path, max_entries: int = 100, max_bytes: int = 1 << 20) -> ResultCache:
+    return ResultCache(str(tmp_path / "result_cache.sqlite3"), max_entries, max_bytes)
+
+
+def test_keys_ignore_cosmetic_whitespace():
+    assert normalize_text("  Jane\tDoe\n\nEngineer ") == "Jane Doe Engineer"
+    assert make_key("a", "bc") != make_key("ab", "c")
+
+
+def test_layers_are_separate_and_counted(tmp_path):
+    result_cache = make_cache(tmp_path)
+    result_cache.set_json("extraction", "k", {"summary": "x"})
+
+    assert result_cache.get_json("extraction", "k") == {"summary": "x"}
+    assert result_cache.get("analysis", "k") is None
+    stats = result_cache.stats()
+    assert stats["hits"]["extraction"] == 1
+    assert stats["misses"]["analysis"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    result_cache = make_cache(tmp_path, max_entries=3)
+    for key in ("a", "b", "c"):
+        result_cache.set("text", key, key)
+    result_cache.get("text", "a")
+
+    result_cache.set("text", "d", "d")
+
+    assert result_cache.get("text", "b") is None
+    assert [result_cache.get("text", key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+    assert result_cache.stats()["evictions"] == 1
+
+
+def test_size_bound_counts_replaced_values_once(tmp_path):
+    result_cache = make_cache(tmp_path, max_bytes=10)
+    result_cache.set("text", "a", "12345")
+    result_cache.set("text", "a", "1234")
+    result_cache.set("text", "b", "123456")
+    assert result_cache.stats()["bytes"] == 10
+
+    result_cache.set("text", "c", "1")
+    assert result_cache.get("text", "a") is None
+    assert result_cache.get("text", "b") == "123456"
+    # Larger than the whole cache; not stored rather than flushing everything else
+    result_cache.set("text", "huge", "x" * 11)
+    assert result_cache.get("text", "huge") is None
+    assert result_cache.stats()["entries"] == 2
+
+
+def test_entries_survive_reopening(tmp_path):
+    make_cache(tmp_path).set("text", "k", "raw text")
+
+    reopened = make_cache(tmp_path)
+    assert reopened.stats()["entries"] == 1
+    assert asyncio.run(reopened.aget("text", "k")) == "raw text"
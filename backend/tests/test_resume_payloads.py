@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+import models
+import schemas
+import read_cache
+import resume_payloads
+from db import SessionLocal
+from routes import resume as resume_routes
+
+
+def test_parse_fields_always_includes_id():
+    assert resume_payloads.parse_fields(None) is None
+    assert resume_payloads.parse_fields(" summary, ,skills") == {"id", "summary", "skills"}
+    with pytest.raises(ValueError, match="Unknown fields: salary"):
+        resume_payloads.parse_fields("summary,salary")
+
+
+def test_fields_key_ignores_order_and_repeats():
+    assert resume_payloads.fields_key({"skills", "id", "summary"}) == "id,summary,skills"
+    assert resume_payloads.fields_key(resume_payloads.parse_fields("skills,summary,skills")) == "id,summary,skills"
+
+
+def test_select_fields_keeps_serialization_order():
+    body = json.dumps({"id": 7, "file_name": "cv.pdf", "summary": "Café owner", "skills": None}).encode("utf-8")
+
+    sparse = resume_payloads.select_fields(body, {"skills", "summary", "id"})
+
+    assert sparse == '{"id":7,"summary":"Café owner","skills":null}'.encode("utf-8")
+
+
+def test_sparse_variant_is_served_without_reparsing(run_db, monkeypatch):
+    monkeypatch.setattr(
+        resume_routes, "resume_read_cache",
+        read_cache.ResumeReadCache(read_cache.MemoryReadCache(100, 1 << 20, 60))
+    )
+    sections = schemas.ResumeSectionsSchema(summary="Builds data pipelines").model_dump_json()
+
+    async def get(fields):
+        async with SessionLocal() as db:
+            return await resume_routes.get_resume(1, fields=fields, if_none_match=None, accept_encoding=None, db=db)
+
+    async def scenario():
+        async with SessionLocal() as db:
+            db.add(models.Resume(file_name="cv.pdf", payload=sections))
+            await db.commit()
+        first = await get("summary")
+
+        def unexpected(*args):
+            raise AssertionError("cached sparse variant was rebuilt")
+
+        monkeypatch.setattr(resume_payloads, "select_fields", unexpected)
+        monkeypatch.setattr(resume_routes, "_load_resume_payload", unexpected)
+        return first, await get("summary,id,summary")
+
+    first, second = run_db(scenario)
+    assert first.body == second.body == b'{"id":1,"summary":"Builds data pipelines"}'
+    assert first.headers["ETag"] == second.headers["ETag"]
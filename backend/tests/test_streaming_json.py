@@ -0,0 +1,45 @@
+import json
+
+from streaming_json import IncrementalObjectParser
+
+
+def feed_all(parser: IncrementalObjectParser, chunks) -> list:
+    return [parser.feed(chunk) for chunk in chunks]
+
+
+def test_members_are_yielded_as_soon_as_they_close():
+    parser = IncrementalObjectParser()
+
+    chunks = ['```json\n{"summary": "Eng', 'ineer", "skills": {"tech', 'nical": ["Go"]}', ', "awards": []}\n```']
+
+    assert feed_all(parser, chunks) == [
+        [],
+        [("summary", "Engineer")],
+        [],
+        [("skills", {"technical": ["Go"]}), ("awards", [])],
+    ]
+    assert parser.done
+
+
+def test_strings_can_contain_structural_characters():
+    parser = IncrementalObjectParser()
+    summary = 'Said "hi, {there}" \\ then left]'
+    text = json.dumps({"summary": summary, "llm_mode": "x"})
+
+    # One character at a time splits every escape sequence
+    members = [member for ch in text for member in parser.feed(ch)]
+
+    assert members == [("summary", summary), ("llm_mode", "x")]
+
+
+def test_text_after_the_object_is_ignored():
+    parser = IncrementalObjectParser()
+
+    assert parser.feed('{"a": 1} {"b": 2}') == [("a", 1)]
+    assert parser.feed('{"c": 3}') == []
+
+
+def test_undecodable_member_is_dropped():
+    parser = IncrementalObjectParser()
+
+    assert parser.feed('{"a": tru, "b": 2}') == [("b", 2)]
@@ -0,0 +1,56 @@
+import io
+import os
+import hashlib
+
+import pytest
+
+import uploads
+from uploads import SpooledUpload, UploadTooLarge
+
+
+@pytest.fixture(autouse=True)
+def small_spool(monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_SPOOL_MEMORY_BYTES", 8)
+    monkeypatch.setattr(uploads, "UPLOAD_CHUNK_BYTES", 3)
+
+
+def test_small_upload_stays_in_memory():
+    upload = uploads.spool_stream(io.BytesIO(b"resume"), max_bytes=100)
+
+    assert upload.path is None
+    assert bytes(upload.source) == b"resume"
+    assert upload.size == 6
+    assert upload.sha256 == hashlib.sha256(b"resume").hexdigest()
+
+
+def test_large_upload_spills_to_disk():
+    content = b"a much longer resume"
+    with uploads.spool_stream(io.BytesIO(content), max_bytes=100) as upload:
+        path = upload.source
+        assert isinstance(path, str)
+        with open(path, "rb") as f:
+            assert f.read() == content
+        assert upload.sha256 == hashlib.sha256(content).hexdigest()
+    assert not os.path.exists(path)
+
+
+def test_oversized_upload_is_rejected_and_cleaned_up():
+    upload = SpooledUpload(max_bytes=12)
+    upload.write(b"0123456789")
+    path = upload.path
+    assert path is not None
+
+    with pytest.raises(UploadTooLarge):
+        upload.write(b"abc")
+    assert not os.path.exists(path)
+
+
+@pytest.mark.parametrize("content", [b"tiny", b"spilled to disk"])
+def test_move_to_hands_over_the_content(tmp_path, content):
+    upload = uploads.spool_stream(io.BytesIO(content), max_bytes=100)
+    dest = tmp_path / "payload"
+
+    upload.move_to(str(dest))
+    upload.close()
+
+    assert dest.read_bytes() == content
@@ -0,0 +1,129 @@
+import os
+import shutil
+import hashlib
+import tempfile
+
+from io import BytesIO
+from typing import Optional, Union, BinaryIO
+from dotenv import load_dotenv
+from fastapi import UploadFile
+
+
+load_dotenv()
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_SPOOL_MEMORY_BYTES = int(os.getenv("UPLOAD_SPOOL_MEMORY_BYTES", str(1024 * 1024)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(64 * 1024)))
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File exceeds the maximum allowed size of {max_bytes // (1024 * 1024)} MB.")
+        self.max_bytes = max_bytes
+
+
+class SpooledUpload:
+    """An uploaded file kept in memory while small and on disk once it grows.
+
+    The SHA-256 of the content is computed while the file is written, so the
+    bytes never have to be read again just to hash them.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.sha256: Optional[str] = None
+        self.path: Optional[str] = None
+        self._hasher = hashlib.sha256()
+        self._buffer: Optional[BytesIO] = BytesIO()
+        self._file = None
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            self.close()
+            raise UploadTooLarge(self.max_bytes)
+
+        self._hasher.update(chunk)
+
+        if self._file is None and self.size > UPLOAD_SPOOL_MEMORY_BYTES:
+            self._file = tempfile.NamedTemporaryFile(delete=False, dir=UPLOAD_TMP_DIR, suffix=".upload")
+            self.path = self._file.name
+            self._file.write(self._buffer.getbuffer())
+            self._buffer = None
+
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._buffer.write(chunk)
+
+    def finish(self) -> "SpooledUpload":
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.sha256 = self._hasher.hexdigest()
+        return self
+
+    @property
+    def source(self) -> Union[str, memoryview]:
+        """A path for disk-backed uploads, otherwise a view of the in-memory content (no copy).
+
+        The view is only valid until the upload is closed or moved.
+        """
+        if self.path is not None:
+            return self.path
+        return self._buffer.getbuffer()
+
+    def move_to(self, dest_path: str) -> None:
+        """Hands the content over to `dest_path`; the upload no longer owns it."""
+        if self.path is not None:
+            shutil.move(self.path, dest_path)
+            self.path = None
+        else:
+            with open(dest_path, "wb") as f:
+                f.write(self._buffer.getbuffer())
+        self._buffer = None
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+        self._buffer = None
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+async def spool_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> SpooledUpload:
+    # Reject before reading anything when the size is already known
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+    upload = SpooledUpload(max_bytes)
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        upload.write(chunk)
+    return upload.finish()
+
+
+def spool_stream(stream: BinaryIO, max_bytes: int = UPLOAD_MAX_BYTES) -> SpooledUpload:
+    upload = SpooledUpload(max_bytes)
+    with stream:
+        while True:
+            chunk = stream.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            upload.write(chunk)
+    return upload.finish()